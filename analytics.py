@@ -0,0 +1,171 @@
+from datetime import date, timedelta
+
+import cache
+import columnar
+import repository
+from config import config
+from reports import REPORT_TABLES
+from services import ValidationError, valid_date
+
+GRAINS = ["day", "week", "month", "quarter"]
+BACKENDS = ["sql", "numpy"]
+
+ANALYSIS_TOP = 10          # Customers listed by sales_analysis
+ABC_LIMITS = (0.8, 0.95)   # Revenue shares closing classes A and B
+VELOCITY_DAYS = 90         # Window of the product velocity analysis
+
+# Columns of each row returned by sales_trend
+TREND_COLUMNS = ["period", "start", "total_sales", "order_count", "running_total",
+                 "previous_total", "change", "partial"]
+
+
+def period_start(day, grain):
+    """First day of the period holding day (weeks start on Monday)."""
+    if grain == "day":
+        return day
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+
+
+def next_period(start, grain):
+    """First day of the period after the one starting on start."""
+    if grain == "day":
+        return start + timedelta(days=1)
+    if grain == "week":
+        return start + timedelta(days=7)
+    months = 1 if grain == "month" else 3
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def previous_period(start, grain):
+    """First day of the period before the one starting on start."""
+    return period_start(start - timedelta(days=1), grain)
+
+
+def period_label(start, grain):
+    """'2024-03-05', '2024-W10', '2024-03' or '2024-Q1'."""
+    if grain == "day":
+        return start.isoformat()
+    if grain == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if grain == "month":
+        return start.strftime("%Y-%m")
+    return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+
+
+def sales_between(conn, first, last):
+    """(total_sales, order_count) from first up to, not including, last."""
+    return tuple(repository.fetchone(conn, "sales_between", (first.isoformat(), last.isoformat())))
+
+
+def period_sales(conn, grain, first, last):
+    """{period start: (total_sales, order_count)} for the periods from first up to, not including, last."""
+    name = "daily_sales_range" if grain == "day" else "sales_buckets"
+    params = (first.isoformat(), last.isoformat())
+    if grain != "day":
+        params = (grain,) + params
+    return {date.fromisoformat(period): (total, count)
+            for period, total, count in repository.fetchall(conn, name, params)}
+
+
+def sales_trend(conn, grain, start, end):
+    """Sales per day, week, month or quarter from start to end (inclusive YYYY-MM-DD dates).
+
+    Each row is (period, start, total_sales, order_count, running_total,
+    previous_total, change, partial): running_total adds up the range so
+    far, previous_total is the period before (the one before start for the
+    first row) and change is the fraction gained on it, or None when it had
+    no sales. Periods without sales are included with zeros.
+
+    Whole periods are read from the trigger-maintained buckets of migration
+    8. A first or last period cut by the range is summed from daily_sales
+    over the days inside it, flagged as partial and compared with the same
+    days of the period before (month to date against last month to date).
+    Results are served from the report cache until the orders change.
+    """
+    if grain not in GRAINS:
+        raise ValidationError("Input Error", f"Unknown period '{grain}'; choose one of {', '.join(GRAINS)}.")
+    valid_date(start, "Start Date")
+    valid_date(end, "End Date")
+    start, end = date.fromisoformat(start), date.fromisoformat(end)
+    if start > end:
+        raise ValidationError("Input Error", "The start date must not be after the end date.")
+    return cache.report_result(conn, ("sales_trend", grain, start, end), REPORT_TABLES["sales_trend"],
+                               lambda: trend_rows(conn, grain, start, end))
+
+
+def trend_rows(conn, grain, start, end):
+    """The rows of sales_trend, computed from the rollups."""
+    first = period_start(start, grain)
+    stop = next_period(period_start(end, grain), grain)
+    full = period_sales(conn, grain, previous_period(first, grain), stop)
+    after_end = end + timedelta(days=1)
+
+    rows = []
+    running = 0
+    period = first
+    while period < stop:
+        following = next_period(period, grain)
+        before = previous_period(period, grain)
+        partial = period < start or following > after_end
+        if partial:
+            low, high = max(period, start), min(following, after_end)
+            total, count = sales_between(conn, low, high)
+            previous = sales_between(conn, before + (low - period), min(before + (high - period), period))[0]
+        else:
+            total, count = full.get(period, (0, 0))
+            previous = full.get(before, (0, 0))[0]
+        running += total
+        change = (total - previous) / previous if previous else None
+        rows.append((period_label(period, grain), period.isoformat(), total, count, running,
+                     previous, change, partial))
+        period = following
+    return rows
+
+
+def analysis_backend():
+    """The backend sales_analysis uses: config [analytics] backend, with auto meaning numpy if installed."""
+    name = config.get("analytics", "backend")
+    if name == "auto":
+        return "numpy" if columnar.available() else "sql"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown analytics backend '{name}'; choose auto or one of {', '.join(BACKENDS)}.")
+    return name
+
+
+def sales_analysis(conn, top=ANALYSIS_TOP, days=VELOCITY_DAYS, backend=None):
+    """Top customers, ABC product classes, repeat-purchase rates and product velocity.
+
+    Returns {"top_customers", "abc", "repeat_rates", "velocity": rows}; see
+    reports.ANALYSES for the columns. The sql backend runs one aggregation
+    per analysis. The numpy backend reads orders and their lines once
+    (columnar.OrderColumns) and answers all four from the arrays. Results
+    are served from the report cache until one of those tables changes.
+    """
+    backend = backend or analysis_backend()
+    return cache.report_result(conn, ("sales_analysis", top, days, backend), REPORT_TABLES["sales_analysis"],
+                               lambda: analysis_results(conn, top, days, backend))
+
+
+def analysis_results(conn, top, days, backend):
+    """The results of sales_analysis, computed by the given backend."""
+    limits = {"a_limit": ABC_LIMITS[0], "b_limit": ABC_LIMITS[1]}
+    if backend == "numpy":
+        columns = columnar.OrderColumns.load(conn)
+        return {
+            "top_customers": columns.top_customers(conn, top),
+            "abc": columns.abc_classes(conn, ABC_LIMITS),
+            "repeat_rates": columns.repeat_rates(),
+            "velocity": columns.velocity(conn, days),
+        }
+    return {
+        "top_customers": repository.fetchall(conn, "top_customers_analysis", (top,)),
+        "abc": repository.fetchall(conn, "abc_analysis", limits),
+        "repeat_rates": repository.fetchall(conn, "repeat_rates_analysis"),
+        "velocity": repository.fetchall(conn, "velocity_analysis", {"days": days, "window": f"-{days - 1} days"}),
+    }
@@ -0,0 +1,378 @@
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import cache
+import reorder
+import repository
+import services
+from db import DB_PATH, begin_immediate, get_pool, transaction_ended
+from migrations import migrate
+from services import ValidationError
+
+BATCH_SIZE = 64    # Most writes committed together in one transaction
+READ_THREADS = 4   # Reads run concurrently with the writer under WAL
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+# Writable resources: (add, update, delete, JSON fields passed to the service in order)
+RESOURCES = {
+    "products": (services.add_product, services.update_product, services.delete_product,
+                 ("name", "price", "quantity")),
+    "customers": (services.add_customer, services.update_customer, services.delete_customer,
+                  ("name", "phone", "email")),
+    "employees": (services.add_employee, services.update_employee, services.delete_employee,
+                  ("name", "role", "phone", "email")),
+    "suppliers": (services.add_supplier, services.update_supplier, services.delete_supplier,
+                  ("name", "contact", "product_supplied")),
+    "orders": (services.place_order, services.update_order, services.delete_order,
+               ("customer_id", "order_date", "items")),
+}
+
+REPORTS = {
+    "sales": (services.sales_report, ("order_date", "total_sales")),
+    "stock": (services.stock_report, ("product_name", "total_sold")),
+    "top_customers": (services.top_customers_report, ("customer_name", "total_spent")),
+}
+
+
+class NotFound(Exception):
+    pass
+
+
+class WriteBatcher:
+    """Apply writes one at a time on a single thread, committing them in groups.
+
+    Whatever writes are queued when the writer becomes free go into one
+    transaction (up to batch_size), each inside its own SAVEPOINT so a
+    rejected write is rolled back alone. Under load many requests then
+    share a single commit instead of paying for one each.
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=BATCH_SIZE):
+        self.pool = get_pool(db_path)
+        self.batch_size = batch_size
+        self.thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-writer")
+        self.queue = None
+        self.task = None
+        self.batches = 0
+        self.writes = 0
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def submit(self, operation, *args):
+        """Queue operation(conn, *args) and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((operation, args, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                outcomes = await loop.run_in_executor(self.thread, self.apply, batch)
+            except Exception as error:
+                outcomes = [(False, error)] * len(batch)
+            for (_, _, future), (ok, value) in zip(batch, outcomes):
+                if not future.done():
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+
+    def apply(self, batch):
+        """Writer thread: run a batch in one transaction; returns (ok, result or error) per write."""
+        conn = self.pool.get()
+        outcomes = []
+        begin_immediate(conn)  # Retries with backoff while another writer holds the lock
+        try:
+            for operation, args, _ in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((True, operation(conn, *args)))
+                except Exception as error:
+                    conn.execute("ROLLBACK TO write")
+                    outcomes.append((False, error))
+                conn.execute("RELEASE write")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            cache.clear()  # Records read inside the failed transaction may never have been committed
+            raise
+        finally:
+            transaction_ended()
+        self.batches += 1
+        self.writes += len(batch)
+        return outcomes
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.thread.shutdown(wait=True)
+
+
+class Api:
+    """JSON-over-HTTP front end for the service layer.
+
+    Reads run on a small thread pool, each thread with its own pooled
+    connection; writes go through the WriteBatcher.
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=BATCH_SIZE):
+        self.pool = get_pool(db_path)
+        self.readers = ThreadPoolExecutor(max_workers=READ_THREADS, thread_name_prefix="api-reader")
+        self.writer = WriteBatcher(db_path, batch_size)
+        self.routes = [
+            ("GET", r"/health", self.health),
+            ("GET", r"/metrics", self.metrics),
+            ("GET", r"/products/(\d+)", self.get_product),
+            ("POST", r"/orders/batch", self.place_orders),
+            ("POST", r"/(\w+)", self.create),
+            ("PUT", r"/(\w+)/(\d+)", self.update),
+            ("DELETE", r"/(\w+)/(\d+)", self.delete),
+            ("GET", r"/reports/sales/(\d{4}-\d{2}-\d{2})", self.sales_for_date),
+            ("GET", r"/reports/(\w+)", self.report),
+            ("GET", r"/purchase-suggestions", self.purchase_suggestions),
+        ]
+
+    def start(self):
+        self.writer.start()
+
+    def close(self):
+        self.writer.stop()
+        self.readers.shutdown(wait=True)
+
+    async def read(self, operation, *args):
+        """Run operation(conn, *args) on a reader thread."""
+        def run():
+            with self.pool.connection() as conn:
+                return operation(conn, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.readers, run)
+
+    async def dispatch(self, method, target, body=b""):
+        """Route one request; returns (status, JSON-serialisable payload)."""
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "Bad Request", "message": "Body is not valid JSON."}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Bad Request", "message": "Body must be a JSON object."}
+
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, url.path)
+            if match and route_method == method:
+                try:
+                    return await handler(*match.groups(), query=query, payload=payload)
+                except ValidationError as error:
+                    return 400, {"error": error.args[0], "message": error.args[1]}
+                except NotFound as error:
+                    return 404, {"error": "Not Found", "message": str(error)}
+                except Exception as error:
+                    return 500, {"error": "Server Error", "message": str(error)}
+        return 404, {"error": "Not Found", "message": f"No route for {method} {url.path}"}
+
+    def resource(self, name):
+        if name not in RESOURCES:
+            raise NotFound(f"Unknown resource '{name}'")
+        return RESOURCES[name]
+
+    async def health(self, query, payload):
+        return 200, {"status": "ok"}
+
+    async def metrics(self, query, payload):
+        return 200, {
+            "statements": repository.metrics.snapshot(),
+            "cache": {"products": cache.products.stats(), "customers": cache.customers.stats()},
+            "writes": {"batches": self.writer.batches, "writes": self.writer.writes},
+        }
+
+    async def get_product(self, product_id, query, payload):
+        product = await self.read(services.get_product, product_id)
+        if product is None:
+            raise NotFound(f"Product {product_id} does not exist")
+        return 200, {name: getattr(product, name) for name in product.__slots__}
+
+    async def create(self, name, query, payload):
+        add, _, _, fields = self.resource(name)
+        new_id = await self.writer.submit(add, *(payload.get(field) for field in fields))
+        return 201, {"id": new_id}
+
+    async def update(self, name, key, query, payload):
+        _, update, _, fields = self.resource(name)
+        await self.writer.submit(update, int(key), *(payload.get(field) for field in fields))
+        return 200, {"id": int(key)}
+
+    async def delete(self, name, key, query, payload):
+        _, _, delete, _ = self.resource(name)
+        await self.writer.submit(delete, int(key))
+        return 200, {"id": int(key)}
+
+    async def place_orders(self, query, payload):
+        """Place a list of orders; they are queued together so they share a commit."""
+        fields = RESOURCES["orders"][3]
+        orders = payload.get("orders", [])
+        if not isinstance(orders, list) or not all(isinstance(order, dict) for order in orders):
+            raise ValidationError("Input Error", "orders must be a list of JSON objects.")
+        writes = [self.writer.submit(services.place_order, *(order.get(field) for field in fields))
+                  for order in orders]
+        results = []
+        for outcome in await asyncio.gather(*writes, return_exceptions=True):
+            if isinstance(outcome, ValidationError):
+                results.append({"error": outcome.args[0], "message": outcome.args[1]})
+            elif isinstance(outcome, Exception):
+                results.append({"error": "Server Error", "message": str(outcome)})
+            else:
+                results.append({"id": outcome})
+        return 200, {"results": results}
+
+    async def sales_for_date(self, order_date, query, payload):
+        total = await self.read(services.sales_for_date, order_date)
+        return 200, {"order_date": order_date, "total_sales": total}
+
+    async def report(self, name, query, payload):
+        if name not in REPORTS:
+            raise NotFound(f"Unknown report '{name}'")
+        operation, columns = REPORTS[name]
+        try:
+            threshold = float(query.get("threshold", 0))
+        except ValueError:
+            raise ValidationError("Input Error", "threshold must be a number.")
+        rows = await self.read(operation, threshold)
+        return 200, {"rows": [dict(zip(columns, row)) for row in rows]}
+
+    async def purchase_suggestions(self, query, payload):
+        batches = await self.read(reorder.purchase_suggestions)
+        return 200, {"suppliers": [
+            {"supplier_id": supplier_id, "name": name, "contact": contact,
+             "lines": [dict(zip(reorder.SUGGESTION_COLUMNS, line)) for line in lines]}
+            for supplier_id, name, contact, lines in batches
+        ]}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it open between requests."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                data = json.dumps(payload).encode()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                              f"Content-Type: application/json\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """Start listening; returns the asyncio server."""
+        self.start()
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+class LocalClient:
+    """Stand-in client that calls the Api in-process, without sockets (for tests)."""
+
+    def __init__(self, api):
+        self.api = api
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        return await self.api.dispatch(method, path, body)
+
+    async def close(self):
+        pass
+
+
+class HttpClient:
+    """Minimal asyncio HTTP/1.1 client holding one keep-alive connection."""
+
+    def __init__(self, host="127.0.0.1", port=8080):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """Send one request; returns (status, decoded JSON body)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write((f"{method} {path} HTTP/1.1\r\n"
+                           f"Host: {self.host}\r\n"
+                           f"Content-Type: application/json\r\n"
+                           f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+
+async def serve_forever(host, port, db_path):
+    api = Api(db_path)
+    server = await api.serve(host, port)
+    print(f"Serving the business API on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Business Management System HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    args = parser.parse_args()
+
+    migrate(args.db)
+    try:
+        asyncio.run(serve_forever(args.host, args.port, args.db))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
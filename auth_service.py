@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from config import config
+
+POLL_MS = 20  # How often the Tk thread checks for a finished hash
+
+
+def hash_password(password, rounds):
+    """Hash a password with bcrypt at the given work factor."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def hash_rounds(stored_hash):
+    """Work factor encoded in a bcrypt hash ("$2b$12$..." -> 12)."""
+    return int(stored_hash.split("$")[2])
+
+
+def check_password(password, stored_hash, rounds):
+    """Verify a password and rehash it if the stored cost is out of date.
+
+    Returns (ok, new_hash); new_hash is None unless the password matched and
+    the stored hash used a different work factor than the configured one.
+    """
+    if not bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
+        return False, None
+    if hash_rounds(stored_hash) != rounds:
+        return True, hash_password(password, rounds)
+    return True, None
+
+
+class AuthService:
+    """Run bcrypt hashing and verification on a thread pool.
+
+    bcrypt is deliberately slow, so calling it from a Tk callback freezes the
+    window for the whole hash. Results are handed back to callbacks on the Tk
+    thread, polled with root.after; an exception raised by the hash (e.g. a
+    malformed stored hash) goes to on_error instead.
+    """
+
+    def __init__(self, root, rounds=None, workers=2):
+        self.root = root
+        self.rounds = rounds if rounds is not None else config.getint("auth", "bcrypt_rounds")
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    def hash_password(self, password, callback, on_error):
+        """Hash a new password; callback(hashed) or on_error(exception) runs on the Tk thread."""
+        self.watch(self.pool.submit(hash_password, password, self.rounds), callback, on_error)
+
+    def verify_password(self, password, stored_hash, callback, on_error):
+        """Check a password; callback((ok, new_hash)) or on_error(exception) runs on the Tk thread."""
+        self.watch(self.pool.submit(check_password, password, stored_hash, self.rounds), callback, on_error)
+
+    def watch(self, future, callback, on_error):
+        """Poll the future from the Tk thread and pass its result (or exception) on when done."""
+        if not future.done():
+            self.root.after(POLL_MS, self.watch, future, callback, on_error)
+            return
+        try:
+            result = future.result()
+        except Exception as error:
+            on_error(error)
+        else:
+            callback(result)
+
+    def shutdown(self):
+        """Let running hashes finish, then release the worker threads."""
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,915 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tkinter as tk
+import tracemalloc
+from datetime import date, timedelta
+
+from api import BATCH_SIZE, Api, HttpClient
+from auth_service import check_password, hash_password
+from db import connect, immediate
+import analytics
+import cache
+import columnar
+import reorder
+import repository
+import services
+from maintenance import rebuild_rollups
+from migrations import LATEST_VERSION, migrate
+from reports import REPORTS, VIEW_REPORTS
+from report_viewer import ReportViewer, chart_series
+from repository import SEARCHABLE
+from router import ScreenRouter
+
+
+# Run in a fresh interpreter by bench_startup so every import is cold. Points
+# the app at the scratch database, then times the imports, the login window
+# and, after a simulated login, the dashboard until its first page is loaded.
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from config import config
+config.set("database", "path", sys.argv[1])
+import main
+from login import LoginPage
+from router import ScreenRouter
+timings = {"import_ms": (time.perf_counter() - start) * 1000}
+
+import tkinter as tk
+main.migrate()
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(json.dumps(timings))
+    raise SystemExit
+router = ScreenRouter(root)
+router.show(LoginPage, lambda: None)
+root.update()
+timings["login_ms"] = (time.perf_counter() - start) * 1000
+
+logged_in = time.perf_counter()
+from dashboard import Dashboard
+timings["dashboard_import_ms"] = (time.perf_counter() - logged_in) * 1000
+dashboard = router.show(Dashboard)
+ready = []
+dashboard.db.submit(lambda conn: None, ready.append)  # Runs after the first tab's queries
+while not ready:
+    root.update()
+timings["interactive_ms"] = (time.perf_counter() - logged_in) * 1000
+timings["tabs_built"] = sum(getattr(dashboard, name) is not None for name, _ in dashboard.sections.values())
+router.close()
+print(json.dumps(timings))
+"""
+
+
+def timed(fn, *args, repeat=5):
+    """Median wall time of fn(*args) in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+FIRST_NAMES = ("james mary john patricia robert jennifer michael linda william elizabeth david barbara "
+               "richard susan joseph jessica thomas sarah charles karen christopher nancy daniel lisa "
+               "matthew betty anthony margaret mark sandra donald ashley steven kimberly paul emily").split()
+LAST_NAMES = ("smith johnson williams brown jones garcia miller davis rodriguez martinez hernandez lopez "
+              "gonzalez wilson anderson thomas taylor moore jackson martin lee perez thompson white harris "
+              "sanchez clark ramirez lewis robinson walker young allen king wright scott torres nguyen hill").split()
+DOMAINS = ("example.com", "mail.com", "corp.net", "shop.org")
+
+
+def person(rng, i):
+    """(name, email, phone) for synthetic customer i, drawn from common first and last names."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return (f"{first.title()} {last.title()}", f"{first}.{last}{i}@{rng.choice(DOMAINS)}",
+            f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}")
+
+
+def build_synthetic_db(path, orders, customers=10000, products=1000, version=LATEST_VERSION, seed=1,
+                       people=False):
+    """Create a fresh database at the given schema version filled with random orders.
+
+    Triggers are dropped while the rows are bulk loaded and recreated
+    afterwards, so loading a million orders takes seconds rather than running
+    every per-row trigger. With people=True customers get realistic names,
+    emails and phones (for the search benchmark) instead of "Customer N".
+    """
+    for stale in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    migrate(path, target=version)
+
+    rng = random.Random(seed)
+    start = date(2022, 1, 1)
+    conn = connect(path)
+    triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+
+    if people:
+        customer_rows = ((i, *person(rng, i)) for i in range(1, customers + 1))
+    else:
+        customer_rows = ((i, f"Customer {i}", f"customer{i}@example.com", f"555-{i:07d}")
+                         for i in range(1, customers + 1))
+    conn.executemany("INSERT INTO customers (customer_id, name, email, phone) VALUES (?, ?, ?, ?)", customer_rows)
+    prices = {i: rng.randint(1, 500) for i in range(1, products + 1)}
+    conn.executemany("INSERT INTO products (product_id, name, price, quantity) VALUES (?, ?, ?, ?)",
+                     ((i, f"Product {i}", price, 1000000) for i, price in prices.items()))
+
+    spent = {}
+
+    def order_rows():
+        for _ in range(orders):
+            customer_id = rng.randint(1, customers)
+            product_id = rng.randint(1, products)
+            quantity = rng.randint(1, 5)
+            total_price = prices[product_id] * quantity
+            order_date = (start + timedelta(days=rng.randrange(3 * 365))).isoformat()
+            spent[customer_id] = spent.get(customer_id, 0) + total_price
+            yield customer_id, product_id, quantity, total_price, order_date
+
+    # Staged in the single-product shape, then split into header and line from version 6
+    conn.execute("CREATE TEMP TABLE synthetic_orders (customer_id, product_id, quantity, total_price, order_date)")
+    conn.executemany("INSERT INTO synthetic_orders VALUES (?, ?, ?, ?, ?)", order_rows())
+    if version >= 6:
+        conn.execute("""INSERT INTO orders (order_id, customer_id, total_price, order_date)
+                        SELECT rowid, customer_id, total_price, order_date FROM synthetic_orders""")
+        conn.execute("""INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total)
+                        SELECT rowid, product_id, quantity, total_price / quantity, total_price
+                        FROM synthetic_orders""")
+    else:
+        conn.execute("""INSERT INTO orders (customer_id, product_id, quantity, total_price, order_date)
+                        SELECT customer_id, product_id, quantity, total_price, order_date FROM synthetic_orders""")
+    conn.execute("DROP TABLE synthetic_orders")
+    conn.executemany("UPDATE customers SET total_spent = ? WHERE customer_id = ?",
+                     ((total, customer_id) for customer_id, total in spent.items()))
+    for _, sql in triggers:
+        conn.execute(sql)
+    conn.commit()
+    # Older schemas are only built to time their triggers, and start with empty rollups
+    if version == LATEST_VERSION:
+        rebuild_rollups(conn)
+    if version >= 7:
+        with conn:
+            for table in SEARCHABLE:
+                conn.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+    conn.close()
+
+
+def time_queries(conn, queries, repeat):
+    """Median milliseconds for each named (sql, params list) query."""
+    def run(sql, params_list):
+        for params in params_list:
+            conn.execute(sql, params).fetchall()
+    return {name: timed(run, sql, params_list, repeat=repeat) for name, (sql, params_list) in queries.items()}
+
+
+def bench_indexes(args):
+    """Hot order queries on a synthetic database before and after the index migration."""
+    print(f"Building {args.orders:,} orders in {args.db} ...")
+    build_synthetic_db(args.db, args.orders, version=1)
+
+    rng = random.Random(2)
+    customer_ids = [(rng.randint(1, 10000),) for _ in range(100)]
+    dates = [((date(2022, 1, 1) + timedelta(days=rng.randrange(3 * 365))).isoformat(),) for _ in range(100)]
+    queries = {
+        "trigger: customer spend x100": (
+            "SELECT SUM(total_price) FROM orders WHERE customer_id = ?", customer_ids),
+        "sales for date x100": (
+            "SELECT SUM(total_price) FROM orders WHERE order_date = ?", dates),
+        "sales_summary report": (
+            "SELECT order_date, total_sales FROM sales_summary WHERE total_sales > ? ORDER BY order_date",
+            [(1000,)]),
+        "stock_summary report": (
+            "SELECT product_name, total_sold FROM stock_summary WHERE total_sold > ? ORDER BY total_sold DESC",
+            [(50,)]),
+    }
+
+    conn = connect(args.db)
+    before = time_queries(conn, queries, args.repeat)
+    conn.close()
+    migrate(args.db)
+    conn = connect(args.db)
+    after = time_queries(conn, queries, args.repeat)
+    conn.close()
+
+    print(f"{'query':<30}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}")
+    for name in queries:
+        print(f"{name:<30}  {before[name]:>10.1f}  {after[name]:>10.1f}  {before[name] / after[name]:>7.1f}x")
+
+
+def bench_reports(args):
+    """Analytics report latency through the views versus the rollup tables as orders grow."""
+    thresholds = {"sales": 1000, "stock": 50, "top_customers": 500}
+    print(f"{'orders':>10}  {'report':<14}  {'view ms':>9}  {'rollup ms':>9}  {'speedup':>8}")
+    for orders in args.orders:
+        build_synthetic_db(args.db, orders)
+        conn = connect(args.db)
+        for name, sql in REPORTS.items():
+            params = [(thresholds[name],)]
+            view_ms = time_queries(conn, {name: (VIEW_REPORTS[name], params)}, args.repeat)[name]
+            rollup_ms = time_queries(conn, {name: (sql, params)}, args.repeat)[name]
+            print(f"{orders:>10,}  {name:<14}  {view_ms:>9.1f}  {rollup_ms:>9.1f}  {view_ms / rollup_ms:>7.1f}x")
+        conn.close()
+
+
+def bench_commits(args):
+    """Small committed writes with sqlite's default journal versus the db.connect() pragmas."""
+    def insert_orders(conn):
+        for _ in range(args.transactions):
+            order_id = conn.execute("""INSERT INTO orders (customer_id, total_price, order_date)
+                                       VALUES (1, 1.0, '2024-01-01')""").lastrowid
+            conn.execute("""INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total)
+                            VALUES (?, 1, 1, 1.0, 1.0)""", (order_id,))
+            conn.commit()
+
+    results = {}
+    for name, opener in (("default (rollback journal, FULL)", sqlite3.connect), ("db.connect (WAL, NORMAL)", connect)):
+        build_synthetic_db(args.db, 1000, customers=10, products=10)
+        if opener is sqlite3.connect:
+            conn = connect(args.db)
+            conn.execute("PRAGMA journal_mode = DELETE")  # Undo the WAL switch made by migrate()
+            conn.close()
+        conn = opener(args.db)
+        results[name] = timed(insert_orders, conn, repeat=args.repeat)
+        conn.close()
+
+    print(f"{'connection':<34}  {'ms per commit':>13}")
+    for name, ms in results.items():
+        print(f"{name:<34}  {ms / args.transactions:>13.3f}")
+
+
+def bench_validation(args):
+    """Order validation: the old three point lookups versus the merged order_references statement."""
+    build_synthetic_db(args.db, args.orders)
+    rng = random.Random(3)
+    pairs = [(rng.randint(1, 10000), rng.randint(1, 1000)) for _ in range(args.lookups)]
+    conn = connect(args.db)
+
+    def separate():
+        for customer_id, product_id in pairs:
+            conn.execute("SELECT * FROM customers WHERE customer_id = ?", (customer_id,)).fetchone()
+            conn.execute("SELECT * FROM products WHERE product_id = ?", (product_id,)).fetchone()
+            conn.execute("SELECT price, quantity FROM products WHERE product_id = ?", (product_id,)).fetchone()
+
+    def merged():
+        for customer_id, product_id in pairs:
+            repository.fetchone(conn, "order_references", {"customer_id": customer_id, "product_id": product_id})
+
+    def cached():
+        for customer_id, product_id in pairs:
+            cache.order_records(conn, customer_id, product_id)
+
+    separate_ms = timed(separate, repeat=args.repeat)
+    merged_ms = timed(merged, repeat=args.repeat)
+    cached_ms = timed(cached, repeat=args.repeat)  # The first run fills the cache
+    conn.close()
+    print(f"{'validation':<30}  {'us per order':>12}")
+    print(f"{'3 point lookups':<30}  {separate_ms * 1000 / args.lookups:>12.1f}")
+    print(f"{'order_references (1 query)':<30}  {merged_ms * 1000 / args.lookups:>12.1f}")
+    print(f"{'record cache':<30}  {cached_ms * 1000 / args.lookups:>12.1f}")
+    print()
+    print(repository.metrics.report())
+    print(cache.report())
+
+
+async def load_test(db_path, batch_size, clients, requests, port):
+    """Place orders from concurrent HTTP clients; returns (orders/sec, per-request latencies in ms)."""
+    api = Api(db_path, batch_size=batch_size)
+    server = await api.serve("127.0.0.1", port)
+    rng = random.Random(4)
+    latencies = []
+
+    async def clerk():
+        client = HttpClient("127.0.0.1", port)
+        for _ in range(requests):
+            product_id = rng.randint(1, 1000)
+            status, product = await client.request("GET", f"/products/{product_id}")
+            order = {"customer_id": rng.randint(1, 10000), "order_date": "2024-06-01",
+                     "items": [{"product_id": product_id, "quantity": 1, "price": product["price"]}]}
+            start = time.perf_counter()
+            status, body = await client.request("POST", "/orders", order)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 201:
+                raise RuntimeError(body)
+        await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(clerk() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    batches = api.writer.batches
+    api.close()
+    return clients * requests / elapsed, sorted(latencies), batches
+
+
+def bench_api(args):
+    """Order throughput through the HTTP API with and without group commits."""
+    print(f"{'writes per commit':<18}  {'clients':>7}  {'orders/s':>9}  {'p50 ms':>7}  {'p95 ms':>7}  {'commits':>7}")
+    for batch_size in (1, BATCH_SIZE):
+        for clients in args.clients:
+            build_synthetic_db(args.db, 10000)
+            rate, latencies, batches = asyncio.run(
+                load_test(args.db, batch_size, clients, args.requests, args.port))
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[int(len(latencies) * 0.95)]
+            label = "1" if batch_size == 1 else f"up to {batch_size}"
+            print(f"{label:<18}  {clients:>7}  {rate:>9.0f}  {p50:>7.2f}  {p95:>7.2f}  {batches:>7}")
+
+
+def bench_stress(args):
+    """Clerks on separate threads race for scarce stock; checks that nothing is oversold."""
+    build_synthetic_db(args.db, 1000, customers=1000, products=args.products)
+    conn = connect(args.db)
+    conn.execute("UPDATE products SET quantity = ?", (args.stock,))
+    conn.commit()
+    prices = dict(conn.execute("SELECT product_id, price FROM products"))
+    orders_before = conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    conn.close()
+    cache.clear()
+
+    placed = []
+    rejected = []
+    errors = []
+
+    def clerk(seed):
+        rng = random.Random(seed)
+        conn = connect(args.db)
+        for _ in range(args.attempts):
+            product_id = rng.randint(1, args.products)
+            quantity = rng.randint(1, 3)
+            try:
+                immediate(conn, services.place_order, rng.randint(1, 1000), "2024-06-01",
+                          [(product_id, quantity, prices[product_id])])
+                placed.append((product_id, quantity))
+            except services.ValidationError:
+                rejected.append(product_id)
+            except Exception as error:
+                errors.append(error)
+        conn.close()
+
+    threads = [threading.Thread(target=clerk, args=(seed,)) for seed in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    conn = connect(args.db)
+    stock = dict(conn.execute("SELECT product_id, quantity FROM products"))
+    orders_after = conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    conn.close()
+    sold = {}
+    for product_id, quantity in placed:
+        sold[product_id] = sold.get(product_id, 0) + quantity
+
+    attempts = args.threads * args.attempts
+    print(f"{args.threads} threads, {attempts} attempts in {elapsed:.2f}s ({attempts / elapsed:,.0f} attempts/s, "
+          f"{len(placed) / elapsed:,.0f} orders/s)")
+    print(f"placed {len(placed)}, rejected for stock {len(rejected)}, errors {len(errors)}")
+    oversold = [p for p in stock if stock[p] < 0 or stock[p] != args.stock - sold.get(p, 0)]
+    consistent = orders_after - orders_before == len(placed)
+    print(f"negative or mismatched stock: {len(oversold)} product(s); order rows match placed: {consistent}")
+    if oversold or not consistent or errors:
+        raise SystemExit(1)
+
+
+def bench_baskets(args):
+    """Baskets placed as one single-product order per item versus one order with many lines."""
+    print(f"{'items':>5}  {'order per item ms':>17}  {'multi-line order ms':>19}  {'speedup':>8}")
+    for size in args.sizes:
+        build_synthetic_db(args.db, 10000)
+        conn = connect(args.db)
+        prices = dict(conn.execute("SELECT product_id, price FROM products"))
+        rng = random.Random(size)
+        baskets = [[(product_id, rng.randint(1, 3), prices[product_id])
+                    for product_id in rng.sample(sorted(prices), size)] for _ in range(args.baskets)]
+
+        def order_per_item():
+            # One transaction, commit and set of trigger firings per product
+            for basket in baskets:
+                for item in basket:
+                    immediate(conn, services.place_order, 1, "2024-06-01", [item])
+
+        def multi_line():
+            for basket in baskets:
+                immediate(conn, services.place_order, 1, "2024-06-01", basket)
+
+        per_item_ms = timed(order_per_item, repeat=args.repeat) / args.baskets
+        basket_ms = timed(multi_line, repeat=args.repeat) / args.baskets
+        conn.close()
+        print(f"{size:>5}  {per_item_ms:>17.3f}  {basket_ms:>19.3f}  {per_item_ms / basket_ms:>7.1f}x")
+
+
+def bench_startup(args):
+    """Cold start: import time, time to the login window and from login to an interactive dashboard."""
+    build_synthetic_db(args.db, args.orders)
+    runs = []
+    for _ in range(args.repeat):
+        probe = subprocess.run([sys.executable, "-c", STARTUP_PROBE, os.path.abspath(args.db)],
+                               cwd=os.path.dirname(os.path.abspath(__file__)),
+                               capture_output=True, text=True, check=True)
+        runs.append(json.loads(probe.stdout.strip().splitlines()[-1]))
+
+    labels = [("import_ms", "import main (login modules)"),
+              ("login_ms", "start to login window drawn"),
+              ("dashboard_import_ms", "import dashboard after login"),
+              ("interactive_ms", "login to dashboard interactive")]
+    print(f"{'step':<32}  {'median ms':>9}")
+    for key, label in labels:
+        samples = [run[key] for run in runs if key in run]
+        value = f"{statistics.median(samples):>9.1f}" if samples else f"{'no display':>9}"
+        print(f"{label:<32}  {value}")
+    if "tabs_built" in runs[0]:
+        print(f"tabs built at startup: {runs[0]['tabs_built']}")
+
+
+def stack_depth():
+    """Number of Python frames on the current call stack."""
+    frame, depth = sys._getframe(1), 0
+    while frame is not None:
+        frame, depth = frame.f_back, depth + 1
+    return depth
+
+
+def bench_screens(args):
+    """Toggle login and signup in one window; fails if memory, stack depth, threads or widgets grow."""
+    from login import LoginPage
+    from signup import SignupPage
+
+    build_synthetic_db(args.db, 0, customers=0, products=0)
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        # A regression check that cannot run must not pass; on a headless machine use xvfb-run
+        raise SystemExit(f"No display, so the screen check could not run ({error}). "
+                         f"Run it under a virtual display: xvfb-run python benchmark.py screens")
+    router = ScreenRouter(root, args.db)
+    router.show(LoginPage, lambda: None)
+    depths = []
+    baseline = {}
+
+    def toggle(i):
+        # Runs from the mainloop like a button click; with nested mainloops
+        # every switch would run one level deeper than the last
+        depths.append(stack_depth())
+        if isinstance(router.screen, SignupPage):
+            router.screen.back_to_login()
+        else:
+            router.screen.signup()
+        if i == args.warmup:
+            tracemalloc.start()
+            baseline.update(memory=tracemalloc.get_traced_memory()[0], threads=threading.active_count(),
+                            commands=len(root.tk.call("info", "commands")))
+        if i < args.toggles:
+            root.after_idle(toggle, i + 1)
+        else:
+            root.quit()
+
+    start = time.perf_counter()
+    root.after_idle(toggle, 0)
+    root.mainloop()
+    elapsed = time.perf_counter() - start
+
+    growth_kb = (tracemalloc.get_traced_memory()[0] - baseline["memory"]) / 1024
+    tracemalloc.stop()
+    threads = threading.active_count() - baseline["threads"]
+    commands = len(root.tk.call("info", "commands")) - baseline["commands"]
+    depth = max(depths) - min(depths)
+    windows = len(root.winfo_children())
+    router.close()
+
+    print(f"{args.toggles} login/signup switches in {elapsed:.2f}s ({elapsed * 1000 / args.toggles:.2f} ms each)")
+    print(f"memory growth {growth_kb:.1f} KiB, stack depth growth {depth}, extra threads {threads}, "
+          f"extra Tcl commands {commands}, frames under root {windows}")
+    if growth_kb > args.max_growth_kb or depth or threads > 0 or commands > 0 or windows != 1:
+        raise SystemExit(1)
+
+
+def bench_viewer(args):
+    """Report rendering as the report grows: the report viewer pane versus building the old messagebox text."""
+    rng = random.Random(4)
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        root = None
+        print(f"Tk rendering skipped: no display ({error})")
+    viewer = ReportViewer(root) if root else None
+    if viewer:
+        viewer.grid(row=0, column=0, sticky="nsew")
+
+    print(f"{'rows':>10}  {'old text ms':>11}  {'series ms (worker)':>18}  {'show ms (Tk)':>12}  {'scroll ms':>9}")
+    for count in args.rows:
+        day = date(2000, 1, 1)
+        rows = [((day + timedelta(days=i)).isoformat(), rng.uniform(0, 5000)) for i in range(count)]
+
+        def old_text():
+            report = "Sales Report:\n"
+            for row in rows:
+                report += f"Date: {row[0]}, Total Sales: {row[1]:.2f}\n"
+            return report
+
+        text_ms = timed(old_text, repeat=args.repeat)
+        series_ms = timed(chart_series, [row[0] for row in rows], [row[1] for row in rows], repeat=args.repeat)
+        if viewer:
+            series = chart_series([row[0] for row in rows], [row[1] for row in rows])
+
+            def show():
+                viewer.show("Sales Report", ["date", "total_sales"], rows,
+                            format_row=lambda row: (row[0], f"{row[1]:.2f}"), series=series)
+                root.update_idletasks()
+
+            def scroll():
+                for fraction in (0.25, 0.5, 0.75, 1.0):
+                    viewer.table.on_scrollbar("moveto", fraction)
+                root.update_idletasks()
+
+            show_ms = f"{timed(show, repeat=args.repeat):>12.1f}"
+            scroll_ms = f"{timed(scroll, repeat=args.repeat) / 4:>9.2f}"
+        else:
+            show_ms, scroll_ms = f"{'-':>12}", f"{'-':>9}"
+        print(f"{count:>10,}  {text_ms:>11.1f}  {series_ms:>18.1f}  {show_ms}  {scroll_ms}")
+    if root:
+        root.destroy()
+
+
+def bench_search(args):
+    """Search-box latency on a large customer table: FTS5 prefix queries versus LIKE scans."""
+    print(f"Building {args.customers:,} customers in {args.db} ...")
+    build_synthetic_db(args.db, 0, customers=args.customers, products=10, people=True)
+    conn = connect(args.db)
+    print(f"{'typed':<22}  {'matches':>8}  {'fts ms':>8}  {'LIKE ms':>8}")
+    for text in args.queries:
+        pattern = f"%{text}%"
+        like_sql = "SELECT * FROM customers WHERE name LIKE ? OR email LIKE ? OR phone LIKE ? LIMIT ?"
+        fts_ms = timed(services.search, conn, "customers", text, repeat=args.repeat)
+        like_ms = timed(lambda: conn.execute(like_sql, (pattern, pattern, pattern,
+                                                        services.SEARCH_LIMIT)).fetchall(), repeat=args.repeat)
+        query = services.match_query(text)
+        matches = conn.execute("SELECT COUNT(*) FROM customers_fts WHERE customers_fts MATCH ?",
+                               (query,)).fetchone()[0]
+        print(f"{text:<22}  {matches:>8,}  {fts_ms:>8.2f}  {like_ms:>8.2f}")
+    conn.close()
+
+
+def bench_trend(args):
+    """Sales trend over three years: bucket tables versus grouping the orders table."""
+    naive = {
+        "day": "order_date",
+        "week": "date(order_date, '-' || ((strftime('%w', order_date) + 6) % 7) || ' days')",
+        "month": "strftime('%Y-%m', order_date)",
+        "quarter": "strftime('%Y', order_date) || '-Q' || ((strftime('%m', order_date) + 2) / 3)",
+    }
+    start, end = "2022-01-01", "2024-12-31"
+    print(f"{'orders':>11}  {'grain':<8}  {'periods':>7}  {'GROUP BY ms':>11}  {'buckets ms':>10}")
+    for orders in args.orders:
+        build_synthetic_db(args.db, orders)
+        conn = connect(args.db)
+        for grain in analytics.GRAINS:
+            sql = f"""SELECT {naive[grain]} AS period, SUM(total_price), COUNT(*) FROM orders
+                      WHERE order_date BETWEEN ? AND ? GROUP BY period ORDER BY period"""
+            group_ms = timed(lambda: conn.execute(sql, (start, end)).fetchall(), repeat=args.repeat)
+            periods = len(analytics.sales_trend(conn, grain, start, end))
+            # trend_rows rather than sales_trend, which would answer from the report cache
+            bucket_ms = timed(analytics.trend_rows, conn, grain, date.fromisoformat(start),
+                              date.fromisoformat(end), repeat=args.repeat)
+            print(f"{orders:>11,}  {grain:<8}  {periods:>7}  {group_ms:>11.1f}  {bucket_ms:>10.2f}")
+        conn.close()
+
+    # What the extra triggers cost each order write
+    print(f"\n{'schema':<26}  {'ms per order':>12}")
+    for version in (7, 8):
+        build_synthetic_db(args.db, 10000, version=version)
+        conn = connect(args.db)
+
+        def write_orders():
+            for i in range(args.writes):
+                conn.execute("INSERT INTO orders (customer_id, total_price, order_date) VALUES (1, 10.0, ?)",
+                             ((date(2022, 1, 1) + timedelta(days=i % 1000)).isoformat(),))
+            conn.commit()
+
+        ms = timed(write_orders, repeat=3)
+        print(f"{f'version {version}':<26}  {ms / args.writes:>12.4f}")
+        conn.close()
+
+
+def bench_report_cache(args):
+    """Reports through the report cache: cold, repeated, raised threshold and after a new order."""
+    rng = random.Random(3)
+    print(f"{'orders':>11}  {'report':<22}  {'cold ms':>9}  {'repeat ms':>9}  {'raised ms':>9}  "
+          f"{'after order ms':>14}  {'same':>5}")
+    for orders in args.orders:
+        build_synthetic_db(args.db, orders)
+        conn = connect(args.db)
+        reports = {
+            "sales_report": lambda threshold: services.sales_report(conn, threshold),
+            "stock_report": lambda threshold: services.stock_report(conn, threshold),
+            "top_customers_report": lambda threshold: services.top_customers_report(conn, threshold),
+            "sales_trend": lambda threshold: analytics.sales_trend(conn, "month", "2022-01-01", "2024-12-31"),
+            "sales_analysis": lambda threshold: analytics.sales_analysis(conn, backend="sql"),
+        }
+        thresholds = {"sales_report": 1000, "stock_report": 50, "top_customers_report": 500}
+        for name, run in reports.items():
+            threshold = thresholds.get(name, 0)
+            cache.reports.clear()
+            cold_ms = timed(run, threshold, repeat=1)
+            repeat_ms = timed(run, threshold, repeat=args.repeat)
+            raised_ms = timed(run, threshold * 2, repeat=args.repeat)
+
+            def after_order():
+                conn.execute("INSERT INTO orders (customer_id, total_price, order_date) VALUES (?, 10.0, ?)",
+                             (rng.randint(1, 10000), "2024-06-01"))
+                conn.commit()
+                start = time.perf_counter()
+                run(threshold)
+                return (time.perf_counter() - start) * 1000
+
+            order_ms = after_order()
+            # Cached rows must match a fresh run of the report
+            cached = run(threshold * 2)
+            cache.reports.clear()
+            same = cached == run(threshold * 2)
+            print(f"{orders:>11,}  {name:<22}  {cold_ms:>9.1f}  {repeat_ms:>9.3f}  {raised_ms:>9.3f}  "
+                  f"{order_ms:>14.1f}  {'yes' if same else 'NO':>5}")
+        conn.close()
+    print(f"\n{cache.report()}")
+
+    # What the version counter triggers cost each order write
+    print(f"\n{'schema':<26}  {'ms per order':>12}")
+    for version in (8, 9):
+        build_synthetic_db(args.db, 10000, version=version)
+        conn = connect(args.db)
+
+        def write_orders():
+            for i in range(args.writes):
+                conn.execute("INSERT INTO orders (customer_id, total_price, order_date) VALUES (1, 10.0, ?)",
+                             ((date(2022, 1, 1) + timedelta(days=i % 1000)).isoformat(),))
+            conn.commit()
+
+        ms = timed(write_orders, repeat=3)
+        print(f"{f'version {version}':<26}  {ms / args.writes:>12.4f}")
+        conn.close()
+
+
+def bench_reorder(args):
+    """Reorder points, low-stock alerts kept by triggers versus a polling scan, and purchase suggestions."""
+    # Polling: every product checked against its reorder point on each look
+    poll = """SELECT p.product_id FROM products p JOIN reorder_points r ON r.product_id = p.product_id
+              WHERE p.quantity <= r.reorder_point ORDER BY p.product_id"""
+    print(f"{'products':>9}  {'refresh ms':>10}  {'alerts':>7}  {'poll ms':>8}  {'alerts ms':>9}  "
+          f"{'suggest ms':>10}  {'batches':>7}  {'same':>5}")
+    for products in args.products:
+        build_synthetic_db(args.db, args.orders, products=products)
+        conn = connect(args.db)
+        rng = random.Random(4)
+        conn.executemany("INSERT INTO suppliers (name, contact, product_supplied) VALUES (?, ?, ?)",
+                         ((f"Vendor {i % args.vendors}", f"vendor{i % args.vendors}@example.com", i)
+                          for i in range(1, products + 1)))
+        conn.commit()
+        refresh_ms = timed(lambda: (reorder.refresh_reorder_points(conn), conn.commit()), repeat=args.repeat)
+        # Bring stock to around each reorder point; the triggers flag those at or under it
+        conn.execute("UPDATE products SET quantity = (SELECT reorder_point FROM reorder_points r "
+                     "WHERE r.product_id = products.product_id) + abs(random()) % 40 - 10")
+        conn.commit()
+
+        poll_ms = timed(lambda: conn.execute(poll).fetchall(), repeat=args.repeat)
+        alerts_ms = timed(lambda: conn.execute("SELECT product_id FROM stock_alerts ORDER BY product_id").fetchall(),
+                          repeat=args.repeat)
+        alerts = conn.execute("SELECT product_id FROM stock_alerts ORDER BY product_id").fetchall()
+        same = alerts == conn.execute(poll).fetchall()
+        suggest_ms = timed(reorder.purchase_suggestions, conn, repeat=args.repeat)
+        batches = reorder.purchase_suggestions(conn)
+        print(f"{products:>9,}  {refresh_ms:>10.1f}  {len(alerts):>7,}  {poll_ms:>8.2f}  {alerts_ms:>9.2f}  "
+              f"{suggest_ms:>10.2f}  {len(batches):>7}  {'yes' if same else 'NO':>5}")
+
+        # After random stock movements the trigger-kept alerts must still match a full scan
+        for _ in range(args.writes):
+            product_id = rng.randint(1, products)
+            if rng.random() < 0.8:
+                repository.execute(conn, "reserve_stock", {"product_id": product_id, "quantity": rng.randint(1, 5)})
+            else:
+                conn.execute("UPDATE products SET quantity = quantity + 25 WHERE product_id = ?", (product_id,))
+        conn.commit()
+        alerts = conn.execute("SELECT product_id FROM stock_alerts ORDER BY product_id").fetchall()
+        print(f"{'':>9}  after {args.writes:,} stock changes: {len(alerts):,} alerts, "
+              f"match a full scan: {'yes' if alerts == conn.execute(poll).fetchall() else 'NO'}")
+        conn.close()
+
+    # What the alert triggers cost each stock reservation
+    print(f"\n{'schema':<26}  {'ms per reservation':>18}")
+    for version in (9, 10):
+        build_synthetic_db(args.db, 10000, products=1000, version=version)
+        conn = connect(args.db)
+        if version == 10:
+            reorder.refresh_reorder_points(conn)
+            conn.commit()
+        rng = random.Random(5)
+
+        def reserve():
+            for _ in range(args.writes):
+                repository.execute(conn, "reserve_stock", {"product_id": rng.randint(1, 1000), "quantity": 1})
+            conn.commit()
+
+        ms = timed(reserve, repeat=3)
+        print(f"{f'version {version}':<26}  {ms / args.writes:>18.4f}")
+        conn.close()
+
+
+def same_rows(expected, actual):
+    """True if two result lists match, floats compared to a relative 1e-9."""
+    if len(expected) != len(actual):
+        return False
+    for row, other in zip(expected, actual):
+        for a, b in zip(row, other):
+            if isinstance(a, float) or isinstance(b, float):
+                if abs(a - b) > 1e-9 * max(1, abs(a)):
+                    return False
+            elif a != b:
+                return False
+    return True
+
+
+def bench_columnar(args):
+    """Sales analyses: one SQL aggregation each versus one NumPy load shared by all four."""
+    print(f"{'orders':>11}  {'analysis':<14}  {'sql ms':>9}  {'numpy ms':>9}  {'same':>5}")
+    for orders in args.orders:
+        build_synthetic_db(args.db, orders)
+        conn = connect(args.db)
+        # A walk-in order with no customer, which both backends must leave out of the customer analyses
+        with conn:
+            order_id = conn.execute("""INSERT INTO orders (customer_id, total_price, order_date)
+                                       SELECT NULL, 1e9, MAX(order_date) FROM orders""").lastrowid
+            conn.execute("""INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total)
+                            VALUES (?, 1, 1, 1e9, 1e9)""", (order_id,))
+        queries = {
+            "top_customers": lambda: repository.fetchall(conn, "top_customers_analysis", (analytics.ANALYSIS_TOP,)),
+            "abc": lambda: repository.fetchall(conn, "abc_analysis", {"a_limit": analytics.ABC_LIMITS[0],
+                                                                       "b_limit": analytics.ABC_LIMITS[1]}),
+            "repeat_rates": lambda: repository.fetchall(conn, "repeat_rates_analysis"),
+            "velocity": lambda: repository.fetchall(conn, "velocity_analysis", {
+                "days": analytics.VELOCITY_DAYS, "window": f"-{analytics.VELOCITY_DAYS - 1} days"}),
+        }
+        load_ms = timed(columnar.OrderColumns.load, conn, repeat=args.repeat)
+        columns = columnar.OrderColumns.load(conn)
+        vectorized = {
+            "top_customers": lambda: columns.top_customers(conn, analytics.ANALYSIS_TOP),
+            "abc": lambda: columns.abc_classes(conn, analytics.ABC_LIMITS),
+            "repeat_rates": columns.repeat_rates,
+            "velocity": lambda: columns.velocity(conn, analytics.VELOCITY_DAYS),
+        }
+        print(f"{orders:>11,}  {'load arrays':<14}  {'':>9}  {load_ms:>9.1f}")
+        sql_total, numpy_total = 0, load_ms
+        for name, query in queries.items():
+            sql_ms = timed(query, repeat=args.repeat)
+            numpy_ms = timed(vectorized[name], repeat=args.repeat)
+            sql_total += sql_ms
+            numpy_total += numpy_ms
+            same = same_rows(query(), vectorized[name]())
+            print(f"{orders:>11,}  {name:<14}  {sql_ms:>9.1f}  {numpy_ms:>9.1f}  {'yes' if same else 'NO':>5}")
+        print(f"{orders:>11,}  {'all four':<14}  {sql_total:>9.1f}  {numpy_total:>9.1f}")
+        conn.close()
+
+
+def bench_login(args):
+    """Login (verify) and signup (hash) latency at each bcrypt work factor."""
+    password = "correct horse battery staple"
+    print(f"{'cost':>4}  {'signup hash ms':>14}  {'login verify ms':>15}")
+    for rounds in range(args.min_cost, args.max_cost + 1):
+        stored = hash_password(password, rounds)
+        hash_ms = timed(hash_password, password, rounds, repeat=args.repeat)
+        verify_ms = timed(check_password, password, stored, rounds, repeat=args.repeat)
+        print(f"{rounds:>4}  {hash_ms:>14.1f}  {verify_ms:>15.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Business Management System micro-benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    login = commands.add_parser("login", help="bcrypt login latency per work factor")
+    login.add_argument("--min-cost", type=int, default=4)
+    login.add_argument("--max-cost", type=int, default=14)
+    login.add_argument("--repeat", type=int, default=5)
+    login.set_defaults(run=bench_login)
+
+    indexes = commands.add_parser("indexes", help="order queries before/after the index migration")
+    indexes.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    indexes.add_argument("--orders", type=int, default=1000000)
+    indexes.add_argument("--repeat", type=int, default=3)
+    indexes.set_defaults(run=bench_indexes)
+
+    report = commands.add_parser("reports", help="analytics reports: views versus rollup tables")
+    report.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    report.add_argument("--orders", type=int, nargs="+", default=[10000, 100000, 1000000])
+    report.add_argument("--repeat", type=int, default=3)
+    report.set_defaults(run=bench_reports)
+
+    commits = commands.add_parser("commits", help="commit latency: default journal versus WAL pragmas")
+    commits.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    commits.add_argument("--transactions", type=int, default=500)
+    commits.add_argument("--repeat", type=int, default=3)
+    commits.set_defaults(run=bench_commits)
+
+    validation = commands.add_parser("validation", help="order validation: separate versus merged lookups")
+    validation.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    validation.add_argument("--orders", type=int, default=10000)
+    validation.add_argument("--lookups", type=int, default=10000)
+    validation.add_argument("--repeat", type=int, default=5)
+    validation.set_defaults(run=bench_validation)
+
+    api = commands.add_parser("api", help="HTTP API load test: concurrent clerks placing orders")
+    api.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    api.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    api.add_argument("--requests", type=int, default=200, help="orders placed by each client")
+    api.add_argument("--port", type=int, default=8765)
+    api.set_defaults(run=bench_api)
+
+    stress = commands.add_parser("stress", help="concurrent order placement against scarce stock")
+    stress.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    stress.add_argument("--threads", type=int, default=8)
+    stress.add_argument("--attempts", type=int, default=500, help="orders attempted by each thread")
+    stress.add_argument("--products", type=int, default=20)
+    stress.add_argument("--stock", type=int, default=200, help="starting stock of every product")
+    stress.set_defaults(run=bench_stress)
+
+    baskets = commands.add_parser("baskets", help="multi-item baskets: order per item versus one multi-line order")
+    baskets.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    baskets.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20])
+    baskets.add_argument("--baskets", type=int, default=200, help="baskets placed per run")
+    baskets.add_argument("--repeat", type=int, default=3)
+    baskets.set_defaults(run=bench_baskets)
+
+    startup = commands.add_parser("startup", help="cold start time to login window and interactive dashboard")
+    startup.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    startup.add_argument("--orders", type=int, default=100000)
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.set_defaults(run=bench_startup)
+
+    screens = commands.add_parser("screens", help="switch login/signup repeatedly; check nothing accumulates")
+    screens.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    screens.add_argument("--toggles", type=int, default=1000)
+    screens.add_argument("--warmup", type=int, default=20, help="switches before the baseline is taken")
+    screens.add_argument("--max-growth-kb", type=float, default=512)
+    screens.set_defaults(run=bench_screens)
+
+    search = commands.add_parser("search", help="customer search latency: FTS5 versus LIKE")
+    search.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    search.add_argument("--customers", type=int, default=1000000)
+    search.add_argument("--queries", nargs="+",
+                        default=["j", "jo", "john", "john smi", "smith", "christopher lee", "mary.smith12",
+                                 "555-12", "555-123-45", "zzz"])
+    search.add_argument("--repeat", type=int, default=5)
+    search.set_defaults(run=bench_search)
+
+    trend = commands.add_parser("trend", help="three-year sales trend: bucket tables versus GROUP BY")
+    trend.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    trend.add_argument("--orders", type=int, nargs="+", default=[1000000, 10000000])
+    trend.add_argument("--writes", type=int, default=10000, help="orders written to time the triggers")
+    trend.add_argument("--repeat", type=int, default=5)
+    trend.set_defaults(run=bench_trend)
+
+    columnar = commands.add_parser("columnar", help="sales analyses: SQL aggregations versus NumPy arrays")
+    columnar.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    columnar.add_argument("--orders", type=int, nargs="+", default=[100000, 1000000, 10000000])
+    columnar.add_argument("--repeat", type=int, default=3)
+    columnar.set_defaults(run=bench_columnar)
+
+    report_cache = commands.add_parser("report-cache", help="report latency through the version-keyed report cache")
+    report_cache.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    report_cache.add_argument("--orders", type=int, nargs="+", default=[100000, 1000000])
+    report_cache.add_argument("--writes", type=int, default=10000, help="orders written to time the triggers")
+    report_cache.add_argument("--repeat", type=int, default=5)
+    report_cache.set_defaults(run=bench_report_cache)
+
+    reorder_points = commands.add_parser("reorder", help="low-stock alerts: triggers versus polling, purchase suggestions")
+    reorder_points.add_argument("--db", default="bench.db", help="scratch database file (overwritten)")
+    reorder_points.add_argument("--orders", type=int, default=1000000)
+    reorder_points.add_argument("--products", type=int, nargs="+", default=[1000, 10000, 100000])
+    reorder_points.add_argument("--vendors", type=int, default=50, help="distinct supplier names")
+    reorder_points.add_argument("--writes", type=int, default=10000, help="stock changes made to time the triggers")
+    reorder_points.add_argument("--repeat", type=int, default=5)
+    reorder_points.set_defaults(run=bench_reorder)
+
+    viewer = commands.add_parser("viewer", help="report rendering: viewer pane versus messagebox text")
+    viewer.add_argument("--rows", type=int, nargs="+", default=[1000, 100000, 1000000])
+    viewer.add_argument("--repeat", type=int, default=3)
+    viewer.set_defaults(run=bench_viewer)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import threading
+import time
+from collections import OrderedDict
+
+import repository
+from config import config
+from db import after_transaction
+
+
+class ProductRecord:
+    __slots__ = ("product_id", "name", "price", "quantity")
+
+    def __init__(self, product_id, name, price, quantity):
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.quantity = quantity
+
+
+class CustomerRecord:
+    __slots__ = ("customer_id", "name", "email", "phone")
+
+    def __init__(self, customer_id, name, email, phone):
+        self.customer_id = customer_id
+        self.name = name
+        self.email = email
+        self.phone = phone
+
+
+def as_key(value):
+    """Primary keys arrive as ints from the Treeview and as text from entry fields."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RecordCache:
+    """Bounded LRU of records keyed by primary key, each entry expiring after ttl seconds.
+
+    The write paths invalidate exactly the keys they change; the TTL only
+    bounds how long a change made outside this process (importer CLI,
+    another instance) can go unseen. Unknown keys are not cached, so a row
+    inserted elsewhere is found on the next lookup.
+
+    A key written by an open transaction is held (see invalidate_on_commit):
+    until that transaction ends, a reader on another connection still sees
+    the old row, so puts of the key are refused. Ending the transaction
+    bumps generation, which turns away puts of rows read before it ended.
+    """
+
+    def __init__(self, name, max_size, ttl):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (record, loaded_at)
+        self.held = {}                # key -> open transactions that wrote it
+        self.held_all = 0             # Open transactions that wrote unknown keys
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Cached record for the key, or None on a miss (counted)."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                record, loaded_at = entry
+                if time.monotonic() - loaded_at < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return record
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, record, generation=None):
+        """Cache a record read while generation was current (refused if writes have ended since)."""
+        if record is None:
+            return
+        with self.lock:
+            if self.held_all or key in self.held or generation not in (None, self.generation):
+                return
+            self.entries[key] = (record, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in map(as_key, keys):
+                if self.entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def hold(self, keys):
+        """Drop the keys (every key if None) and refuse puts of them until release()."""
+        if keys is None:
+            self.clear()
+        else:
+            self.invalidate(*keys)
+        with self.lock:
+            if keys is None:
+                self.held_all += 1
+            for key in keys or ():
+                self.held[key] = self.held.get(key, 0) + 1
+
+    def release(self, keys):
+        """End a hold(); entries cached meanwhile from uncommitted reads are dropped again."""
+        with self.lock:
+            self.generation += 1
+            if keys is None:
+                self.held_all -= 1
+            for key in keys or ():
+                if self.held[key] == 1:
+                    del self.held[key]
+                else:
+                    self.held[key] -= 1
+        if keys is None:
+            self.clear()
+        else:
+            self.invalidate(*keys)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def invalidate_on_commit(cache, keys=None):
+    """Invalidate the keys written by the current transaction (every key when keys is None).
+
+    The entries are dropped now and kept out of the cache until the
+    transaction commits or rolls back (db.after_transaction), so no reader
+    can cache the old row in between.
+    """
+    held = None if keys is None else [as_key(key) for key in keys]
+    cache.hold(held)
+    after_transaction(lambda: cache.release(held))
+
+
+class ReportCache:
+    """Bounded LRU of report results, each stored with the data versions it was computed from.
+
+    The versions are the data_versions counters (migration 9) of the tables
+    the report reads. Triggers bump them on every write, from this process
+    or any other, so an entry is used only while nothing it depends on has
+    changed; a new order invalidates the order reports but not, say, a
+    result that only reads product names. Results are shared between
+    callers and must not be modified.
+    """
+
+    def __init__(self, name, max_size):
+        self.name = name
+        self.max_size = max_size
+        self.entries = OrderedDict()  # key -> (versions, result)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, versions, usable=None):
+        """The result cached under key for these versions (a hit), or None (a miss).
+
+        usable(result) can reject an entry that is current but cannot answer
+        this request; that counts as a miss and the entry is kept.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] != versions:
+                del self.entries[key]  # Written under versions that are gone
+                self.invalidations += 1
+                entry = None
+            if entry is None or (usable is not None and not usable(entry[1])):
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, versions, result):
+        with self.lock:
+            self.entries[key] = (versions, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+section = config["cache"]
+products = RecordCache("products", section.getint("products"), section.getfloat("ttl_seconds"))
+customers = RecordCache("customers", section.getint("customers"), section.getfloat("ttl_seconds"))
+reports = ReportCache("reports", section.getint("reports"))
+
+
+def order_records(conn, customer_id, product_id):
+    """(CustomerRecord or None, ProductRecord or None) for an order, with no query when both are cached.
+
+    On any miss both rows are read in a single order_references round trip.
+    """
+    customer_key, product_key = as_key(customer_id), as_key(product_id)
+    customer_generation, product_generation = customers.generation, products.generation
+    customer = customers.get(customer_key)
+    product = products.get(product_key)
+    if customer is not None and product is not None:
+        return customer, product
+    if customer_key is None or product_key is None:
+        return customer, product
+
+    row = repository.fetchone(conn, "order_references", {"customer_id": customer_key, "product_id": product_key})
+    if customer is None and row[0] is not None:
+        customer = CustomerRecord(*row[0:4])
+        customers.put(customer_key, customer, customer_generation)
+    if product is None and row[4] is not None:
+        product = ProductRecord(*row[4:8])
+        products.put(product_key, product, product_generation)
+    return customer, product
+
+
+def product(conn, product_id):
+    """ProductRecord for the key (read through the cache), or None."""
+    key = as_key(product_id)
+    generation = products.generation
+    record = products.get(key)
+    if record is None and key is not None:
+        row = repository.fetchone(conn, "product_record", (key,))
+        if row is not None:
+            record = ProductRecord(*row)
+            products.put(key, record, generation)
+    return record
+
+
+def customer(conn, customer_id):
+    """CustomerRecord for the key (read through the cache), or None."""
+    key = as_key(customer_id)
+    generation = customers.generation
+    record = customers.get(key)
+    if record is None and key is not None:
+        row = repository.fetchone(conn, "customer_record", (key,))
+        if row is not None:
+            record = CustomerRecord(*row)
+            customers.put(key, record, generation)
+    return record
+
+
+def data_versions(conn, tables):
+    """Current data_versions counters of the given tables, as a tuple."""
+    versions = dict(repository.fetchall(conn, "data_versions"))
+    return tuple(versions[table] for table in tables)
+
+
+def report_result(conn, key, tables, compute):
+    """compute() through the report cache; key names the report and its parameters.
+
+    The counters are read before the report runs, so a write that lands
+    in between leaves the result stored under the older counters, where
+    it is never used again. Inside an open transaction (a DBExecutor
+    batch) the counters and data may include writes that are later rolled
+    back, so the result is computed but not stored.
+    """
+    versions = data_versions(conn, tables)
+    result = reports.get(key, versions)
+    if result is None:
+        result = compute()
+        if not conn.in_transaction:
+            reports.put(key, versions, result)
+    return result
+
+
+def threshold_report(conn, name, threshold, tables):
+    """Rows of a registered "value > threshold" report, in the report's order.
+
+    One result per report is cached, from the lowest threshold asked for
+    since its tables last changed; a repeated or raised threshold is
+    filtered from it in memory. The thresholded value is the second column.
+    """
+    versions = data_versions(conn, tables)
+    cached = reports.get((name,), versions, usable=lambda result: result[0] <= threshold)
+    if cached is not None:
+        low, rows = cached
+        return rows if low == threshold else [row for row in rows if row[1] > threshold]
+    rows = repository.fetchall(conn, name, (threshold,))
+    if not conn.in_transaction:  # See report_result
+        reports.put((name,), versions, (threshold, rows))
+    return rows
+
+
+def clear():
+    """Drop everything, e.g. after a bulk import."""
+    products.clear()
+    customers.clear()
+    reports.clear()
+
+
+def report():
+    """Plain-text statistics for the record and report caches."""
+    lines = []
+    for cache in (products, customers, reports):
+        s = cache.stats()
+        lines.append(f"{cache.name.title()}: {s['size']}/{s['max_size']} cached, "
+                     f"{s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.1%} hit rate), "
+                     f"{s['evictions']} evicted, {s['invalidations']} invalidated")
+    return "\n".join(lines)
@@ -0,0 +1,159 @@
+FETCH_SIZE = 50000  # Rows converted to arrays at a time
+
+# order_date becomes days since 1970-01-01, which NumPy reads as datetime64[D];
+# orders without a customer get customer_id -1, which the customer analyses skip
+ORDER_COLUMNS = """
+    SELECT order_id, COALESCE(customer_id, -1), CAST(julianday(order_date) - 2440587.5 AS INTEGER), total_price
+    FROM orders
+    ORDER BY order_id
+"""
+LINE_COLUMNS = "SELECT order_id, product_id, quantity, line_total FROM order_items"
+
+
+def numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The columnar analytics backend requires numpy (pip install numpy)")
+    return numpy
+
+
+def available():
+    """True if numpy is installed."""
+    try:
+        numpy()
+    except ImportError:
+        return False
+    return True
+
+
+def load_columns(conn, sql, dtype):
+    """Run a query and return its rows as a NumPy structured array.
+
+    The cursor is stepped with fetchmany and each batch converted on its
+    own, so the Python row tuples never outnumber FETCH_SIZE.
+    """
+    np = numpy()
+    cursor = conn.execute(sql)
+    chunks = []
+    try:
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=dtype))
+    finally:
+        cursor.close()
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+
+def ranked(np, ids, values, n=None):
+    """ids ordered by value, highest first and ties by id, keeping only the top n (with every tie at the cut)."""
+    if n is not None and len(ids) > n:
+        threshold = np.partition(values, len(values) - n)[len(values) - n]
+        keep = values >= threshold
+        ids, values = ids[keep], values[keep]
+    order = np.lexsort((ids, -values))
+    return ids[order][:n], values[order][:n]
+
+
+def names(conn, table, key, ids):
+    """{id: name} for the given ids of a table."""
+    ids = [int(i) for i in ids]
+    result = {}
+    for start in range(0, len(ids), 500):  # Stay under SQLite's bound parameter limit
+        chunk = ids[start:start + 500]
+        result.update(conn.execute(f"SELECT {key}, name FROM {table} WHERE {key} IN ({', '.join('?' * len(chunk))})",
+                                   chunk))
+    return result
+
+
+class OrderColumns:
+    """orders and order_items held as NumPy arrays for vectorized analyses.
+
+    Loading is the expensive part (every row passes through Python once);
+    each analysis is then a few group-bys over whole columns, so one
+    snapshot serves all of them. The analyses return the same rows as the
+    SQL analyses in reports.py.
+    """
+
+    def __init__(self, orders, lines):
+        self.orders = orders
+        self.lines = lines
+
+    @classmethod
+    def load(cls, conn):
+        np = numpy()
+        orders = load_columns(conn, ORDER_COLUMNS, np.dtype([
+            ("order_id", "i8"), ("customer_id", "i8"), ("day", "i4"), ("total_price", "f8")]))
+        lines = load_columns(conn, LINE_COLUMNS, np.dtype([
+            ("order_id", "i8"), ("product_id", "i8"), ("quantity", "i8"), ("line_total", "f8")]))
+        return cls(orders, lines)
+
+    def customer_orders(self):
+        """The orders placed by a customer (those without one are left out, as in the SQL analyses)."""
+        return self.orders[self.orders["customer_id"] >= 0]
+
+    def top_customers(self, conn, n):
+        """(customer_id, name, total_spent, order_count) for the n biggest spenders."""
+        np = numpy()
+        orders = self.customer_orders()
+        customers = orders["customer_id"]
+        spent = np.bincount(customers, weights=orders["total_price"])
+        counts = np.bincount(customers)
+        ids = np.nonzero(counts)[0]
+        ids, totals = ranked(np, ids, spent[ids], n)
+        found = names(conn, "customers", "customer_id", ids)
+        return [(int(i), found.get(int(i)), float(total), int(counts[i])) for i, total in zip(ids, totals)]
+
+    def abc_classes(self, conn, limits):
+        """(product_id, name, revenue, cumulative_share, class) for every product sold, biggest first.
+
+        Products are class A while the revenue ranked above them is under
+        limits[0] of the total, B while under limits[1] and C after that.
+        """
+        np = numpy()
+        revenue = np.bincount(self.lines["product_id"], weights=self.lines["line_total"])
+        ids = np.nonzero(revenue > 0)[0]
+        if not len(ids):
+            return []
+        ids, revenue = ranked(np, ids, revenue[ids])
+        cumulative = np.cumsum(revenue)
+        total = cumulative[-1]
+        before = cumulative - revenue
+        classes = np.where(before < limits[0] * total, "A", np.where(before < limits[1] * total, "B", "C"))
+        found = names(conn, "products", "product_id", ids)
+        return [(int(i), found.get(int(i)), float(r), float(c / total), str(k))
+                for i, r, c, k in zip(ids, revenue, cumulative, classes)]
+
+    def repeat_rates(self):
+        """(cohort, customers, repeat_customers, rate) per month of first purchase."""
+        np = numpy()
+        orders = self.customer_orders()
+        customers = orders["customer_id"]
+        if not len(customers):
+            return []
+        counts = np.bincount(customers)
+        first = np.full(len(counts), np.iinfo(np.int32).max, dtype="i4")
+        np.minimum.at(first, customers, orders["day"])
+        ids = np.nonzero(counts)[0]
+        months = first[ids].astype("datetime64[D]").astype("datetime64[M]")
+        cohorts, cohort_of = np.unique(months, return_inverse=True)
+        totals = np.bincount(cohort_of)
+        repeats = np.bincount(cohort_of, weights=counts[ids] > 1)
+        return [(str(cohort), int(total), int(repeat), float(repeat / total))
+                for cohort, total, repeat in zip(cohorts, totals, repeats)]
+
+    def velocity(self, conn, days):
+        """(product_id, name, units, units_per_day) over the last days days of orders, fastest first."""
+        np = numpy()
+        if not len(self.orders) or not len(self.lines):
+            return []
+        cutoff = self.orders["day"].max() - (days - 1)
+        line_days = self.orders["day"][np.searchsorted(self.orders["order_id"], self.lines["order_id"])]
+        recent = line_days >= cutoff
+        units = np.bincount(self.lines["product_id"][recent], weights=self.lines["quantity"][recent])
+        ids = np.nonzero(units)[0]
+        ids, units = ranked(np, ids, units[ids])
+        found = names(conn, "products", "product_id", ids)
+        return [(int(i), found.get(int(i)), int(u), float(u / days)) for i, u in zip(ids, units)]
@@ -0,0 +1,45 @@
+import configparser
+import os
+
+# Settings live in config.ini next to the application; every key has a default
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(APP_DIR, "config.ini")
+
+DEFAULTS = {
+    "database": {
+        "path": "business.db",      # Relative to the application directory
+        "cache_size_mb": "64",      # Page cache per connection
+        "mmap_size_mb": "256",      # Memory-mapped I/O window
+        "busy_timeout": "5",        # Seconds to wait on a locked database
+        "statement_cache": "256",   # Prepared statements kept per connection
+        "busy_retries": "5",        # Retries of a write transaction that found the database locked
+        "busy_backoff_ms": "10",    # First retry delay; doubles on each further attempt
+    },
+    "cache": {
+        "products": "10000",        # Product records kept for order validation
+        "customers": "10000",       # Customer records kept for order validation
+        "ttl_seconds": "30",        # Upper bound on staleness from writes made outside the app
+        "reports": "64",            # Report results kept (see cache.ReportCache)
+    },
+    "batch": {
+        "enabled": "no",            # Start the dashboard in batch write mode
+        "max_writes": "50",         # Writes committed together at most
+        "max_delay_ms": "1000",     # Longest a write waits uncommitted
+    },
+    "analytics": {
+        "backend": "auto",          # sql, numpy, or auto (numpy when it is installed)
+    },
+    "reorder": {
+        "velocity_days": "90",      # Days of recent orders a product's sales rate is taken from
+        "lead_time_days": "7",      # Days a supplier takes to deliver
+        "safety_days": "7",         # Extra days of sales kept in stock against demand spikes
+        "cover_days": "30",         # Days of sales a purchase should last beyond the reorder point
+    },
+    "auth": {
+        "bcrypt_rounds": "12",  # bcrypt work factor for new and rehashed passwords
+    },
+}
+
+config = configparser.ConfigParser()
+config.read_dict(DEFAULTS)
+config.read(CONFIG_PATH)
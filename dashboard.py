@@ -1,141 +1,58 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import sqlite3
 from tkinter.simpledialog import askstring  # For user input of the date
 from datetime import datetime
 import re
-
-# Database connection
-conn = sqlite3.connect("business.db")
-cursor = conn.cursor()
-cursor.execute("PRAGMA foreign_keys = ON")
-
-# Create necessary tables
-def create_tables():
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS customers (
-        customer_id INTEGER PRIMARY KEY,
-        name TEXT,
-        email TEXT,
-        phone TEXT,
-        total_spent REAL DEFAULT 0
-    )
-    ''')    
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            product_id INTEGER PRIMARY KEY,
-            name TEXT UNIQUE,
-            price REAL,
-            quantity INTEGER,
-            image BLOB
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            order_id INTEGER PRIMARY KEY,
-            customer_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER,
-            total_price REAL,
-            order_date TEXT,
-            FOREIGN KEY (customer_id) REFERENCES customers (customer_id) ON DELETE CASCADE,
-            FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS employees (
-            employee_id INTEGER PRIMARY KEY,
-            name TEXT,
-            role TEXT,
-            phone TEXT,
-            email TEXT
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS suppliers (
-            supplier_id INTEGER PRIMARY KEY,
-            name TEXT,
-            contact TEXT,
-            product_supplied INTEGER,
-            FOREIGN KEY (product_supplied) REFERENCES products (product_id) ON DELETE SET NULL
-        )
-    ''')
-
-    # Views
-    cursor.execute("""
-    CREATE VIEW IF NOT EXISTS sales_summary AS
-    SELECT 
-        o.order_date AS order_date,
-        SUM(o.total_price) AS total_sales
-    FROM orders o
-    GROUP BY o.order_date
-    """)
-
-    cursor.execute("""
-        CREATE VIEW IF NOT EXISTS stock_summary AS
-        SELECT 
-            p.name AS product_name,
-            SUM(o.quantity) AS total_sold
-        FROM orders o
-        JOIN products p ON o.product_id = p.product_id
-        GROUP BY p.name
-    """)
-
-    cursor.execute("""
-        CREATE VIEW IF NOT EXISTS customer_spending_summary AS
-        SELECT 
-            c.name AS customer_name,
-            SUM(o.total_price) AS total_spent
-        FROM orders o
-        JOIN customers c ON o.customer_id = c.customer_id
-        GROUP BY c.name
-    """)
-
-    # Triggers
-    cursor.execute('''
-    CREATE TRIGGER IF NOT EXISTS update_customer_total_spent
-    AFTER INSERT ON orders
-    FOR EACH ROW
-    BEGIN
-        UPDATE customers
-        SET total_spent = (SELECT SUM(total_price) FROM orders WHERE customer_id = NEW.customer_id)
-        WHERE customer_id = NEW.customer_id;
-    END;
-    ''')
-
-    """Create a trigger to update the product stock when an order is made."""
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS update_product_stock
-        AFTER INSERT ON orders
-        FOR EACH ROW
-        BEGIN
-            UPDATE products
-            SET quantity = quantity - NEW.quantity
-            WHERE product_id = NEW.product_id;
-        END;
-    """)
-
-    conn.commit()
-
-create_tables()
-
-
+import time
+from paged_treeview import PagedTreeview, SearchBox
+from db import immediate
+from image_cache import GRID_ICON_SIZE, PhotoCache, make_thumbnail
+import repository
+import cache
+import services
+from importer import import_file
+from exporter import EXPORT_TABLES, export, report_source, table_source
+import analytics
+import reorder
+from report_viewer import ReportViewer, chart_series
+
+REJECTS_SHOWN = 10  # Rejected rows listed in the import summary dialog
+STATUS_MS = 1000    # Status bar refresh interval
+
+
+def import_into(db, kind, pager):
+    """Ask for a CSV/XLSX file, bulk import it on the DB worker and reload the table."""
+    path = filedialog.askopenfilename(filetypes=[("Spreadsheets", "*.csv *.xlsx")])
+    if not path:
+        return
+
+    def done(result):
+        message = result.summary()
+        if result.rejected:
+            lines = "\n".join(f"Line {line}: {reason}" for line, reason in result.rejected[:REJECTS_SHOWN])
+            message += f"\n\n{lines}"
+            if len(result.rejected) > REJECTS_SHOWN:
+                message += f"\n... and {len(result.rejected) - REJECTS_SHOWN} more"
+        messagebox.showinfo("Import Complete", message)
+        pager.reload()
+
+    def job(conn):
+        result = import_file(conn, kind, path)
+        cache.clear()  # Imported orders change stock behind the cache
+        return result
+
+    db.submit(job, done, write=True)
 
 
 # Initialize Tkinter window
 class Dashboard:
-    def __init__(self, root):
-        self.root = root
-        self.root = root
+    def __init__(self, frame, router):
+        self.frame = frame
+        self.root = router.root
         self.root.title("Admin Dashboard")
         self.root.geometry("1200x800")
-        self.root.configure(bg="#f8f9fa")
+        self.frame.configure(bg="#f8f9fa")
+        self.db = router.db  # Runs all queries off the Tk thread
         self.create_widgets()
 
         # Create a style object
@@ -182,8 +99,22 @@ class Dashboard:
                        foreground=[("selected", "black")])
         
     def create_widgets(self):
+        # Status bar (packed first so the notebook cannot push it off screen)
+        self.status_frame = tk.Frame(self.frame, bd=1, relief="sunken")
+        self.status_frame.pack(side="bottom", fill="x")
+        self.batch_mode = tk.BooleanVar(value=self.db.batch_mode)
+        self.batch_check = ttk.Checkbutton(self.status_frame, text="Batch Mode", variable=self.batch_mode,
+                                           command=self.toggle_batch_mode)
+        self.batch_check.pack(side="left", padx=10)
+        self.save_button = ttk.Button(self.status_frame, text="Save Now", command=self.db.flush)
+        self.save_button.pack(side="left", padx=10)
+        self.status_label = tk.Label(self.status_frame, font=("times new roman", 11), anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True, padx=10)
+        self.last_committed = 0
+        self.update_status()
+
         # Create a Notebook widget
-        self.notebook = ttk.Notebook(self.root)
+        self.notebook = ttk.Notebook(self.frame)
         self.notebook.pack(fill='both', expand=True)
         
         # Background color for all tabs
@@ -211,18 +142,52 @@ class Dashboard:
         self.notebook.add(self.supplier_management_frame, text="Supplier Management")
         self.notebook.add(self.analytics_frame, text="Analytics")
 
-        # Initialize all management sections
-        self.product_management = ProductManagement(self.product_management_frame)
-        self.customer_management = CustomerManagement(self.customer_management_frame)
-        self.employee_management = EmployeeManagement(self.employee_management_frame)
-        self.order_management = OrderManagement(self.order_management_frame)
-        self.supplier_management = SupplierManagement(self.supplier_management_frame)
-        self.analytics = Analytics(self.analytics_frame)
+        # Each section builds its widgets and loads its data the first time
+        # its tab is selected, so startup only pays for the tab on screen
+        self.sections = {
+            str(self.product_management_frame): ("product_management", ProductManagement),
+            str(self.customer_management_frame): ("customer_management", CustomerManagement),
+            str(self.employee_management_frame): ("employee_management", EmployeeManagement),
+            str(self.order_management_frame): ("order_management", OrderManagement),
+            str(self.supplier_management_frame): ("supplier_management", SupplierManagement),
+            str(self.analytics_frame): ("analytics", Analytics),
+        }
+        for attribute, _ in self.sections.values():
+            setattr(self, attribute, None)
+        self.notebook.bind("<<NotebookTabChanged>>", self.build_selected_tab)
+        self.build_selected_tab()
+
+    def build_selected_tab(self, event=None):
+        """Create the selected tab's section on its first selection."""
+        frame_name = self.notebook.select()
+        attribute, section = self.sections[frame_name]
+        if getattr(self, attribute) is None:
+            setattr(self, attribute, section(self.root.nametowidget(frame_name), self.db))
+
+    def toggle_batch_mode(self):
+        """Collect writes into group commits for rapid data entry, or commit each one again."""
+        self.db.set_batch_mode(self.batch_mode.get())
+
+    def update_status(self):
+        """Show pending and committed writes and the commit rate in the status bar."""
+        committed = self.db.committed
+        rate = (committed - self.last_committed) * 1000 / STATUS_MS
+        self.last_committed = committed
+        mode = "Batch mode" if self.db.batch_mode else "Autocommit"
+        self.status_label.config(text=f"{mode} | Pending writes: {self.db.pending} | "
+                                      f"Committed: {committed} in {self.db.commits} commit(s) | {rate:.1f} writes/s")
+        self.status_id = self.root.after(STATUS_MS, self.update_status)
+
+    def close(self):
+        """Stop refreshing the status bar; the router commits batched writes on exit."""
+        self.root.after_cancel(self.status_id)
 
 class ProductManagement:
-    def __init__(self, frame):
+    def __init__(self, frame, db):
         self.frame = frame
-        self.selected_image_path = None
+        self.db = db
+        self.selected_image = None  # PNG thumbnail bytes of the last uploaded image
+        self.photos = PhotoCache()
         self.create_widgets()
 
     def create_widgets(self):
@@ -238,6 +203,8 @@ class ProductManagement:
         self.upload_image_button = ttk.Button(self.frame, text="Upload Image", command=self.upload_image)
         self.delete_product_button = ttk.Button(self.frame, text="Delete Product", command=self.delete_product)
         self.update_product_button = ttk.Button(self.frame, text="Update Product", command=self.update_product)
+        self.import_product_button = ttk.Button(self.frame, text="Import Products",
+                                                command=lambda: import_into(self.db, "products", self.pager))
 
         self.image_label = tk.Label(self.frame, text="No image selected", width=40, height=5, relief="sunken")
 
@@ -256,13 +223,18 @@ class ProductManagement:
         self.view_product_button.grid(row=5, column=1,  pady=15)
         self.delete_product_button.grid(row=5, column=2, pady=15)
         self.update_product_button.grid(row=5, column=3, pady=15)
+        self.import_product_button.grid(row=6, column=0, pady=15)
 
         # Scrollbar
         self.tree_frame = tk.Frame(self.frame)
         self.tree_frame.grid(row=9, column=0, columnspan=4, padx=10, pady=10)
 
-        # Treeview
-        self.tree = ttk.Treeview(self.tree_frame, columns=("Product ID", "Product Name", "Price", "Stock", "Image"), show="headings")
+        # Treeview (thumbnails are drawn in the tree column)
+        self.style = ttk.Style()
+        self.style.configure("Products.Treeview", rowheight=GRID_ICON_SIZE[1] + 4)
+        self.tree = ttk.Treeview(self.tree_frame, columns=("Product ID", "Product Name", "Price", "Stock", "Image"),
+                                 show=("tree", "headings"), style="Products.Treeview")
+        self.tree.column("#0", width=GRID_ICON_SIZE[0] + 20, stretch=False)
         self.tree.heading("Product ID", text="Product ID")
         self.tree.heading("Product Name", text="Product Name")
         self.tree.heading("Price", text="Price")
@@ -272,22 +244,25 @@ class ProductManagement:
 
         # Vertical Scrollbar
         self.tree_scroll = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.config(yscrollcommand=self.tree_scroll.set)
         self.tree_scroll.grid(row=0, column=1, sticky="ns")
+        self.pager = PagedTreeview(self.tree, self.tree_scroll, self.db, "products", "product_id",
+                                   format_row=self.format_product_row)
+        self.search = SearchBox(self.frame, self.pager, "products", "Search Products:")
+        self.search.grid(row=8, column=0, columnspan=4, pady=5)
 
         self.view_products()  # Load products on startup
 
-
-        
+    def format_product_row(self, row):
+        """Show the cached thumbnail instead of the raw image bytes."""
+        photo = self.photos.get(row[4], GRID_ICON_SIZE)
+        return {"values": (row[0], row[1], row[2], row[3], "Yes" if photo else "No"), "image": photo or ""}
 
     def upload_image(self):
-        """Open a file dialog to select an image"""
+        """Open a file dialog to select an image and make its thumbnail once"""
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg;*.jpeg;*.png;*.gif")])
         if file_path:
-            self.selected_image_path = file_path
-            image = Image.open(file_path)
-            image = image.resize((100, 100), Image.Resampling.LANCZOS)  # Resize image
-            photo = ImageTk.PhotoImage(image)
+            self.selected_image = make_thumbnail(file_path)  # Stored as PNG bytes in products.image
+            photo = self.photos.get(self.selected_image)
             self.image_label.config(image=photo, text="")  # Set image and clear text
             self.image_label.image = photo  # Keep reference to image to avoid garbage collection
 
@@ -306,30 +281,21 @@ class ProductManagement:
             messagebox.showerror("Validation Error", "Price and Stock must be numeric values.")
             return
 
-        # Check if a product with the same name already exists
-        cursor.execute("SELECT COUNT(*) FROM products WHERE name = ?", (name,))
-        if cursor.fetchone()[0] > 0:
-            messagebox.showerror("Duplicate Entry", f"A product with the name '{name}' already exists. Please use a unique name.")
-            return
+        # Insert product data with the thumbnail bytes (NULL if no image was uploaded)
+        image = self.selected_image
 
-        # Insert product data with image path
-        image_path = self.selected_image_path if self.selected_image_path else "No image selected"
+        def job(conn):
+            return services.add_product(conn, name, int(price), int(stock), image)
 
-        cursor.execute("""INSERT INTO products (name, price, quantity, image)
-                        VALUES (?, ?, ?, ?)""", (name, int(price), int(stock), image_path))
-        conn.commit()
-        messagebox.showinfo("Success", "Product added successfully!")
-        self.view_products()
+        def done(row_id):
+            messagebox.showinfo("Success", "Product added successfully!")
+            self.pager.refresh_row(row_id)
 
-    def view_products(self):
-        """Display all products in the Treeview widget"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.db.submit(job, done, write=True)
 
-        cursor.execute("SELECT * FROM products")
-        rows = cursor.fetchall()
-        for row in rows:
-            self.tree.insert("", "end", values=(row[0], row[1], row[2], row[3], row[4]))
+    def view_products(self):
+        """Display products in the Treeview widget, one page at a time"""
+        self.pager.reload()
 
     def delete_product(self):
         """Delete the selected product from the database"""
@@ -339,10 +305,15 @@ class ProductManagement:
             return
         
         product_id = self.tree.item(selected_item)["values"][0]
-        cursor.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
-        conn.commit()
-        messagebox.showinfo("Success", f"Product with ID {product_id} deleted successfully!")
-        self.view_products()
+
+        def job(conn):
+            services.delete_product(conn, product_id)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Product with ID {product_id} deleted successfully!")
+            self.pager.remove_row(product_id)
+
+        self.db.submit(job, done, write=True)
 
     def update_product(self):
         """Update the selected product's data in the database after validating inputs."""
@@ -355,7 +326,7 @@ class ProductManagement:
         name = self.product_name.get()
         price = self.price.get()
         stock = self.stock.get()
-        image_path = self.selected_image_path if self.selected_image_path else "No image selected"
+        image = self.selected_image
 
         if not all([name, price, stock]):
             messagebox.showwarning("Input Error", "Please fill in all fields.")
@@ -366,17 +337,20 @@ class ProductManagement:
             messagebox.showerror("Validation Error", "Price and Stock must be numeric values.")
             return
 
-        cursor.execute("""UPDATE products
-                        SET name = ?, price = ?, quantity = ?, image = ?
-                        WHERE product_id = ?""",
-                    (name, int(price), int(stock), image_path, product_id))
-        conn.commit()
-        messagebox.showinfo("Success", f"Product ID {product_id} updated successfully!")
-        self.view_products()
+        def job(conn):
+            # Keep the current thumbnail unless a new image was uploaded
+            services.update_product(conn, product_id, name, int(price), int(stock), image)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Product ID {product_id} updated successfully!")
+            self.pager.refresh_row(product_id)
+
+        self.db.submit(job, done, write=True)
 
 class CustomerManagement:
-    def __init__(self, frame):
+    def __init__(self, frame, db):
         self.frame = frame
+        self.db = db
         self.create_widgets()
 
     def create_widgets(self):
@@ -393,6 +367,8 @@ class CustomerManagement:
         self.view_customer_button = ttk.Button(self.frame, text="View Customers", command=self.view_customers)
         self.update_customer_button = ttk.Button(self.frame, text="Update Customer", command=self.update_customer)
         self.delete_customer_button = ttk.Button(self.frame, text="Delete Customer", command=self.delete_customer)
+        self.import_customer_button = ttk.Button(self.frame, text="Import Customers",
+                                                 command=lambda: import_into(self.db, "customers", self.pager))
 
         # Layout for labels, entries, and buttons
         self.customer_name_label.grid(row=1, column=0, padx=10, pady=10)
@@ -406,6 +382,7 @@ class CustomerManagement:
         self.view_customer_button.grid(row=4, column=1, pady=15)
         self.update_customer_button.grid(row=4, column=2, pady=15)
         self.delete_customer_button.grid(row=4, column=4, pady=15)
+        self.import_customer_button.grid(row=5, column=0, pady=15)
 
         # Scrollbar and Treeview for displaying customers
         self.tree_frame = tk.Frame(self.frame)
@@ -421,8 +398,10 @@ class CustomerManagement:
 
         # Vertical scrollbar
         self.tree_scroll = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.config(yscrollcommand=self.tree_scroll.set)
         self.tree_scroll.grid(row=0, column=1, sticky="ns")
+        self.pager = PagedTreeview(self.tree, self.tree_scroll, self.db, "customers", "customer_id")
+        self.search = SearchBox(self.frame, self.pager, "customers", "Search Customers (name, email, phone):")
+        self.search.grid(row=7, column=0, columnspan=4, pady=5)
 
         # Initial call to view customers
         self.view_customers()
@@ -441,23 +420,18 @@ class CustomerManagement:
             messagebox.showerror("Invalid Email", "Please provide a valid email address.")
             return
         
-        cursor.execute("""
-            INSERT INTO customers (name, phone, email)
-            VALUES (?, ?, ?)
-        """, (name, phone, email))
-        conn.commit()
-        messagebox.showinfo("Success", "Customer added successfully!")
-        self.view_customers()
+        def job(conn):
+            return services.add_customer(conn, name, phone, email)
 
-    def view_customers(self):
-        """Display all customers in the Treeview widget"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        def done(row_id):
+            messagebox.showinfo("Success", "Customer added successfully!")
+            self.pager.refresh_row(row_id)
+
+        self.db.submit(job, done, write=True)
 
-        cursor.execute("SELECT * FROM customers")
-        rows = cursor.fetchall()
-        for row in rows:
-            self.tree.insert("", "end", values=(row[0], row[1], row[2], row[3], row[4]))  # Display total_spent
+    def view_customers(self):
+        """Display customers in the Treeview widget, one page at a time"""
+        self.pager.reload()
 
     def update_customer(self):
         """Update selected customer's details"""
@@ -481,14 +455,14 @@ class CustomerManagement:
             messagebox.showerror("Invalid Email", "Please provide a valid email address.")
             return
 
-        cursor.execute("""
-            UPDATE customers
-            SET name = ?, phone = ?, email = ?
-            WHERE customer_id = ?
-        """, (name, phone, email, customer_id))
-        conn.commit()
-        messagebox.showinfo("Success", f"Customer ID {customer_id} updated successfully!")
-        self.view_customers()
+        def job(conn):
+            services.update_customer(conn, customer_id, name, phone, email)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Customer ID {customer_id} updated successfully!")
+            self.pager.refresh_row(customer_id)
+
+        self.db.submit(job, done, write=True)
 
     def delete_customer(self):
         """Delete selected customer from the database"""
@@ -498,10 +472,15 @@ class CustomerManagement:
             return
 
         customer_id = self.tree.item(selected_item)["values"][0]
-        cursor.execute("DELETE FROM customers WHERE customer_id = ?", (customer_id,))
-        conn.commit()
-        messagebox.showinfo("Success", f"Customer ID {customer_id} deleted successfully!")
-        self.view_customers()
+
+        def job(conn):
+            services.delete_customer(conn, customer_id)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Customer ID {customer_id} deleted successfully!")
+            self.pager.remove_row(customer_id)
+
+        self.db.submit(job, done, write=True)
 
     def validate_email(self, email):
         """Validate email format using regex."""
@@ -509,8 +488,9 @@ class CustomerManagement:
         return re.match(email_regex, email)
 
 class EmployeeManagement:
-    def __init__(self, frame):
+    def __init__(self, frame, db):
         self.frame = frame
+        self.db = db
         self.create_widgets()
 
     def create_widgets(self):
@@ -559,8 +539,10 @@ class EmployeeManagement:
 
         # Vertical scrollbar
         self.tree_scroll = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.config(yscrollcommand=self.tree_scroll.set)
         self.tree_scroll.grid(row=0, column=1, sticky="ns")
+        self.pager = PagedTreeview(self.tree, self.tree_scroll, self.db, "employees", "employee_id")
+        self.search = SearchBox(self.frame, self.pager, "employees", "Search Employees:")
+        self.search.grid(row=8, column=0, columnspan=4, pady=5)
 
         # Load employees on startup
         self.view_employees()
@@ -580,23 +562,18 @@ class EmployeeManagement:
             messagebox.showerror("Invalid Email", "Please provide a valid email address.")
             return
 
-        cursor.execute("""
-            INSERT INTO employees (name, role, phone, email)
-            VALUES (?, ?, ?, ?)
-        """, (name, role, phone, email))
-        conn.commit()
-        messagebox.showinfo("Success", "Employee added successfully!")
-        self.view_employees()
+        def job(conn):
+            return services.add_employee(conn, name, role, phone, email)
 
-    def view_employees(self):
-        """Display all employees in the Treeview."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        def done(row_id):
+            messagebox.showinfo("Success", "Employee added successfully!")
+            self.pager.refresh_row(row_id)
 
-        cursor.execute("SELECT * FROM employees")
-        rows = cursor.fetchall()
-        for row in rows:
-            self.tree.insert("", "end", values=row)
+        self.db.submit(job, done, write=True)
+
+    def view_employees(self):
+        """Display employees in the Treeview, one page at a time."""
+        self.pager.reload()
 
     def update_employee(self):
         """Update details of the selected employee."""
@@ -621,14 +598,14 @@ class EmployeeManagement:
             messagebox.showerror("Invalid Email", "Please provide a valid email address.")
             return
 
-        cursor.execute("""
-            UPDATE employees
-            SET name = ?, role = ?, phone = ?, email = ?
-            WHERE employee_id = ?
-        """, (name, role, phone, email, employee_id))
-        conn.commit()
-        messagebox.showinfo("Success", f"Employee ID {employee_id} updated successfully!")
-        self.view_employees()
+        def job(conn):
+            services.update_employee(conn, employee_id, name, role, phone, email)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Employee ID {employee_id} updated successfully!")
+            self.pager.refresh_row(employee_id)
+
+        self.db.submit(job, done, write=True)
 
     def delete_employee(self):
         """Delete the selected employee."""
@@ -638,10 +615,15 @@ class EmployeeManagement:
             return
 
         employee_id = self.tree.item(selected_item)["values"][0]
-        cursor.execute("DELETE FROM employees WHERE employee_id = ?", (employee_id,))
-        conn.commit()
-        messagebox.showinfo("Success", f"Employee ID {employee_id} deleted successfully!")
-        self.view_employees()
+
+        def job(conn):
+            services.delete_employee(conn, employee_id)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Employee ID {employee_id} deleted successfully!")
+            self.pager.remove_row(employee_id)
+
+        self.db.submit(job, done, write=True)
 
     def validate_email(self, email):
         """Validate email format using regex."""
@@ -649,8 +631,10 @@ class EmployeeManagement:
         return re.match(email_regex, email)
 
 class OrderManagement:
-    def __init__(self, frame):
+    def __init__(self, frame, db):
         self.frame = frame
+        self.db = db
+        self.basket = []  # [product_id, quantity, price] per product, placed as one order
         self.create_widgets()
 
     def create_widgets(self):
@@ -666,11 +650,18 @@ class OrderManagement:
         self.date_label = tk.Label(self.frame, text="Date (Format: YYYY-MM-DD):", font=("times new roman", 12, "bold"))
         self.date = tk.Entry(self.frame)
 
+        # Buttons for the basket
+        self.add_item_button = ttk.Button(self.frame, text="Add to Basket", command=self.add_to_basket)
+        self.remove_item_button = ttk.Button(self.frame, text="Remove from Basket", command=self.remove_from_basket)
+        self.clear_basket_button = ttk.Button(self.frame, text="Clear Basket", command=self.clear_basket)
+
         # Buttons for CRUD operations
-        self.add_order_button = ttk.Button(self.frame, text="Add Order", command=self.add_order)
+        self.add_order_button = ttk.Button(self.frame, text="Place Order", command=self.add_order)
         self.update_order_button = ttk.Button(self.frame, text="Update Order", command=self.update_order)
         self.delete_order_button = ttk.Button(self.frame, text="Delete Order", command=self.delete_order)
         self.view_order_button = ttk.Button(self.frame, text="View Orders", command=self.view_orders)
+        self.import_order_button = ttk.Button(self.frame, text="Import Orders",
+                                              command=lambda: import_into(self.db, "orders", self.pager))
 
         # Layout for labels, entries, and buttons
         self.customer_id_label.grid(row=1, column=0, padx=10, pady=10)
@@ -684,10 +675,25 @@ class OrderManagement:
         self.date_label.grid(row=5, column=0, padx=10, pady=10)
         self.date.grid(row=5, column=1, padx=10, pady=10)
 
-        self.add_order_button.grid(row=6, column=0, pady=15)
-        self.update_order_button.grid(row=6, column=1, pady=15)
-        self.delete_order_button.grid(row=6, column=2, pady=15)
-        self.view_order_button.grid(row=6, column=3, pady=15)
+        self.add_item_button.grid(row=6, column=0, pady=15)
+        self.remove_item_button.grid(row=6, column=1, pady=15)
+        self.clear_basket_button.grid(row=6, column=2, pady=15)
+
+        # Basket: the lines of the order being entered
+        self.basket_tree = ttk.Treeview(self.frame, columns=("Product ID", "Quantity", "Price", "Line Total"),
+                                        show="headings", height=5)
+        for column in ("Product ID", "Quantity", "Price", "Line Total"):
+            self.basket_tree.heading(column, text=column)
+            self.basket_tree.column(column, width=110)
+        self.basket_tree.grid(row=1, column=2, rowspan=5, columnspan=2, padx=10, pady=10, sticky="nsew")
+        self.basket_total = tk.Label(self.frame, text="Basket Total: 0.00", font=("times new roman", 12, "bold"))
+        self.basket_total.grid(row=6, column=3, pady=15)
+
+        self.add_order_button.grid(row=7, column=0, pady=15)
+        self.update_order_button.grid(row=7, column=1, pady=15)
+        self.delete_order_button.grid(row=7, column=2, pady=15)
+        self.view_order_button.grid(row=7, column=3, pady=15)
+        self.import_order_button.grid(row=8, column=0, pady=15)
 
         # Treeview and Scrollbar
         self.tree_frame = tk.Frame(self.frame)
@@ -695,22 +701,27 @@ class OrderManagement:
 
         self.tree = ttk.Treeview(
             self.tree_frame,
-            columns=("Order ID", "Customer ID", "Product ID", "Quantity", "Total Price", "Date"),
+            columns=("Order ID", "Customer ID", "Items", "Total Price", "Date"),
             show="headings"
         )
         self.tree.heading("Order ID", text="Order ID")
         self.tree.heading("Customer ID", text="Customer ID")
-        self.tree.heading("Product ID", text="Product ID")
-        self.tree.heading("Quantity", text="Quantity")
+        self.tree.heading("Items", text="Items")
         self.tree.heading("Total Price", text="Total Price")
         self.tree.heading("Date", text="Date")
 
         self.tree.grid(row=0, column=0, sticky="nsew")
+        self.tree.bind("<<TreeviewSelect>>", self.load_order)
 
         # Add vertical scrollbar
         self.tree_scroll_y = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.config(yscrollcommand=self.tree_scroll_y.set)
         self.tree_scroll_y.grid(row=0, column=1, sticky="ns")
+        self.pager = PagedTreeview(
+            self.tree, self.tree_scroll_y, self.db, "orders", "order_id",
+            columns="""order_id, customer_id,
+                       (SELECT COUNT(*) FROM order_items i WHERE i.order_id = orders.order_id),
+                       total_price, order_date"""
+        )
 
         # Add horizontal scrollbar
         self.tree_scroll_x = ttk.Scrollbar(self.tree_frame, orient="horizontal", command=self.tree.xview)
@@ -732,49 +743,6 @@ class OrderManagement:
                 return False
         return True
 
-    def validate_product_details(self, product_id, price, quantity):
-        """Validate product price and stock."""
-        cursor.execute("SELECT price, quantity FROM products WHERE product_id = ?", (product_id,))
-        product = cursor.fetchone()
-
-        if not product:
-            messagebox.showerror("Validation Error", "Product ID does not exist.")
-            return False
-
-        db_price, db_quantity = product
-
-        if float(price) != db_price:
-            messagebox.showerror("Validation Error", f"Price mismatch! Expected: {db_price}, Entered: {price}")
-            return False
-
-        if int(quantity) > db_quantity:
-            messagebox.showerror(
-                "Validation Error", f"Insufficient stock! Available quantity: {db_quantity}, Entered: {quantity}"
-            )
-            return False
-
-        if int(quantity) <= 0:
-            messagebox.showerror("Validation Error", "Quantity must be greater than zero.")
-            return False
-        return True
-
-    def validate_references(self, customer_id, product_id):
-        """Validate that customer_id exists in the customers table and product_id exists in the products table."""
-        # Validate customer_id
-        cursor.execute("SELECT * FROM customers WHERE customer_id = ?", (customer_id,))
-        customer = cursor.fetchone()
-        if not customer:
-            messagebox.showerror("Validation Error", "Customer ID does not exist.")
-            return False
-
-        # Validate product_id
-        cursor.execute("SELECT * FROM products WHERE product_id = ?", (product_id,))
-        product = cursor.fetchone()
-        if not product:
-            messagebox.showerror("Validation Error", "Product ID does not exist.")
-            return False
-        return True
-    
     def validate_numeric_input(self, value, field_name):
         """Validate that the input is a positive numeric value."""
         try:
@@ -799,16 +767,22 @@ class OrderManagement:
             return False
 
     
-    def add_order(self):
-        """Add a new order to the database."""
-        customer_id = self.customer_id.get()
+    def show_basket(self):
+        """Redraw the basket Treeview and its total."""
+        self.basket_tree.delete(*self.basket_tree.get_children())
+        total = 0
+        for product_id, quantity, price in self.basket:
+            self.basket_tree.insert("", "end", values=(product_id, quantity, price, f"{quantity * price:.2f}"))
+            total += quantity * price
+        self.basket_total.config(text=f"Basket Total: {total:.2f}")
+
+    def add_to_basket(self):
+        """Add the product, quantity and price fields as a basket line."""
         product_id = self.product_id.get()
         quantity = self.quantity.get()
         price = self.price.get()
-        order_date = self.date.get()
 
-        # Validate inputs
-        if not self.validate_inputs(customer_id, product_id, quantity, price, order_date):
+        if not self.validate_inputs(product_id, quantity, price):
             return
 
         if not self.validate_numeric_input(quantity, "Quantity"):
@@ -817,40 +791,88 @@ class OrderManagement:
         if not self.validate_numeric_input(price, "Price"):
             return
 
-        if not self.validate_date_input(order_date, "Order Date"):
+        try:
+            quantity = int(quantity)
+        except ValueError:
+            messagebox.showerror("Validation Error", "Quantity must be a whole number.")
             return
 
-        if not self.validate_references(customer_id, product_id):
+        for line in self.basket:
+            if line[0] == product_id.strip():
+                line[1] += quantity
+                break
+        else:
+            self.basket.append([product_id.strip(), quantity, float(price)])
+        self.show_basket()
+
+    def remove_from_basket(self):
+        """Remove the selected basket line."""
+        selected_item = self.basket_tree.selection()
+        if not selected_item:
+            messagebox.showwarning("Selection Error", "Please select a basket item to remove.")
+            return
+        del self.basket[self.basket_tree.index(selected_item[0])]
+        self.show_basket()
+
+    def clear_basket(self):
+        self.basket = []
+        self.show_basket()
+
+    def load_order(self, event=None):
+        """Show the selected order's customer, date and lines for editing."""
+        selected_item = self.tree.selection()
+        if not selected_item:
+            return
+        order_id, customer_id, _, _, order_date = self.tree.item(selected_item[0])["values"]
+        self.customer_id.delete(0, tk.END)
+        self.customer_id.insert(0, customer_id)
+        self.date.delete(0, tk.END)
+        self.date.insert(0, order_date)
+
+        def done(rows):
+            self.basket = [[str(product_id), quantity, unit_price] for _, product_id, quantity, unit_price, _ in rows]
+            self.show_basket()
+
+        self.db.submit(lambda conn: services.order_items(conn, order_id), done)
+
+    def add_order(self):
+        """Place the basket as one order: header and lines in a single transaction."""
+        customer_id = self.customer_id.get()
+        order_date = self.date.get()
+        items = [tuple(line) for line in self.basket]
+
+        # Validate inputs
+        if not self.validate_inputs(customer_id, order_date):
+            return
+
+        if not items:
+            messagebox.showwarning("Input Error", "The basket is empty. Add at least one item.")
             return
 
-        if not self.validate_product_details(product_id, price, quantity):
+        if not self.validate_date_input(order_date, "Order Date"):
             return
 
         # Insert order into the database
-        cursor.execute("""
-            INSERT INTO orders (customer_id, product_id, quantity, total_price, order_date)
-            VALUES (?, ?, ?, ?, ?)
-        """, (customer_id, product_id, quantity, float(price) * int(quantity), order_date))
-        conn.commit()
-        messagebox.showinfo("Success", "Order added successfully!")
-        self.view_orders()
+        def job(conn):
+            return immediate(conn, services.place_order, customer_id, order_date, items)
 
+        def done(row_id):
+            messagebox.showinfo("Success", f"Order ID {row_id} placed with {len(items)} item(s)!")
+            self.clear_basket()
+            self.pager.refresh_row(row_id)
 
+        self.db.submit(job, done, write=True)
 
-    def view_orders(self):
-        """Display all orders in the Treeview."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
 
-        cursor.execute("SELECT * FROM orders")
-        rows = cursor.fetchall()
-        for row in rows:
-            self.tree.insert("", "end", values=row)
+
+    def view_orders(self):
+        """Display orders in the Treeview, one page at a time."""
+        self.pager.reload()
 
 
 
     def update_order(self):
-        """Update details of the selected order."""
+        """Update the selected order's customer and date, replacing its lines with the basket."""
         selected_item = self.tree.selection()
         if not selected_item:
             messagebox.showwarning("Selection Error", "Please select an order to update.")
@@ -858,39 +880,26 @@ class OrderManagement:
 
         order_id = self.tree.item(selected_item)["values"][0]
         customer_id = self.customer_id.get()
-        product_id = self.product_id.get()
-        quantity = self.quantity.get()
-        price = self.price.get()
         order_date = self.date.get()
+        items = [tuple(line) for line in self.basket] or None  # Empty basket: keep the current lines
 
         # Validate inputs
-        if not self.validate_inputs(customer_id, product_id, quantity, price, order_date):
-            return
-
-        if not self.validate_numeric_input(quantity, "Quantity"):
-            return
-
-        if not self.validate_numeric_input(price, "Price"):
+        if not self.validate_inputs(customer_id, order_date):
             return
 
         if not self.validate_date_input(order_date, "Order Date"):
             return
 
-        if not self.validate_references(customer_id, product_id):
-            return
+        # Update order in the database
+        def job(conn):
+            immediate(conn, services.update_order, order_id, customer_id, order_date, items)
 
-        if not self.validate_product_details(product_id, price, quantity):
-            return
+        def done(_):
+            messagebox.showinfo("Success", f"Order ID {order_id} updated successfully!")
+            self.clear_basket()
+            self.pager.refresh_row(order_id)
 
-        # Update order in the database
-        cursor.execute("""
-            UPDATE orders
-            SET customer_id = ?, product_id = ?, quantity = ?, total_price = ?, order_date = ?
-            WHERE order_id = ?
-        """, (customer_id, product_id, quantity, float(price) * int(quantity), order_date, order_id))
-        conn.commit()
-        messagebox.showinfo("Success", f"Order ID {order_id} updated successfully!")
-        self.view_orders()
+        self.db.submit(job, done, write=True)
 
 
     def delete_order(self):
@@ -901,16 +910,22 @@ class OrderManagement:
             return
 
         order_id = self.tree.item(selected_item)["values"][0]
-        cursor.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
-        conn.commit()
-        messagebox.showinfo("Success", f"Order ID {order_id} deleted successfully!")
-        self.view_orders()
+
+        def job(conn):
+            services.delete_order(conn, order_id)
+
+        def done(_):
+            messagebox.showinfo("Success", f"Order ID {order_id} deleted successfully!")
+            self.pager.remove_row(order_id)
+
+        self.db.submit(job, done, write=True)
 
 
 
 class SupplierManagement:
-    def __init__(self, frame):
+    def __init__(self, frame, db):
         self.frame = frame
+        self.db = db
         self.create_widgets()
 
     def create_widgets(self):
@@ -959,8 +974,10 @@ class SupplierManagement:
 
         # Add vertical scrollbar
         self.tree_scroll_y = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.config(yscrollcommand=self.tree_scroll_y.set)
         self.tree_scroll_y.grid(row=0, column=1, sticky="ns")
+        self.pager = PagedTreeview(self.tree, self.tree_scroll_y, self.db, "suppliers", "supplier_id")
+        self.search = SearchBox(self.frame, self.pager, "suppliers", "Search Suppliers:")
+        self.search.grid(row=7, column=0, columnspan=4, pady=5)
 
         # Add horizontal scrollbar
         self.tree_scroll_x = ttk.Scrollbar(self.tree_frame, orient="horizontal", command=self.tree.xview)
@@ -984,19 +1001,14 @@ class SupplierManagement:
             messagebox.showwarning("Input Error", "Please fill in all fields.")
             return
 
-        # Ensure product_supplied exists in the products table
-        cursor.execute("SELECT product_id FROM products WHERE product_id = ?", (product_supplied,))
-        if cursor.fetchone() is None:
-            messagebox.showwarning("Validation Error", "Invalid Product ID. Please enter a valid product.")
-            return
+        def job(conn):
+            return services.add_supplier(conn, name, contact, product_supplied)
 
-        cursor.execute("""
-            INSERT INTO suppliers (name, contact, product_supplied)
-            VALUES (?, ?, ?)
-        """, (name, contact, product_supplied))
-        conn.commit()
-        messagebox.showinfo("Success", "Supplier added successfully!")
-        self.view_suppliers()
+        def done(row_id):
+            messagebox.showinfo("Success", "Supplier added successfully!")
+            self.pager.refresh_row(row_id)
+
+        self.db.submit(job, done, write=True)
 
     def update_supplier(self):
         """Update details of the selected supplier."""
@@ -1014,20 +1026,14 @@ class SupplierManagement:
             messagebox.showwarning("Input Error", "Please fill in all fields.")
             return
 
-        # Ensure product_supplied exists in the products table
-        cursor.execute("SELECT product_id FROM products WHERE product_id = ?", (product_supplied,))
-        if cursor.fetchone() is None:
-            messagebox.showwarning("Validation Error", "Invalid Product ID. Please enter a valid product.")
-            return
+        def job(conn):
+            services.update_supplier(conn, supplier_id, name, contact, product_supplied)
 
-        cursor.execute("""
-            UPDATE suppliers
-            SET name = ?, contact = ?, product_supplied = ?
-            WHERE supplier_id = ?
-        """, (name, contact, product_supplied, supplier_id))
-        conn.commit()
-        messagebox.showinfo("Success", f"Supplier ID {supplier_id} updated successfully!")
-        self.view_suppliers()
+        def done(_):
+            messagebox.showinfo("Success", f"Supplier ID {supplier_id} updated successfully!")
+            self.pager.refresh_row(supplier_id)
+
+        self.db.submit(job, done, write=True)
 
     def delete_supplier(self):
         """Delete the selected supplier."""
@@ -1037,27 +1043,27 @@ class SupplierManagement:
             return
 
         supplier_id = self.tree.item(selected_item)["values"][0]
-        cursor.execute("DELETE FROM suppliers WHERE supplier_id = ?", (supplier_id,))
-        conn.commit()
-        messagebox.showinfo("Success", f"Supplier ID {supplier_id} deleted successfully!")
-        self.view_suppliers()
 
-    def view_suppliers(self):
-        """Display all suppliers in the Treeview."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        def job(conn):
+            services.delete_supplier(conn, supplier_id)
 
-        cursor.execute("SELECT * FROM suppliers")
-        rows = cursor.fetchall()
-        for row in rows:
-            self.tree.insert("", "end", values=row)
+        def done(_):
+            messagebox.showinfo("Success", f"Supplier ID {supplier_id} deleted successfully!")
+            self.pager.remove_row(supplier_id)
+
+        self.db.submit(job, done, write=True)
+
+    def view_suppliers(self):
+        """Display suppliers in the Treeview, one page at a time."""
+        self.pager.reload()
 
 
 
 # The Analytics class
 class Analytics:
-    def __init__(self, frame):
+    def __init__(self, frame, db):
         self.frame = frame
+        self.db = db
         self.create_widgets()
 
     def create_widgets(self):
@@ -1097,6 +1103,42 @@ class Analytics:
             self.frame, text="Generate Order Summary Report", style="TButton", command=self.view_order_summary_report
         )
 
+        # Export buttons stream the report (or a whole table) straight to a file
+        self.export_sales_button = ttk.Button(
+            self.frame, text="Export", command=lambda: self.export_report("sales", self.sales_threshold)
+        )
+        self.export_stock_button = ttk.Button(
+            self.frame, text="Export", command=lambda: self.export_report("stock", self.stock_threshold)
+        )
+        self.export_customers_button = ttk.Button(
+            self.frame, text="Export", command=lambda: self.export_report("top_customers", self.customer_threshold)
+        )
+        self.export_table_label = tk.Label(self.frame, text="Export Table:", font=("times new roman", 12, "bold"))
+        self.export_table = ttk.Combobox(self.frame, values=EXPORT_TABLES, state="readonly")
+        self.export_table.current(EXPORT_TABLES.index("orders"))
+        self.export_table_button = ttk.Button(self.frame, text="Export", command=self.export_selected_table)
+
+        # Sales trend over a date range, per day, week, month or quarter
+        self.trend_label = tk.Label(self.frame, text="Sales Trend (From / To, YYYY-MM-DD):",
+                                    font=("times new roman", 12, "bold"))
+        self.trend_start = tk.Entry(self.frame)
+        self.trend_start.insert(0, datetime.now().replace(month=1, day=1).strftime("%Y-%m-%d"))
+        self.trend_end = tk.Entry(self.frame)
+        self.trend_end.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        self.trend_grain = ttk.Combobox(self.frame, values=analytics.GRAINS, state="readonly", width=10)
+        self.trend_grain.current(analytics.GRAINS.index("month"))
+        self.trend_button = ttk.Button(self.frame, text="Generate Trend Report", command=self.view_sales_trend)
+
+        self.analysis_button = ttk.Button(self.frame, text="Sales Analysis", command=self.view_sales_analysis)
+        self.query_stats_button = ttk.Button(self.frame, text="Query Statistics", command=self.view_query_stats)
+        self.cache_stats_button = ttk.Button(self.frame, text="Cache Statistics", command=self.view_cache_stats)
+
+        # Reorder points from recent sales; low-stock alerts are raised by triggers as stock moves
+        self.reorder_button = ttk.Button(self.frame, text="Refresh Reorder Points", command=self.refresh_reorder_points)
+        self.suggestions_button = ttk.Button(self.frame, text="Purchase Suggestions",
+                                             command=self.view_purchase_suggestions)
+        self.stock_alert_label = tk.Label(self.frame, text="Low stock: not checked yet")
+
         # Layout
         self.sales_threshold_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
         self.sales_threshold.grid(row=0, column=1, padx=10, pady=5)
@@ -1112,15 +1154,37 @@ class Analytics:
 
         self.order_summary_report_button.grid(row=3, column=0, padx=10, pady=5, columnspan=3)
 
-    def calculate_total_sales_for_date(self, order_date):
-        """Reusable function to calculate total sales for a given date."""
-        cursor.execute("""
-            SELECT SUM(total_price)
-            FROM orders
-            WHERE order_date = ?
-        """, (order_date,))
-        result = cursor.fetchone()
-        return result[0] if result[0] else 0
+        self.export_sales_button.grid(row=0, column=3, padx=10, pady=5)
+        self.export_stock_button.grid(row=1, column=3, padx=10, pady=5)
+        self.export_customers_button.grid(row=2, column=3, padx=10, pady=5)
+        self.export_table_label.grid(row=4, column=0, padx=10, pady=5, sticky="w")
+        self.export_table.grid(row=4, column=1, padx=10, pady=5)
+        self.export_table_button.grid(row=4, column=2, padx=10, pady=5)
+
+        self.trend_label.grid(row=5, column=0, padx=10, pady=5, sticky="w")
+        self.trend_start.grid(row=5, column=1, padx=10, pady=5)
+        self.trend_end.grid(row=5, column=2, padx=10, pady=5)
+        self.trend_grain.grid(row=5, column=3, padx=10, pady=5)
+        self.trend_button.grid(row=5, column=4, padx=10, pady=5)
+
+        self.query_stats_button.grid(row=6, column=0, padx=10, pady=5)
+        self.cache_stats_button.grid(row=6, column=1, padx=10, pady=5)
+        self.analysis_button.grid(row=6, column=2, padx=10, pady=5)
+        self.report_cache_label = tk.Label(self.frame, text="Report cache: no reports run yet")
+        self.report_cache_label.grid(row=6, column=3, columnspan=2, padx=10, pady=5, sticky="w")
+
+        self.reorder_button.grid(row=7, column=0, padx=10, pady=5)
+        self.suggestions_button.grid(row=7, column=1, padx=10, pady=5)
+        self.stock_alert_label.grid(row=7, column=2, columnspan=3, padx=10, pady=5, sticky="w")
+
+        # Reports are shown here rather than in a messagebox, however many rows they have
+        self.viewer = ReportViewer(self.frame)
+        self.viewer.grid(row=8, column=0, columnspan=5, padx=10, pady=5, sticky="nsew")
+        self.frame.rowconfigure(8, weight=1)
+
+    def calculate_total_sales_for_date(self, conn, order_date):
+        """Reusable function to calculate total sales for a given date. Runs inside a DB job."""
+        return services.sales_for_date(conn, order_date)
 
     def view_sales_report(self):
         try:
@@ -1129,22 +1193,17 @@ class Analytics:
             messagebox.showerror("Input Error", "Please enter a valid number for Sales Threshold.")
             return
 
-        cursor.execute("""
-            SELECT order_date, total_sales
-            FROM sales_summary
-            WHERE total_sales > ?
-            ORDER BY order_date ASC
-        """, (sales_threshold,))
-        rows = cursor.fetchall()
+        def job(conn):
+            rows = services.sales_report(conn, sales_threshold)
+            return rows, chart_series([row[0] for row in rows], [row[1] for row in rows])
 
-        if not rows:
-            messagebox.showinfo("Sales Report", "No sales data above the threshold.")
-            return
+        def done(result):
+            rows, series = result
+            self.viewer.show(f"Sales Report (Threshold: {sales_threshold})", ["date", "total_sales"], rows,
+                             format_row=lambda row: (row[0], f"{row[1]:.2f}"), series=series)
+            self.show_report_cache_stats()
 
-        report = f"Sales Report (Threshold: {sales_threshold}):\n"
-        for row in rows:
-            report += f"Date: {row[0]}, Total Sales: {row[1]:.2f}\n"
-        messagebox.showinfo("Sales Report", report)
+        self.db.submit(job, done)
 
     def view_stock_report(self):
         try:
@@ -1153,22 +1212,14 @@ class Analytics:
             messagebox.showerror("Input Error", "Please enter a valid number for stock Threshold.")
             return
 
-        cursor.execute("""
-            SELECT product_name, total_sold
-            FROM stock_summary
-            WHERE total_sold > ?
-            ORDER BY total_sold DESC
-        """, (stock_threshold,))
-        rows = cursor.fetchall()
+        def job(conn):
+            return services.stock_report(conn, stock_threshold)
 
-        if not rows:
-            messagebox.showinfo("stock Report", "No products sold above the threshold.")
-            return
+        def done(rows):
+            self.viewer.show(f"stock Report (Threshold: {stock_threshold})", ["product", "total_sold"], rows)
+            self.show_report_cache_stats()
 
-        report = f"stock Report (Threshold: {stock_threshold}):\n"
-        for row in rows:
-            report += f"Product: {row[0]}, Total Sold: {row[1]}\n"
-        messagebox.showinfo("stock Report", report)
+        self.db.submit(job, done)
 
     def view_top_customers(self):
         try:
@@ -1177,22 +1228,15 @@ class Analytics:
             messagebox.showerror("Input Error", "Please enter a valid number for Customer Spending Threshold.")
             return
 
-        cursor.execute("""
-            SELECT customer_name, total_spent
-            FROM customer_spending_summary
-            WHERE total_spent > ?
-            ORDER BY total_spent DESC
-        """, (customer_threshold,))
-        rows = cursor.fetchall()
+        def job(conn):
+            return services.top_customers_report(conn, customer_threshold)
 
-        if not rows:
-            messagebox.showinfo("Top Customers", "No customers found above the threshold.")
-            return
+        def done(rows):
+            self.viewer.show(f"Top Customers Report (Threshold: {customer_threshold})", ["customer", "total_spent"],
+                             rows, format_row=lambda row: (row[0], f"{row[1]:.2f}"))
+            self.show_report_cache_stats()
 
-        report = f"Top Customers Report (Threshold: {customer_threshold}):\n"
-        for row in rows:
-            report += f"Customer: {row[0]}, Total Spent: {row[1]:.2f}\n"
-        messagebox.showinfo("Top Customers", report)
+        self.db.submit(job, done)
 
     def view_order_summary_report(self):
         # Ask the user for the date of the order
@@ -1208,12 +1252,165 @@ class Analytics:
             return
 
         # Use the reusable function to calculate total sales for the given date
-        total_sales = self.calculate_total_sales_for_date(order_date)
+        def job(conn):
+            return self.calculate_total_sales_for_date(conn, order_date)
+
+        def done(total_sales):
+            if total_sales <= sales_threshold:
+                messagebox.showinfo("Order Summary Report", "No sales data above the threshold.")
+                return
+
+            report = f"Order Summary Report (Date: {order_date}, Threshold: {sales_threshold}):\n"
+            report += f"Total Sales: {total_sales:.2f}\n"
+            messagebox.showinfo("Order Summary Report", report)
+
+        self.db.submit(job, done)
+
+    def view_sales_trend(self):
+        """Sales per period over the chosen range with running totals and change on the period before."""
+        grain = self.trend_grain.get()
+        start, end = self.trend_start.get().strip(), self.trend_end.get().strip()
+
+        def job(conn):
+            rows = analytics.sales_trend(conn, grain, start, end)
+            return rows, chart_series([row[0] for row in rows], [row[2] for row in rows])
+
+        def format_row(row):
+            period, _, total, count, running, _, change, partial = row
+            return (period + (" *" if partial else ""), f"{total:.2f}", count, f"{running:.2f}",
+                    f"{change:+.1%}" if change is not None else "n/a")
+
+        def done(result):
+            # * marks a partial period, compared with the same days of the period before
+            rows, series = result
+            self.viewer.show(f"Sales by {grain} ({start} to {end}; * partial period)",
+                             ["period", "total_sales", "orders", "running_total", "change"], rows,
+                             format_row=format_row, series=series)
+            self.show_report_cache_stats()
+
+        self.db.submit(job, done)
+
+    def view_sales_analysis(self):
+        """Top customers, ABC classes, repeat-purchase rates and product velocity in one summary."""
+        backend = analytics.analysis_backend()
+
+        def job(conn):
+            start = time.perf_counter()
+            return analytics.sales_analysis(conn, backend=backend), time.perf_counter() - start
+
+        def done(result):
+            results, seconds = result
+            lines = [f"Top {len(results['top_customers'])} customers:"]
+            for _, name, spent, orders in results["top_customers"]:
+                lines.append(f"  {name}: {spent:.2f} over {orders} orders")
+
+            lines.append("ABC classes:")
+            for grade in "ABC":
+                rows = [row for row in results["abc"] if row[4] == grade]
+                revenue = sum(row[2] for row in rows)
+                lines.append(f"  {grade}: {len(rows)} products, revenue {revenue:.2f}")
+
+            lines.append("Repeat-purchase rate by month of first order:")
+            for cohort, customers, repeats, rate in results["repeat_rates"]:
+                lines.append(f"  {cohort}: {repeats} of {customers} customers ({rate:.1%})")
+
+            lines.append(f"Fastest products (last {analytics.VELOCITY_DAYS} days):")
+            for _, name, units, per_day in results["velocity"][:analytics.ANALYSIS_TOP]:
+                lines.append(f"  {name}: {units} units, {per_day:.2f}/day")
+            lines.append(f"Computed with the {backend} backend in {seconds:.2f}s.")
+            self.show_report_cache_stats()
+            messagebox.showinfo("Sales Analysis", "\n".join(lines))
+
+        self.db.submit(job, done)
+
+    def refresh_reorder_points(self):
+        """Recompute reorder points from recent sales, which raises or clears the stock alerts."""
+        def job(conn):
+            return reorder.refresh_reorder_points(conn), reorder.stock_alert_count(conn)
+
+        def done(result):
+            products, alerts = result
+            self.show_stock_alerts(alerts)
+            messagebox.showinfo("Reorder Points", f"Reorder points set for {products} product(s) "
+                                                  f"sold in the last {reorder.reorder_settings()[0]} days; "
+                                                  f"{alerts} product(s) are at or below theirs.")
+
+        self.db.submit(job, done, write=True)
+
+    def view_purchase_suggestions(self):
+        """Products at or below their reorder point, batched into one purchase per supplier."""
+        def job(conn):
+            return reorder.purchase_suggestions(conn)
+
+        def done(batches):
+            rows = [(supplier or "(no supplier)", contact or "", name, quantity, point, suggested)
+                    for _, supplier, contact, lines in batches
+                    for _, name, quantity, point, suggested, _, _ in lines]
+            self.show_stock_alerts(len(rows))
+            suppliers = sum(1 for batch in batches if batch[0] is not None)
+            self.viewer.show(f"Purchase Suggestions ({suppliers} supplier(s))",
+                             ["supplier", "contact", "product", "in_stock", "reorder_point", "order_quantity"],
+                             rows)
+
+        self.db.submit(job, done)
+
+    def show_stock_alerts(self, count):
+        self.stock_alert_label.config(text=f"Low stock: {count} product(s) at or below their reorder point")
+
+    def view_query_stats(self):
+        """Show call counts and latencies of the statements run this session."""
+        # snapshot() and report() copy the stats under the lock the worker threads record with
+        if not repository.metrics.snapshot():
+            messagebox.showinfo("Query Statistics", "No queries have run yet.")
+            return
+        messagebox.showinfo("Query Statistics", repository.metrics.report())
+
+    def show_report_cache_stats(self):
+        """Refresh the report cache hit/miss line under the report buttons."""
+        s = cache.reports.stats()
+        self.report_cache_label.config(
+            text=f"Report cache: {s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%} hit rate), "
+                 f"{s['invalidations']} invalidated by new data")
+
+    def view_cache_stats(self):
+        """Show hit rates of the product, customer and report caches."""
+        messagebox.showinfo("Cache Statistics", cache.report())
+
+    def ask_export_path(self, name):
+        """Ask where to save an export; the extension picks the format."""
+        return filedialog.asksaveasfilename(
+            initialfile=f"{name}.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")],
+        )
 
-        if total_sales <= sales_threshold:
-            messagebox.showinfo("Order Summary Report", "No sales data above the threshold.")
+    def export_report(self, report, threshold_entry):
+        """Stream an analytics report to a file on the DB worker."""
+        try:
+            threshold = float(threshold_entry.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter a valid number for the threshold.")
+            return
+
+        path = self.ask_export_path(report)
+        if not path:
+            return
+
+        def done(result):
+            count, seconds = result
+            messagebox.showinfo("Export Complete", f"Exported {count} row(s) to {path} in {seconds:.2f}s.")
+
+        self.db.submit(lambda conn: export(report_source(conn, report, threshold), path), done)
+
+    def export_selected_table(self):
+        """Stream the chosen table to a file on the DB worker."""
+        table = self.export_table.get()
+        path = self.ask_export_path(table)
+        if not path:
             return
 
-        report = f"Order Summary Report (Date: {order_date}, Threshold: {sales_threshold}):\n"
-        report += f"Total Sales: {total_sales:.2f}\n"
-        messagebox.showinfo("Order Summary Report", report)
+        def done(result):
+            count, seconds = result
+            messagebox.showinfo("Export Complete", f"Exported {count} row(s) to {path} in {seconds:.2f}s.")
+
+        self.db.submit(lambda conn: export(table_source(conn, table), path), done)
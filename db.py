@@ -0,0 +1,179 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from config import APP_DIR, config
+
+
+def database_path():
+    """Database file from config.ini; relative paths are resolved against the application directory."""
+    path = config.get("database", "path")
+    return path if os.path.isabs(path) else os.path.join(APP_DIR, path)
+
+
+DB_PATH = database_path()
+
+# Callbacks waiting for the calling thread's transaction to end (see after_transaction)
+pending_callbacks = threading.local()
+
+
+def connect(path=None, **kwargs):
+    """Open a connection with the application's pragmas applied.
+
+    WAL lets readers run while a write is in progress, and with
+    synchronous=NORMAL a commit appends to the log without an fsync (the
+    log is synced at checkpoints), which is still safe against corruption.
+    """
+    section = config["database"]
+    conn = sqlite3.connect(path or DB_PATH, timeout=section.getfloat("busy_timeout"),
+                           cached_statements=section.getint("statement_cache"), **kwargs)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {section.getint('mmap_size_mb') * 1024 * 1024}")
+    conn.execute(f"PRAGMA cache_size = -{section.getint('cache_size_mb') * 1024}")  # Negative means KiB
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def is_busy(error):
+    """True for SQLITE_BUSY / SQLITE_LOCKED, which are worth retrying."""
+    return isinstance(error, sqlite3.OperationalError) and (
+        "locked" in str(error) or "busy" in str(error))
+
+
+def begin_immediate(conn):
+    """BEGIN IMMEDIATE, retrying with exponential backoff and jitter while the database stays locked.
+
+    IMMEDIATE takes the write lock up front, so whatever the transaction
+    reads cannot change before it writes. Each attempt already waits up to
+    the busy timeout; a retry is only needed when that runs out.
+    """
+    section = config["database"]
+    retries = section.getint("busy_retries")
+    delay = section.getint("busy_backoff_ms") / 1000
+    for attempt in range(retries + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as error:
+            if not is_busy(error) or attempt == retries:
+                raise
+        time.sleep(delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def after_transaction(callback):
+    """Run callback() once the calling thread's current transaction commits or rolls back.
+
+    Whoever ends the transaction (immediate(), the DBExecutor, the API
+    write batcher) calls transaction_ended(). Each thread writes through
+    its own connection, so the callbacks are kept per thread.
+    """
+    if not hasattr(pending_callbacks, "callbacks"):
+        pending_callbacks.callbacks = []
+    pending_callbacks.callbacks.append(callback)
+
+
+def transaction_ended():
+    """Run the callbacks registered by after_transaction on this thread."""
+    callbacks = getattr(pending_callbacks, "callbacks", None)
+    pending_callbacks.callbacks = []
+    for callback in callbacks or ():
+        callback()
+
+
+def immediate(conn, operation, *args):
+    """Run operation(conn, *args) in a BEGIN IMMEDIATE transaction and commit it.
+
+    When conn is already inside a transaction the caller owns it (the
+    DBExecutor's batch mode, the API write batcher) and the operation
+    simply runs.
+    """
+    if conn.in_transaction:
+        return operation(conn, *args)
+
+    begin_immediate(conn)
+    try:
+        result = operation(conn, *args)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        transaction_ended()
+
+
+class ConnectionPool:
+    """Hand each thread its own connection to one database, created on first use.
+
+    sqlite3 connections must not be shared between threads, so the pool
+    keeps one per thread and reuses it for every later request from that
+    thread instead of reconnecting.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DB_PATH
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def get(self):
+        """The calling thread's connection."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close_all() may close it from another thread
+            conn = connect(self.path, check_same_thread=False)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Yield this thread's connection; commit on success, roll back on error."""
+        conn = self.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def release(self):
+        """Close the calling thread's connection."""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            self.local.conn = None
+            with self.lock:
+                self.connections.remove(conn)
+            conn.close()
+
+    def close_all(self):
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for conn in connections:
+            conn.close()
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(path=None):
+    """The shared pool for a database file."""
+    path = path or DB_PATH
+    with pools_lock:
+        if path not in pools:
+            pools[path] = ConnectionPool(path)
+        return pools[path]
+
+
+@contextmanager
+def connection(path=None):
+    """Context manager for this thread's pooled connection: with connection() as conn: ..."""
+    with get_pool(path).connection() as conn:
+        yield conn
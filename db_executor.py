@@ -0,0 +1,198 @@
+import atexit
+import queue
+import threading
+import time
+from tkinter import TclError, messagebox
+
+from config import config
+from db import DB_PATH, begin_immediate, get_pool, transaction_ended
+from services import ValidationError  # Raised by a job to reject a write; args are the messagebox title and message
+
+POLL_MS = 20  # How often the Tk thread collects finished jobs
+FLUSH = object()  # Queued by flush() to commit the open batch
+
+
+def show_error(error):
+    """Default error callback: report a failed job in a messagebox."""
+    if isinstance(error, ValidationError):
+        messagebox.showerror(*error.args)
+    else:
+        messagebox.showerror("Database Error", str(error))
+
+
+class DBExecutor:
+    """Run database work on a background thread and hand results back to Tk.
+
+    A job is a function taking a sqlite3 connection. It runs on a dedicated
+    worker thread that owns its own pooled connection, is committed if it returns
+    and rolled back if it raises. Its result (or exception) is passed to the
+    callback on the Tk thread, collected with root.after, so a slow query or
+    a locked database never blocks the mainloop.
+
+    In batch mode writes are not committed one by one: they accumulate in
+    one transaction, each job inside its own SAVEPOINT so a rejected write
+    is undone alone, and the batch is committed after max_writes writes,
+    after max_delay_ms, on flush() and on close(). Only jobs submitted with
+    write=True open a batch; reads (pages, reports, searches) run outside
+    it and never take the write lock, unless a batch is already open, in
+    which case they read inside it and see its writes.
+    """
+
+    def __init__(self, root, db_path=DB_PATH):
+        self.root = root
+        self.db_path = db_path
+        section = config["batch"]
+        self.batch_mode = section.getboolean("enabled")
+        self.max_writes = section.getint("max_writes")
+        self.max_delay = section.getint("max_delay_ms") / 1000
+        self.pending = 0        # Writes in the open batch
+        self.batch_started = None
+        self.committed = 0      # Writes committed so far
+        self.commits = 0
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.worker = threading.Thread(target=self.run, name="db-worker", daemon=True)
+        self.worker.start()
+        self.poll_id = self.root.after(POLL_MS, self.poll)
+        atexit.register(self.close)  # Do not lose a batch if the window is never closed normally
+
+    def submit(self, job, on_success=None, on_error=show_error, write=False):
+        """Queue job(conn) for the worker; the callbacks run on the Tk thread.
+
+        Jobs that write must pass write=True so batch mode groups them.
+        """
+        self.jobs.put((job, on_success, on_error, write))
+
+    def set_batch_mode(self, enabled):
+        """Switch batch mode; turning it off commits the open batch."""
+        self.batch_mode = enabled
+        if not enabled:
+            self.flush()
+
+    def flush(self):
+        """Commit the open batch once the jobs queued before it have run (an explicit save point)."""
+        self.jobs.put(FLUSH)
+
+    def run(self):
+        """Worker loop: execute jobs in order on this thread's connection."""
+        pool = get_pool(self.db_path)
+        conn = pool.get()
+        while True:
+            try:
+                item = self.jobs.get(timeout=self.time_left())
+            except queue.Empty:
+                self.commit_batch(conn)  # max_delay_ms has passed since the batch began
+                continue
+            if item is None:
+                break
+            if item is FLUSH:
+                self.commit_batch(conn)
+                continue
+            job, on_success, on_error, write = item
+            if self.batch_mode and (write or conn.in_transaction):
+                self.run_batched(conn, job, on_success, on_error)
+                continue
+            self.commit_batch(conn)  # Batch mode was just switched off
+            changes = conn.total_changes
+            try:
+                result = job(conn)
+                conn.commit()
+            except Exception as error:
+                conn.rollback()
+                transaction_ended()
+                self.results.put((on_error, error))
+            else:
+                transaction_ended()
+                if conn.total_changes != changes:
+                    self.committed += 1
+                    self.commits += 1
+                self.results.put((on_success, result))
+        self.commit_batch(conn)
+        pool.release()
+
+    def time_left(self):
+        """Seconds until the open batch is due, or None to wait for the next job indefinitely."""
+        if self.batch_started is None:
+            return None
+        return max(0, self.batch_started + self.max_delay - time.monotonic())
+
+    def run_batched(self, conn, job, on_success, on_error):
+        """Run a job inside the open batch, starting one if needed."""
+        if not conn.in_transaction:
+            try:
+                begin_immediate(conn)
+            except Exception as error:
+                self.results.put((on_error, error))
+                return
+        changes = conn.total_changes
+        conn.execute("SAVEPOINT batch_job")
+        try:
+            result = job(conn)
+            conn.execute("RELEASE batch_job")
+        except Exception as error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK TO batch_job")
+                conn.execute("RELEASE batch_job")
+            elif self.pending:
+                # SQLite rolled back the whole transaction (e.g. disk full)
+                error = RuntimeError(f"{self.pending} batched write(s) were lost: {error}")
+                self.pending = 0
+                self.batch_started = None
+            self.results.put((on_error, error))
+        else:
+            if conn.total_changes != changes:
+                self.pending += 1
+                if self.batch_started is None:
+                    self.batch_started = time.monotonic()
+            self.results.put((on_success, result))
+
+        if self.pending == 0:
+            conn.rollback()  # Nothing written yet: do not hold the write lock for reads
+            transaction_ended()
+        elif self.pending >= self.max_writes:
+            self.commit_batch(conn)
+
+    def commit_batch(self, conn):
+        """Commit the writes of the open batch, if any."""
+        if not conn.in_transaction:
+            return
+        pending = self.pending
+        self.pending = 0
+        self.batch_started = None
+        try:
+            conn.commit()
+        except Exception as error:
+            conn.rollback()
+            self.results.put((show_error, RuntimeError(f"{pending} batched write(s) could not be saved: {error}")))
+        else:
+            self.committed += pending
+            self.commits += 1 if pending else 0
+        finally:
+            transaction_ended()
+
+    def poll(self):
+        """Deliver finished jobs to their callbacks on the Tk thread."""
+        while True:
+            try:
+                callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if callback is not None:
+                callback(value)
+        self.poll_id = self.root.after(POLL_MS, self.poll)
+
+    def shutdown(self):
+        """Stop polling and let the worker exit once queued jobs are done."""
+        self.root.after_cancel(self.poll_id)
+        self.jobs.put(None)
+
+    def close(self, timeout=10):
+        """Stop the worker and wait for it to commit the open batch (on window close and at exit)."""
+        if not self.worker.is_alive():
+            return
+        try:
+            self.root.after_cancel(self.poll_id)
+        except TclError:
+            pass  # The window is already gone
+        self.jobs.put(None)
+        self.worker.join(timeout)
@@ -0,0 +1,172 @@
+import argparse
+import base64
+import csv
+import json
+import os
+import time
+
+from db import DB_PATH, connect
+from reports import REPORTS
+
+FETCH_SIZE = 5000  # Rows pulled from the cursor (and written as one Parquet batch) at a time
+
+# Tables that may be exported; users is left out so password hashes never leave the database
+EXPORT_TABLES = ["products", "customers", "employees", "orders", "order_items", "suppliers"]
+FORMATS = ["csv", "jsonl", "parquet"]
+
+
+def stream_query(conn, sql, params=()):
+    """Run a query and return (column names, generator of row batches).
+
+    The cursor is stepped with fetchmany, so only FETCH_SIZE rows are held
+    in memory at once however large the result is.
+    """
+    cursor = conn.execute(sql, params)
+    columns = [d[0] for d in cursor.description]
+
+    def batches():
+        try:
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    return columns, batches()
+
+
+def table_source(conn, table):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Cannot export table '{table}'")
+    return stream_query(conn, f"SELECT * FROM {table} ORDER BY rowid")
+
+
+def report_source(conn, report, threshold=0):
+    return stream_query(conn, REPORTS[report], (threshold,))
+
+
+def text_value(value):
+    """BLOBs (product thumbnails) are written as base64 in text formats."""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def write_csv(path, columns, batches):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in batches:
+            writer.writerows([text_value(v) for v in row] for row in rows)
+            count += len(rows)
+    return count
+
+
+def write_jsonl(path, columns, batches):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for rows in batches:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, map(text_value, row)))))
+                f.write("\n")
+            count += len(rows)
+    return count
+
+
+def parquet_schema(pa, columns, rows):
+    """Column types from the first non-null value of each column in the first batch."""
+    types = {int: pa.int64(), float: pa.float64(), bytes: pa.binary()}
+    fields = []
+    for i, name in enumerate(columns):
+        value = next((row[i] for row in rows if row[i] is not None), None)
+        fields.append(pa.field(name, types.get(type(value), pa.string())))
+    return pa.schema(fields)
+
+
+def write_parquet(path, columns, batches):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    count = 0
+    writer = None
+    try:
+        for rows in batches:
+            if writer is None:
+                schema = parquet_schema(pa, columns, rows)
+                writer = pq.ParquetWriter(path, schema)
+            data = {}
+            for i, field in enumerate(schema):
+                values = [row[i] for row in rows]
+                if field.type == pa.string():
+                    values = [None if v is None else str(text_value(v)) for v in values]
+                data[field.name] = values
+            writer.write_batch(pa.RecordBatch.from_pydict(data, schema=schema))
+            count += len(rows)
+        if writer is None:  # Empty result: still write a file with the columns
+            schema = pa.schema([pa.field(name, pa.string()) for name in columns])
+            writer = pq.ParquetWriter(path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+}
+
+
+def format_for(path):
+    """Export format implied by the file extension."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "json":
+        extension = "jsonl"
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported export format '{extension}'; use .csv, .jsonl or .parquet")
+    return extension
+
+
+def export(source, path, fmt=None):
+    """Write a (columns, batches) source to path; returns (rows written, seconds)."""
+    start = time.perf_counter()
+    columns, batches = source
+    count = WRITERS[fmt or format_for(path)](path, columns, batches)
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export tables and analytics reports to CSV, JSON Lines or Parquet")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    parser.add_argument("--format", choices=FORMATS, help="output format (default: from the file extension)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    table = commands.add_parser("table", help="export a whole table")
+    table.add_argument("name", choices=EXPORT_TABLES)
+    table.add_argument("path")
+
+    report = commands.add_parser("report", help="export an analytics report")
+    report.add_argument("name", choices=sorted(REPORTS))
+    report.add_argument("path")
+    report.add_argument("--threshold", type=float, default=0, help="report threshold (default: 0, everything)")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+    if args.command == "table":
+        source = table_source(conn, args.name)
+    else:
+        source = report_source(conn, args.name, args.threshold)
+    count, seconds = export(source, args.path, args.format)
+    conn.close()
+    print(f"Exported {count} row(s) to {args.path} in {seconds:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import hashlib
+import io
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+THUMBNAIL_SIZE = (100, 100)  # Stored in products.image as PNG bytes
+GRID_ICON_SIZE = (40, 40)    # Shown next to each row in the product grid
+PHOTO_CACHE_SIZE = 512       # Decoded PhotoImages kept in memory
+
+
+def make_thumbnail(file_path):
+    """Decode and resize an uploaded image once, returning compact PNG bytes."""
+    with Image.open(file_path) as image:
+        thumbnail = image.convert("RGBA").resize(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def content_key(data):
+    """Content hash identifying a thumbnail, so identical images share a cache slot."""
+    return hashlib.sha1(data).hexdigest()
+
+
+class PhotoCache:
+    """LRU cache of decoded PhotoImages keyed by thumbnail content hash.
+
+    Decoding PNG bytes into a Tk image is the expensive step when a page of
+    products is drawn, so each distinct thumbnail is decoded once per size
+    and reused until it falls out of the cache.
+    """
+
+    def __init__(self, size=PHOTO_CACHE_SIZE):
+        self.size = size
+        self.photos = OrderedDict()
+
+    def get(self, data, size=None):
+        """PhotoImage for thumbnail bytes, optionally scaled to size; None if no image."""
+        if not isinstance(data, bytes):
+            return None  # Older rows hold a file path or placeholder text
+
+        key = (content_key(data), size)
+        photo = self.photos.get(key)
+        if photo is not None:
+            self.photos.move_to_end(key)
+            return photo
+
+        image = Image.open(io.BytesIO(data))
+        if size is not None:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        photo = ImageTk.PhotoImage(image)
+
+        self.photos[key] = photo
+        if len(self.photos) > self.size:
+            self.photos.popitem(last=False)
+        return photo
@@ -0,0 +1,302 @@
+import argparse
+import csv
+import os
+import time
+from datetime import date, datetime
+
+from db import DB_PATH, connect, immediate
+from services import EMAIL_REGEX
+
+CHUNK_SIZE = 5000  # Rows validated and inserted per executemany batch
+
+# Spreadsheet headings accepted for each column, after lower-casing and
+# replacing spaces with underscores
+ALIASES = {
+    "product_name": "name",
+    "customer_name": "name",
+    "stock": "quantity",
+    "qty": "quantity",
+    "date": "order_date",
+}
+
+
+class ImportResult:
+    """Outcome of one import: rows inserted, rows rejected and the time taken."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.imported = 0
+        self.rejected = []  # (line number, reason)
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        total = self.imported + len(self.rejected)
+        return total / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"Imported {self.imported} {self.kind}, rejected {len(self.rejected)} row(s) "
+                f"in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/sec).")
+
+
+def normalize_header(heading):
+    key = str(heading or "").strip().lower().replace(" ", "_")
+    return ALIASES.get(key, key)
+
+
+def text(row, column):
+    """Cell value as a stripped string ('' when missing)."""
+    value = row.get(column)
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Spreadsheets hand back whole numbers as floats
+    return str(value).strip()
+
+
+def required(row, column):
+    value = text(row, column)
+    if not value:
+        raise ValueError(f"{column} is required")
+    return value
+
+
+def whole_number(row, column, minimum=0):
+    value = required(row, column)
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{column} must be a whole number, got '{value}'")
+    if number < minimum:
+        raise ValueError(f"{column} must be at least {minimum}, got {number}")
+    return number
+
+
+def positive_number(row, column):
+    value = required(row, column)
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{column} must be a number, got '{value}'")
+    if number <= 0:
+        raise ValueError(f"{column} must be greater than zero, got {value}")
+    return number
+
+
+class Rows:
+    """Validates file rows into insert parameters for one table."""
+
+    insert_sql = None
+
+    def write(self, conn, batch):
+        conn.executemany(self.insert_sql, batch)
+
+
+class ProductRows(Rows):
+    """Validate product rows: name, price, quantity. Names must be unique."""
+
+    insert_sql = "INSERT INTO products (name, price, quantity) VALUES (?, ?, ?)"
+
+    def __init__(self, conn):
+        self.names = {name for (name,) in conn.execute("SELECT name FROM products")}
+
+    def convert(self, row):
+        name = required(row, "name")
+        if name in self.names:
+            raise ValueError(f"a product named '{name}' already exists")
+        price = positive_number(row, "price")
+        quantity = whole_number(row, "quantity")
+        self.names.add(name)
+        return name, price, quantity
+
+
+class CustomerRows(Rows):
+    """Validate customer rows: name, email, phone."""
+
+    insert_sql = "INSERT INTO customers (name, email, phone) VALUES (?, ?, ?)"
+
+    def __init__(self, conn):
+        pass
+
+    def convert(self, row):
+        name = required(row, "name")
+        email = required(row, "email")
+        if not EMAIL_REGEX.match(email):
+            raise ValueError(f"invalid email '{email}'")
+        phone = required(row, "phone")
+        return name, email, phone
+
+
+class OrderRows(Rows):
+    """Validate order rows against customers and products loaded once up front.
+
+    Columns are customer_id, product_id, quantity, order_date and an optional
+    price, which must match the product's price as in the order form. Each
+    row becomes an order with a single line. Stock is tracked across the
+    file so the rows together cannot oversell a product; the import holds
+    the write lock from before the lookups are loaded, so the counts stay
+    exact until the stock is taken, and order ids can be assigned here so
+    headers and lines are both written with executemany.
+    """
+
+    insert_sql = "INSERT INTO orders (order_id, customer_id, total_price, order_date) VALUES (?, ?, ?, ?)"
+    items_sql = """INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total)
+                   VALUES (?, ?, ?, ?, ?)"""
+
+    def __init__(self, conn):
+        self.customers = {customer_id for (customer_id,) in conn.execute("SELECT customer_id FROM customers")}
+        self.prices = {}
+        self.stock = {}
+        for product_id, price, quantity in conn.execute("SELECT product_id, price, quantity FROM products"):
+            self.prices[product_id] = price
+            self.stock[product_id] = quantity or 0
+        self.next_order_id = conn.execute("SELECT COALESCE(MAX(order_id), 0) + 1 FROM orders").fetchone()[0]
+
+    def convert(self, row):
+        customer_id = whole_number(row, "customer_id", minimum=1)
+        if customer_id not in self.customers:
+            raise ValueError(f"customer {customer_id} does not exist")
+        product_id = whole_number(row, "product_id", minimum=1)
+        if product_id not in self.prices:
+            raise ValueError(f"product {product_id} does not exist")
+        quantity = whole_number(row, "quantity", minimum=1)
+        price = self.prices[product_id]
+        if text(row, "price") and positive_number(row, "price") != price:
+            raise ValueError(f"price mismatch for product {product_id}: expected {price}, got {text(row, 'price')}")
+        if quantity > self.stock[product_id]:
+            raise ValueError(f"insufficient stock for product {product_id}: {self.stock[product_id]} available")
+        order_date = required(row, "order_date")
+        try:
+            datetime.strptime(order_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"order_date must be YYYY-MM-DD, got '{order_date}'")
+        self.stock[product_id] -= quantity
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        return order_id, customer_id, product_id, quantity, price, order_date
+
+    def write(self, conn, batch):
+        # Stock is taken by the writer, not by a trigger
+        conn.executemany("UPDATE products SET quantity = quantity - ? WHERE product_id = ?",
+                         ((quantity, product_id) for _, _, product_id, quantity, _, _ in batch))
+        conn.executemany(self.insert_sql, ((order_id, customer_id, price * quantity, order_date)
+                                           for order_id, customer_id, _, quantity, price, order_date in batch))
+        conn.executemany(self.items_sql, ((order_id, product_id, quantity, price, price * quantity)
+                                          for order_id, _, product_id, quantity, price, _ in batch))
+
+
+IMPORTERS = {
+    "products": ProductRows,
+    "customers": CustomerRows,
+    "orders": OrderRows,
+}
+
+
+def csv_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [normalize_header(h) for h in next(reader, [])]
+        for line, values in enumerate(reader, start=2):
+            if any(v.strip() for v in values):
+                yield line, dict(zip(header, values))
+
+
+def xlsx_rows(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Importing .xlsx files requires openpyxl (pip install openpyxl)")
+
+    # read_only streams rows from the archive instead of loading the whole sheet
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [normalize_header(h) for h in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if any(v is not None and str(v).strip() for v in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield lists of (line number, row dict) from a CSV or XLSX file, chunk_size rows at a time."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        rows = csv_rows(path)
+    elif extension in (".xlsx", ".xlsm"):
+        rows = xlsx_rows(path)
+    else:
+        raise ValueError(f"Unsupported file type '{extension}'; use .csv or .xlsx")
+
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_file(conn, kind, path, chunk_size):
+    rows = IMPORTERS[kind](conn)
+    result = ImportResult(kind)
+    for chunk in read_chunks(path, chunk_size):
+        batch = []
+        for line, row in chunk:
+            try:
+                batch.append(rows.convert(row))
+            except ValueError as error:
+                result.rejected.append((line, str(error)))
+        rows.write(conn, batch)
+        result.imported += len(batch)
+    return result
+
+
+def import_file(conn, kind, path, chunk_size=CHUNK_SIZE):
+    """Stream a CSV/XLSX file into a table in one IMMEDIATE transaction; returns an ImportResult.
+
+    Invalid rows are skipped and reported; valid rows are inserted with
+    executemany one chunk at a time, so memory stays flat for large files.
+    """
+    start = time.perf_counter()
+    result = immediate(conn, load_file, kind, path, chunk_size)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def write_rejects(path, rejected):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["line", "reason"])
+        writer.writerows(rejected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import products, customers or orders from CSV/XLSX")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help=".csv or .xlsx file with a header row")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--rejects", help="write rejected rows (line, reason) to this CSV file")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    result = import_file(conn, args.kind, args.path, args.chunk_size)
+    conn.close()
+
+    for line, reason in result.rejected[:20]:
+        print(f"Line {line}: {reason}")
+    if len(result.rejected) > 20:
+        print(f"... and {len(result.rejected) - 20} more")
+    if args.rejects and result.rejected:
+        write_rejects(args.rejects, result.rejected)
+    print(result.summary())
+    raise SystemExit(1 if result.rejected else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
-import bcrypt
-
-# Database setup (to make sure the users table is created)
-conn = sqlite3.connect('business.db')
-cursor = conn.cursor()
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS users (
-    username TEXT PRIMARY KEY,
-    password TEXT NOT NULL
-)
-""")
-conn.commit()
+import repository
+from db_executor import show_error
 
 
 # Center the window at the middle of your screen
@@ -27,12 +15,16 @@ def center_window(window, width, height):
 
 
 class LoginPage:
-    def __init__(self, root, on_success):
-        self.root = root
+    def __init__(self, frame, router, on_success):
+        self.frame = frame
+        self.router = router
+        self.root = router.root
         self.root.title("Login")
         # self.root.geometry("400x400")
-        self.root.configure(bg="#426cf5")  # Set background color
+        self.frame.configure(bg="#426cf5")  # Set background color
         self.on_success = on_success
+        self.db = router.db  # Runs the user lookup off the Tk thread
+        self.auth = router.auth  # Runs bcrypt off the Tk thread
         self.create_widgets()
         center_window(self.root, 400, 400)  # Call the center method
 
@@ -52,20 +44,23 @@ class LoginPage:
         self.style.configure("TEntry", font=("times new roman", 12))
 
         # Title
-        self.title_label = tk.Label(self.root, text="Admin Login", font=("times new roman", 16, "bold"), bg="#426cf5", fg="white")
+        self.title_label = tk.Label(self.frame, text="Admin Login", font=("times new roman", 16, "bold"), bg="#426cf5", fg="white")
         self.title_label.pack(pady=20)
 
         # Username
-        self.username_label = ttk.Label(self.root, text="Username:")
-        self.username_entry = ttk.Entry(self.root, width=30)
+        self.username_label = ttk.Label(self.frame, text="Username:")
+        self.username_entry = ttk.Entry(self.frame, width=30)
 
         # Password
-        self.password_label = ttk.Label(self.root, text="Password:")
-        self.password_entry = ttk.Entry(self.root, width=30, show="*")
+        self.password_label = ttk.Label(self.frame, text="Password:")
+        self.password_entry = ttk.Entry(self.frame, width=30, show="*")
 
         # Buttons
-        self.login_button = ttk.Button(self.root, text="Login",command=self.login)
-        self.signup_button = ttk.Button(self.root, text="Sign Up", command=self.signup)
+        self.login_button = ttk.Button(self.frame, text="Login",command=self.login)
+        self.signup_button = ttk.Button(self.frame, text="Sign Up", command=self.signup)
+
+        # Spinner shown while the password is being checked
+        self.spinner = ttk.Progressbar(self.frame, mode="indeterminate", length=200)
 
         # Layout
         self.username_label.pack(pady=5)
@@ -83,25 +78,55 @@ class LoginPage:
             messagebox.showwarning("Input Error", "Please enter both username and password")
             return
 
-        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-        user = cursor.fetchone()
+        def job(conn):
+            return repository.fetchone(conn, "user_by_name", (username,))
 
-        if user:
-            stored_password = user[1]
-            if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
+        def found(user):
+            if user:
+                stored_password = user[1]
+                self.auth.verify_password(password, stored_password, verified, unreadable)
+            else:
+                self.set_busy(False)
+                messagebox.showerror("Login Failed", "User does not exist")
+
+        def verified(result):
+            self.set_busy(False)
+            ok, new_hash = result
+            if ok:
+                if new_hash:
+                    # Stored hash used an outdated work factor; upgrade it
+                    self.db.submit(lambda conn: repository.execute(conn, "update_password", (new_hash, username)),
+                                   write=True)
                 messagebox.showinfo("Login Success", "Logged in successfully!")
-                self.root.destroy()
                 self.on_success()
             else:
                 messagebox.showerror("Login Failed", "Invalid username or password")
+
+        def unreadable(error):
+            # A legacy or corrupted stored hash that bcrypt cannot check
+            self.set_busy(False)
+            messagebox.showerror("Login Failed", f"The stored password for this account cannot be checked: {error}")
+
+        def failed(error):
+            self.set_busy(False)
+            show_error(error)
+
+        self.set_busy(True)
+        self.db.submit(job, found, failed)
+
+    def set_busy(self, busy):
+        """Show the spinner and block repeat clicks while a login is in flight."""
+        if busy:
+            self.login_button.state(["disabled"])
+            self.spinner.pack(pady=5)
+            self.spinner.start(10)
         else:
-            messagebox.showerror("Login Failed", "User does not exist")
+            self.spinner.stop()
+            self.spinner.pack_forget()
+            self.login_button.state(["!disabled"])
 
     def signup(self):
         # Import SignupPage inside the method to avoid circular import
         from signup import SignupPage  # Importing here to avoid circular import
-        # Destroy current login window and create a new signup window
-        self.root.destroy()
-        root = tk.Tk()
-        SignupPage(root, self.on_success)  # Pass on_success to SignupPage
-        root.mainloop()
+        # Swap this screen for the signup screen in the same window
+        self.router.show(SignupPage, self.on_success)  # Pass on_success to SignupPage
@@ -1,16 +1,19 @@
 import tkinter as tk
+from migrations import migrate
 from login import LoginPage
-from dashboard import Dashboard
+from router import ScreenRouter
 
-def show_dashboard():
-    root = tk.Tk()
-    dashboard = Dashboard(root)  # Initialize Dashboard (no show() needed)
-    root.mainloop()
+def show_dashboard(router):
+    # Imported after login so the dashboard (and PIL) do not delay the login window
+    from dashboard import Dashboard
+    router.show(Dashboard)  # Replaces the login screen in the same window
 
 def main():
     """Start the Login page if user is not logged in"""
+    migrate()  # Create or upgrade the database schema before any screen opens
     root = tk.Tk()
-    LoginPage(root, show_dashboard)
+    router = ScreenRouter(root)
+    router.show(LoginPage, lambda: show_dashboard(router))
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+import argparse
+
+from db import DB_PATH, connect
+from reorder import purchase_suggestions, refresh_reorder_points
+
+DRIFT_TOLERANCE = 0.005  # Totals are money; ignore floating point dust
+
+
+def check_totals(conn):
+    """Recompute every customer's total_spent in one pass and return the drift.
+
+    Returns (customer_id, stored, actual) for each customer whose stored total
+    differs from the sum of their orders.
+    """
+    return conn.execute("""
+        SELECT c.customer_id, COALESCE(c.total_spent, 0), COALESCE(s.total, 0)
+        FROM customers c
+        LEFT JOIN (
+            SELECT customer_id, SUM(total_price) AS total
+            FROM orders
+            GROUP BY customer_id
+        ) s ON s.customer_id = c.customer_id
+        WHERE ABS(COALESCE(c.total_spent, 0) - COALESCE(s.total, 0)) > ?
+        ORDER BY c.customer_id
+    """, (DRIFT_TOLERANCE,)).fetchall()
+
+
+def check_order_totals(conn):
+    """Orders whose header total differs from the sum of their lines: (order_id, stored, actual)."""
+    return conn.execute("""
+        SELECT o.order_id, o.total_price, COALESCE(s.total, 0)
+        FROM orders o
+        LEFT JOIN (
+            SELECT order_id, SUM(line_total) AS total
+            FROM order_items
+            GROUP BY order_id
+        ) s ON s.order_id = o.order_id
+        WHERE ABS(o.total_price - COALESCE(s.total, 0)) > ?
+        ORDER BY o.order_id
+    """, (DRIFT_TOLERANCE,)).fetchall()
+
+
+def check_stock(conn):
+    """Products whose stock has been driven below zero."""
+    return conn.execute("""
+        SELECT product_id, name, quantity
+        FROM products
+        WHERE quantity < 0
+        ORDER BY product_id
+    """).fetchall()
+
+
+def fix_totals(conn, drift):
+    """Overwrite drifted customer totals with the recomputed values."""
+    conn.executemany("UPDATE customers SET total_spent = ? WHERE customer_id = ?",
+                     ((actual, customer_id) for customer_id, _, actual in drift))
+    conn.commit()
+
+
+def rebuild_rollups(conn):
+    """Recompute the daily_sales and product_sales rollups from orders and their lines in one transaction.
+
+    The weekly, monthly and quarterly sales buckets (migration 8) are then
+    recomputed from daily_sales in one pass; the daily_sales triggers that
+    keep them up row by row are dropped meanwhile and recreated in the same
+    transaction. The data versions of orders and order_items are bumped so
+    cached reports built on the old rollups are not served again.
+    """
+    with conn:
+        triggers = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'daily_sales'").fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DELETE FROM daily_sales")
+        conn.execute("""
+            INSERT INTO daily_sales (order_date, total_sales, order_count)
+            SELECT order_date, SUM(total_price), COUNT(*) FROM orders GROUP BY order_date
+        """)
+        conn.execute("DELETE FROM product_sales")
+        conn.execute("""
+            INSERT INTO product_sales (product_id, units_sold)
+            SELECT product_id, SUM(quantity) FROM order_items
+            WHERE product_id IN (SELECT product_id FROM products)
+            GROUP BY product_id
+        """)
+        conn.execute("DELETE FROM sales_buckets")
+        conn.execute("""
+            INSERT INTO sales_buckets (grain, period, total_sales, order_count)
+            SELECT 'week', date(order_date, '-' || ((strftime('%w', order_date) + 6) % 7) || ' days') AS period,
+                   SUM(total_sales), SUM(order_count)
+            FROM daily_sales GROUP BY period
+            UNION ALL
+            SELECT 'month', date(order_date, 'start of month') AS period, SUM(total_sales), SUM(order_count)
+            FROM daily_sales GROUP BY period
+            UNION ALL
+            SELECT 'quarter', date(order_date, 'start of month',
+                                   '-' || ((strftime('%m', order_date) - 1) % 3) || ' months') AS period,
+                   SUM(total_sales), SUM(order_count)
+            FROM daily_sales GROUP BY period
+        """)
+        for _, sql in triggers:
+            conn.execute(sql)
+        # The reports read these rollups under the orders and order_items versions (reports.REPORT_TABLES)
+        conn.execute("UPDATE data_versions SET version = version + 1 WHERE name IN ('orders', 'order_items')")
+
+
+def run_check(args):
+    conn = connect(args.db)
+    drift = check_totals(conn)
+    orders = check_order_totals(conn)
+    negative = check_stock(conn)
+
+    for customer_id, stored, actual in drift:
+        print(f"Customer {customer_id}: total_spent {stored:.2f}, orders sum to {actual:.2f} "
+              f"(drift {stored - actual:+.2f})")
+    for order_id, stored, actual in orders:
+        print(f"Order {order_id}: total {stored:.2f}, lines sum to {actual:.2f}")
+    for product_id, name, quantity in negative:
+        print(f"Product {product_id} ({name}): negative stock {quantity}")
+    print(f"{len(drift)} customer total(s) drifted, {len(orders)} order total(s) off their lines, "
+          f"{len(negative)} product(s) with negative stock.")
+
+    if drift and args.fix:
+        fix_totals(conn, drift)
+        print(f"Fixed {len(drift)} customer total(s).")
+    conn.close()
+    return 1 if (drift and not args.fix) or orders or negative else 0
+
+
+def run_rebuild(args):
+    conn = connect(args.db)
+    rebuild_rollups(conn)
+    days = conn.execute("SELECT COUNT(*) FROM daily_sales").fetchone()[0]
+    products = conn.execute("SELECT COUNT(*) FROM product_sales").fetchone()[0]
+    conn.close()
+    print(f"Rebuilt rollups: {days} sales day(s), {products} product(s).")
+    return 0
+
+
+def run_reorder(args):
+    conn = connect(args.db)
+    with conn:
+        products = refresh_reorder_points(conn)
+    batches = purchase_suggestions(conn)
+    conn.close()
+    print(f"Reorder points set for {products} product(s).")
+    for _, supplier, contact, lines in batches:
+        print(f"{supplier or '(no supplier)'}" + (f" <{contact}>" if contact else ""))
+        for product_id, name, quantity, point, suggested, _, _ in lines:
+            print(f"  {name} (#{product_id}): {quantity} in stock, reorder point {point}, order {suggested}")
+    print(f"{sum(len(batch[3]) for batch in batches)} product(s) to reorder.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Business Management System database maintenance")
+    parser.add_argument("--db", default=DB_PATH, help="database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser("check", help="recompute customer totals and report drift")
+    check.add_argument("--fix", action="store_true", help="write the recomputed totals back")
+    check.set_defaults(run=run_check)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="recompute the sales rollup tables from orders")
+    rebuild.set_defaults(run=run_rebuild)
+
+    reorder = commands.add_parser("reorder", help="recompute reorder points and list purchase suggestions")
+    reorder.set_defaults(run=run_reorder)
+
+    args = parser.parse_args()
+    raise SystemExit(args.run(args))
+
+
+if __name__ == "__main__":
+    main()
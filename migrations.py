@@ -0,0 +1,958 @@
+import sys
+from datetime import datetime
+
+from db import DB_PATH, connect
+
+# Schema changes, applied in order and exactly once per database. Each entry is
+# (version, description, statements); a migration runs in a single transaction
+# and is recorded in the schema_version table. Never edit a released
+# migration - append a new one instead.
+MIGRATIONS = [
+    (1, "Baseline schema", [
+        # IF NOT EXISTS lets databases created before migrations adopt version 1
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS customers (
+            customer_id INTEGER PRIMARY KEY,
+            name TEXT,
+            email TEXT,
+            phone TEXT,
+            total_spent REAL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            product_id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE,
+            price REAL,
+            quantity INTEGER,
+            image BLOB
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id INTEGER PRIMARY KEY,
+            customer_id INTEGER,
+            product_id INTEGER,
+            quantity INTEGER,
+            total_price REAL,
+            order_date TEXT,
+            FOREIGN KEY (customer_id) REFERENCES customers (customer_id) ON DELETE CASCADE,
+            FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS employees (
+            employee_id INTEGER PRIMARY KEY,
+            name TEXT,
+            role TEXT,
+            phone TEXT,
+            email TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS suppliers (
+            supplier_id INTEGER PRIMARY KEY,
+            name TEXT,
+            contact TEXT,
+            product_supplied INTEGER,
+            FOREIGN KEY (product_supplied) REFERENCES products (product_id) ON DELETE SET NULL
+        )
+        """,
+        """
+        CREATE VIEW IF NOT EXISTS sales_summary AS
+        SELECT
+            o.order_date AS order_date,
+            SUM(o.total_price) AS total_sales
+        FROM orders o
+        GROUP BY o.order_date
+        """,
+        """
+        CREATE VIEW IF NOT EXISTS stock_summary AS
+        SELECT
+            p.name AS product_name,
+            SUM(o.quantity) AS total_sold
+        FROM orders o
+        JOIN products p ON o.product_id = p.product_id
+        GROUP BY p.name
+        """,
+        """
+        CREATE VIEW IF NOT EXISTS customer_spending_summary AS
+        SELECT
+            c.name AS customer_name,
+            SUM(o.total_price) AS total_spent
+        FROM orders o
+        JOIN customers c ON o.customer_id = c.customer_id
+        GROUP BY c.name
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS update_customer_total_spent
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = (SELECT SUM(total_price) FROM orders WHERE customer_id = NEW.customer_id)
+            WHERE customer_id = NEW.customer_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS update_product_stock
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE products
+            SET quantity = quantity - NEW.quantity
+            WHERE product_id = NEW.product_id;
+        END
+        """,
+    ]),
+    (2, "Indexes for order lookups, triggers and reports", [
+        # Per-customer spend (trigger and customer_spending_summary) and the ON DELETE CASCADE lookup
+        "CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders (customer_id, total_price)",
+        # Units sold per product (stock_summary) and the ON DELETE CASCADE lookup
+        "CREATE INDEX IF NOT EXISTS idx_orders_product ON orders (product_id, quantity)",
+        # Covering index for sales_summary and sales-for-date lookups
+        "CREATE INDEX IF NOT EXISTS idx_orders_date_total ON orders (order_date, total_price)",
+        # ON DELETE SET NULL lookup when a product is removed
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_product ON suppliers (product_supplied)",
+        "ANALYZE",
+    ]),
+    (3, "Delta triggers keeping customer totals and stock in step with orders", [
+        # The insert trigger re-summed every order of the customer; updates and
+        # deletes were not tracked at all
+        "DROP TRIGGER IF EXISTS update_customer_total_spent",
+        "DROP TRIGGER IF EXISTS update_product_stock",
+        """
+        CREATE TRIGGER orders_after_insert
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) + NEW.total_price
+            WHERE customer_id = NEW.customer_id;
+
+            UPDATE products
+            SET quantity = quantity - NEW.quantity
+            WHERE product_id = NEW.product_id;
+        END
+        """,
+        """
+        CREATE TRIGGER orders_after_update
+        AFTER UPDATE OF customer_id, product_id, quantity, total_price ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) - OLD.total_price
+            WHERE customer_id = OLD.customer_id;
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) + NEW.total_price
+            WHERE customer_id = NEW.customer_id;
+
+            UPDATE products
+            SET quantity = quantity + OLD.quantity
+            WHERE product_id = OLD.product_id;
+            UPDATE products
+            SET quantity = quantity - NEW.quantity
+            WHERE product_id = NEW.product_id;
+        END
+        """,
+        """
+        CREATE TRIGGER orders_after_delete
+        AFTER DELETE ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) - OLD.total_price
+            WHERE customer_id = OLD.customer_id;
+
+            UPDATE products
+            SET quantity = quantity + OLD.quantity
+            WHERE product_id = OLD.product_id;
+        END
+        """,
+        # Start from correct totals; earlier updates and deletes were never applied
+        """
+        UPDATE customers
+        SET total_spent = COALESCE((SELECT SUM(total_price) FROM orders o
+                                    WHERE o.customer_id = customers.customer_id), 0)
+        """,
+    ]),
+    (4, "Trigger-maintained sales rollups for the analytics reports", [
+        # Sales per order date (replaces the sales_summary aggregation)
+        """
+        CREATE TABLE daily_sales (
+            order_date TEXT PRIMARY KEY,
+            total_sales REAL NOT NULL DEFAULT 0,
+            order_count INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        # Units sold per product (replaces the stock_summary aggregation)
+        """
+        CREATE TABLE product_sales (
+            product_id INTEGER PRIMARY KEY,
+            units_sold INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
+        )
+        """,
+        # Spend per customer is customers.total_spent, kept by the migration 3 triggers;
+        # these indexes let the threshold reports read only the rows they return
+        "CREATE INDEX idx_product_sales_units ON product_sales (units_sold)",
+        "CREATE INDEX idx_customers_total_spent ON customers (total_spent)",
+        """
+        CREATE TRIGGER orders_rollup_insert
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO daily_sales (order_date, total_sales, order_count)
+            VALUES (NEW.order_date, NEW.total_price, 1)
+            ON CONFLICT (order_date) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + 1;
+
+            INSERT INTO product_sales (product_id, units_sold)
+            VALUES (NEW.product_id, NEW.quantity)
+            ON CONFLICT (product_id) DO UPDATE
+            SET units_sold = units_sold + excluded.units_sold;
+        END
+        """,
+        """
+        CREATE TRIGGER orders_rollup_update
+        AFTER UPDATE OF product_id, quantity, total_price, order_date ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE daily_sales
+            SET total_sales = total_sales - OLD.total_price,
+                order_count = order_count - 1
+            WHERE order_date = OLD.order_date;
+            DELETE FROM daily_sales WHERE order_date = OLD.order_date AND order_count = 0;
+            INSERT INTO daily_sales (order_date, total_sales, order_count)
+            VALUES (NEW.order_date, NEW.total_price, 1)
+            ON CONFLICT (order_date) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + 1;
+
+            UPDATE product_sales
+            SET units_sold = units_sold - OLD.quantity
+            WHERE product_id = OLD.product_id;
+            INSERT INTO product_sales (product_id, units_sold)
+            VALUES (NEW.product_id, NEW.quantity)
+            ON CONFLICT (product_id) DO UPDATE
+            SET units_sold = units_sold + excluded.units_sold;
+        END
+        """,
+        """
+        CREATE TRIGGER orders_rollup_delete
+        AFTER DELETE ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE daily_sales
+            SET total_sales = total_sales - OLD.total_price,
+                order_count = order_count - 1
+            WHERE order_date = OLD.order_date;
+            DELETE FROM daily_sales WHERE order_date = OLD.order_date AND order_count = 0;
+
+            UPDATE product_sales
+            SET units_sold = units_sold - OLD.quantity
+            WHERE product_id = OLD.product_id;
+        END
+        """,
+        # Backfill from the existing orders
+        """
+        INSERT INTO daily_sales (order_date, total_sales, order_count)
+        SELECT order_date, SUM(total_price), COUNT(*) FROM orders GROUP BY order_date
+        """,
+        """
+        INSERT INTO product_sales (product_id, units_sold)
+        SELECT product_id, SUM(quantity) FROM orders
+        WHERE product_id IN (SELECT product_id FROM products)
+        GROUP BY product_id
+        """,
+    ]),
+    (5, "Stock is reserved by the order writer; guard order edits against overselling", [
+        # New orders take their stock with a conditional UPDATE in the same
+        # transaction (services.place_order), so the insert trigger no longer
+        # decrements it unconditionally
+        "DROP TRIGGER orders_after_insert",
+        """
+        CREATE TRIGGER orders_after_insert
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) + NEW.total_price
+            WHERE customer_id = NEW.customer_id;
+        END
+        """,
+        # Editing an order moves stock in orders_after_update; refuse edits
+        # that would need more than the product has (counting the stock the
+        # order already holds when the product is unchanged)
+        """
+        CREATE TRIGGER orders_stock_guard
+        BEFORE UPDATE OF product_id, quantity ON orders
+        FOR EACH ROW
+        WHEN NEW.quantity > COALESCE((SELECT quantity FROM products WHERE product_id = NEW.product_id), 0)
+                            + CASE WHEN NEW.product_id = OLD.product_id THEN OLD.quantity ELSE 0 END
+        BEGIN
+            SELECT RAISE(ABORT, 'Insufficient stock');
+        END
+        """,
+    ]),
+    (6, "Orders become a header with line items", [
+        # An order held a single product, so a basket of n products cost n
+        # order rows and n firings of every orders trigger. The header keeps
+        # the customer, date and total; order_items holds one row per product.
+        # Views and triggers on orders are dropped with it and recreated below.
+        "DROP VIEW sales_summary",
+        "DROP VIEW stock_summary",
+        "DROP VIEW customer_spending_summary",
+        # Staged outside orders: dropping orders with foreign keys on would
+        # cascade into order_items if it already referenced the old table
+        """
+        CREATE TEMP TABLE migration_order_lines AS
+        SELECT order_id, product_id, quantity, total_price FROM orders
+        """,
+        """
+        CREATE TABLE orders_header (
+            order_id INTEGER PRIMARY KEY,
+            customer_id INTEGER,
+            total_price REAL NOT NULL DEFAULT 0,
+            order_date TEXT,
+            FOREIGN KEY (customer_id) REFERENCES customers (customer_id) ON DELETE CASCADE
+        )
+        """,
+        """
+        INSERT INTO orders_header (order_id, customer_id, total_price, order_date)
+        SELECT order_id, customer_id, COALESCE(total_price, 0), order_date FROM orders
+        """,
+        "DROP TABLE orders",
+        "ALTER TABLE orders_header RENAME TO orders",
+        """
+        CREATE TABLE order_items (
+            item_id INTEGER PRIMARY KEY,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER,
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            line_total REAL NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders (order_id) ON DELETE CASCADE,
+            FOREIGN KEY (product_id) REFERENCES products (product_id) ON DELETE CASCADE
+        )
+        """,
+        """
+        INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total)
+        SELECT order_id, product_id, COALESCE(quantity, 0),
+               COALESCE(total_price / NULLIF(quantity, 0), 0), COALESCE(total_price, 0)
+        FROM migration_order_lines
+        ORDER BY order_id
+        """,
+        "DROP TABLE migration_order_lines",
+        "CREATE INDEX idx_orders_customer ON orders (customer_id, total_price)",
+        "CREATE INDEX idx_orders_date_total ON orders (order_date, total_price)",
+        # Lines of an order, and the ON DELETE CASCADE lookup from orders
+        "CREATE INDEX idx_order_items_order ON order_items (order_id)",
+        # Units sold per product (stock_summary) and the ON DELETE CASCADE lookup from products
+        "CREATE INDEX idx_order_items_product ON order_items (product_id, quantity)",
+        """
+        CREATE VIEW sales_summary AS
+        SELECT
+            o.order_date AS order_date,
+            SUM(o.total_price) AS total_sales
+        FROM orders o
+        GROUP BY o.order_date
+        """,
+        """
+        CREATE VIEW stock_summary AS
+        SELECT
+            p.name AS product_name,
+            SUM(i.quantity) AS total_sold
+        FROM order_items i
+        JOIN products p ON i.product_id = p.product_id
+        GROUP BY p.name
+        """,
+        """
+        CREATE VIEW customer_spending_summary AS
+        SELECT
+            c.name AS customer_name,
+            SUM(o.total_price) AS total_spent
+        FROM orders o
+        JOIN customers c ON o.customer_id = c.customer_id
+        GROUP BY c.name
+        """,
+        # Header triggers fire once per order, however many lines it has, and
+        # keep customers.total_spent and daily_sales in step with the total
+        """
+        CREATE TRIGGER orders_after_insert
+        AFTER INSERT ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) + NEW.total_price
+            WHERE customer_id = NEW.customer_id;
+
+            INSERT INTO daily_sales (order_date, total_sales, order_count)
+            VALUES (NEW.order_date, NEW.total_price, 1)
+            ON CONFLICT (order_date) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER orders_after_update
+        AFTER UPDATE OF customer_id, total_price, order_date ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) - OLD.total_price
+            WHERE customer_id = OLD.customer_id;
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) + NEW.total_price
+            WHERE customer_id = NEW.customer_id;
+
+            UPDATE daily_sales
+            SET total_sales = total_sales - OLD.total_price,
+                order_count = order_count - 1
+            WHERE order_date = OLD.order_date;
+            DELETE FROM daily_sales WHERE order_date = OLD.order_date AND order_count = 0;
+            INSERT INTO daily_sales (order_date, total_sales, order_count)
+            VALUES (NEW.order_date, NEW.total_price, 1)
+            ON CONFLICT (order_date) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER orders_after_delete
+        AFTER DELETE ON orders
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_spent = COALESCE(total_spent, 0) - OLD.total_price
+            WHERE customer_id = OLD.customer_id;
+
+            UPDATE daily_sales
+            SET total_sales = total_sales - OLD.total_price,
+                order_count = order_count - 1
+            WHERE order_date = OLD.order_date;
+            DELETE FROM daily_sales WHERE order_date = OLD.order_date AND order_count = 0;
+        END
+        """,
+        # Line triggers only maintain product_sales on insert: the writer takes
+        # the stock and writes the header total for the whole basket at once
+        """
+        CREATE TRIGGER order_items_after_insert
+        AFTER INSERT ON order_items
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO product_sales (product_id, units_sold)
+            VALUES (NEW.product_id, NEW.quantity)
+            ON CONFLICT (product_id) DO UPDATE
+            SET units_sold = units_sold + excluded.units_sold;
+        END
+        """,
+        # Edited or removed lines move stock, units sold and the header total
+        # (which in turn updates the customer and daily_sales). When a whole
+        # order is deleted its header is already gone, so only stock and
+        # units sold change here.
+        """
+        CREATE TRIGGER order_items_after_update
+        AFTER UPDATE OF product_id, quantity, line_total ON order_items
+        FOR EACH ROW
+        BEGIN
+            UPDATE products
+            SET quantity = quantity + OLD.quantity
+            WHERE product_id = OLD.product_id;
+            UPDATE products
+            SET quantity = quantity - NEW.quantity
+            WHERE product_id = NEW.product_id;
+
+            UPDATE product_sales
+            SET units_sold = units_sold - OLD.quantity
+            WHERE product_id = OLD.product_id;
+            INSERT INTO product_sales (product_id, units_sold)
+            VALUES (NEW.product_id, NEW.quantity)
+            ON CONFLICT (product_id) DO UPDATE
+            SET units_sold = units_sold + excluded.units_sold;
+
+            UPDATE orders
+            SET total_price = total_price - OLD.line_total + NEW.line_total
+            WHERE order_id = NEW.order_id;
+        END
+        """,
+        """
+        CREATE TRIGGER order_items_after_delete
+        AFTER DELETE ON order_items
+        FOR EACH ROW
+        BEGIN
+            UPDATE products
+            SET quantity = quantity + OLD.quantity
+            WHERE product_id = OLD.product_id;
+
+            UPDATE product_sales
+            SET units_sold = units_sold - OLD.quantity
+            WHERE product_id = OLD.product_id;
+
+            UPDATE orders
+            SET total_price = total_price - OLD.line_total
+            WHERE order_id = OLD.order_id;
+        END
+        """,
+        # Same rule as orders_stock_guard from migration 5, now on the lines
+        """
+        CREATE TRIGGER order_items_stock_guard
+        BEFORE UPDATE OF product_id, quantity ON order_items
+        FOR EACH ROW
+        WHEN NEW.quantity > COALESCE((SELECT quantity FROM products WHERE product_id = NEW.product_id), 0)
+                            + CASE WHEN NEW.product_id = OLD.product_id THEN OLD.quantity ELSE 0 END
+        BEGIN
+            SELECT RAISE(ABORT, 'Insufficient stock');
+        END
+        """,
+        "ANALYZE",
+    ]),
+    (7, "Full-text search over products, customers, employees and suppliers", [
+        # External-content FTS5 indexes: the text stays in the base tables and
+        # the triggers below keep the index in step. '@.-_+' are part of a
+        # token, so an email address or phone number is one term and a prefix
+        # query on it stays selective; the prefix indexes answer queries of up
+        # to four characters without scanning the term list. The update
+        # triggers only fire on the indexed columns, not on every stock or
+        # total_spent change.
+        """
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            name,
+            content = 'products', content_rowid = 'product_id',
+            tokenize = "unicode61 tokenchars '@.-_+'",
+            prefix = '1 2 3 4'
+        )
+        """,
+        """
+        CREATE TRIGGER products_fts_insert
+        AFTER INSERT ON products
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO products_fts (rowid, name) VALUES (NEW.product_id, NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER products_fts_update
+        AFTER UPDATE OF name ON products
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name) VALUES ('delete', OLD.product_id, OLD.name);
+            INSERT INTO products_fts (rowid, name) VALUES (NEW.product_id, NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER products_fts_delete
+        AFTER DELETE ON products
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name) VALUES ('delete', OLD.product_id, OLD.name);
+        END
+        """,
+        "INSERT INTO products_fts (products_fts) VALUES ('rebuild')",
+        """
+        CREATE VIRTUAL TABLE customers_fts USING fts5(
+            name, email, phone,
+            content = 'customers', content_rowid = 'customer_id',
+            tokenize = "unicode61 tokenchars '@.-_+'",
+            prefix = '1 2 3 4'
+        )
+        """,
+        """
+        CREATE TRIGGER customers_fts_insert
+        AFTER INSERT ON customers
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO customers_fts (rowid, name, email, phone)
+            VALUES (NEW.customer_id, NEW.name, NEW.email, NEW.phone);
+        END
+        """,
+        """
+        CREATE TRIGGER customers_fts_update
+        AFTER UPDATE OF name, email, phone ON customers
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO customers_fts (customers_fts, rowid, name, email, phone)
+            VALUES ('delete', OLD.customer_id, OLD.name, OLD.email, OLD.phone);
+            INSERT INTO customers_fts (rowid, name, email, phone)
+            VALUES (NEW.customer_id, NEW.name, NEW.email, NEW.phone);
+        END
+        """,
+        """
+        CREATE TRIGGER customers_fts_delete
+        AFTER DELETE ON customers
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO customers_fts (customers_fts, rowid, name, email, phone)
+            VALUES ('delete', OLD.customer_id, OLD.name, OLD.email, OLD.phone);
+        END
+        """,
+        "INSERT INTO customers_fts (customers_fts) VALUES ('rebuild')",
+        """
+        CREATE VIRTUAL TABLE employees_fts USING fts5(
+            name,
+            content = 'employees', content_rowid = 'employee_id',
+            tokenize = "unicode61 tokenchars '@.-_+'",
+            prefix = '1 2 3 4'
+        )
+        """,
+        """
+        CREATE TRIGGER employees_fts_insert
+        AFTER INSERT ON employees
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO employees_fts (rowid, name) VALUES (NEW.employee_id, NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER employees_fts_update
+        AFTER UPDATE OF name ON employees
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, name) VALUES ('delete', OLD.employee_id, OLD.name);
+            INSERT INTO employees_fts (rowid, name) VALUES (NEW.employee_id, NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER employees_fts_delete
+        AFTER DELETE ON employees
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO employees_fts (employees_fts, rowid, name) VALUES ('delete', OLD.employee_id, OLD.name);
+        END
+        """,
+        "INSERT INTO employees_fts (employees_fts) VALUES ('rebuild')",
+        """
+        CREATE VIRTUAL TABLE suppliers_fts USING fts5(
+            name,
+            content = 'suppliers', content_rowid = 'supplier_id',
+            tokenize = "unicode61 tokenchars '@.-_+'",
+            prefix = '1 2 3 4'
+        )
+        """,
+        """
+        CREATE TRIGGER suppliers_fts_insert
+        AFTER INSERT ON suppliers
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO suppliers_fts (rowid, name) VALUES (NEW.supplier_id, NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER suppliers_fts_update
+        AFTER UPDATE OF name ON suppliers
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO suppliers_fts (suppliers_fts, rowid, name) VALUES ('delete', OLD.supplier_id, OLD.name);
+            INSERT INTO suppliers_fts (rowid, name) VALUES (NEW.supplier_id, NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER suppliers_fts_delete
+        AFTER DELETE ON suppliers
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO suppliers_fts (suppliers_fts, rowid, name) VALUES ('delete', OLD.supplier_id, OLD.name);
+        END
+        """,
+        "INSERT INTO suppliers_fts (suppliers_fts) VALUES ('rebuild')",
+    ]),
+    (8, "Weekly, monthly and quarterly sales buckets", [
+        # One row per grain and period, keyed by the period's first day
+        # (weeks start on Monday). Triggers on daily_sales roll every change
+        # to a day up into its week, month and quarter, so each order costs
+        # three small upserts and a trend over years reads a few dozen rows.
+        """
+        CREATE TABLE sales_buckets (
+            grain TEXT NOT NULL,
+            period TEXT NOT NULL,
+            total_sales REAL NOT NULL DEFAULT 0,
+            order_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (grain, period)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER daily_sales_after_insert
+        AFTER INSERT ON daily_sales
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO sales_buckets (grain, period, total_sales, order_count)
+            VALUES
+                ('week', date(NEW.order_date, '-' || ((strftime('%w', NEW.order_date) + 6) % 7) || ' days'),
+                 NEW.total_sales, NEW.order_count),
+                ('month', date(NEW.order_date, 'start of month'), NEW.total_sales, NEW.order_count),
+                ('quarter', date(NEW.order_date, 'start of month',
+                                 '-' || ((strftime('%m', NEW.order_date) - 1) % 3) || ' months'),
+                 NEW.total_sales, NEW.order_count)
+            ON CONFLICT (grain, period) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + excluded.order_count;
+        END
+        """,
+        # Orders only ever change a day's totals, which is one delta upsert
+        """
+        CREATE TRIGGER daily_sales_after_update
+        AFTER UPDATE ON daily_sales
+        FOR EACH ROW WHEN NEW.order_date = OLD.order_date
+        BEGIN
+            INSERT INTO sales_buckets (grain, period, total_sales, order_count)
+            VALUES
+                ('week', date(NEW.order_date, '-' || ((strftime('%w', NEW.order_date) + 6) % 7) || ' days'),
+                 NEW.total_sales - OLD.total_sales, NEW.order_count - OLD.order_count),
+                ('month', date(NEW.order_date, 'start of month'),
+                 NEW.total_sales - OLD.total_sales, NEW.order_count - OLD.order_count),
+                ('quarter', date(NEW.order_date, 'start of month',
+                                 '-' || ((strftime('%m', NEW.order_date) - 1) % 3) || ' months'),
+                 NEW.total_sales - OLD.total_sales, NEW.order_count - OLD.order_count)
+            ON CONFLICT (grain, period) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + excluded.order_count;
+        END
+        """,
+        # A day moved by hand leaves its old periods and joins its new ones
+        """
+        CREATE TRIGGER daily_sales_after_move
+        AFTER UPDATE OF order_date ON daily_sales
+        FOR EACH ROW WHEN NEW.order_date <> OLD.order_date
+        BEGIN
+            UPDATE sales_buckets
+            SET total_sales = total_sales - OLD.total_sales,
+                order_count = order_count - OLD.order_count
+            WHERE (grain = 'week'
+                   AND period = date(OLD.order_date, '-' || ((strftime('%w', OLD.order_date) + 6) % 7) || ' days'))
+               OR (grain = 'month' AND period = date(OLD.order_date, 'start of month'))
+               OR (grain = 'quarter'
+                   AND period = date(OLD.order_date, 'start of month',
+                                     '-' || ((strftime('%m', OLD.order_date) - 1) % 3) || ' months'));
+            DELETE FROM sales_buckets WHERE order_count = 0;
+
+            INSERT INTO sales_buckets (grain, period, total_sales, order_count)
+            VALUES
+                ('week', date(NEW.order_date, '-' || ((strftime('%w', NEW.order_date) + 6) % 7) || ' days'),
+                 NEW.total_sales, NEW.order_count),
+                ('month', date(NEW.order_date, 'start of month'), NEW.total_sales, NEW.order_count),
+                ('quarter', date(NEW.order_date, 'start of month',
+                                 '-' || ((strftime('%m', NEW.order_date) - 1) % 3) || ' months'),
+                 NEW.total_sales, NEW.order_count)
+            ON CONFLICT (grain, period) DO UPDATE
+            SET total_sales = total_sales + excluded.total_sales,
+                order_count = order_count + excluded.order_count;
+        END
+        """,
+        """
+        CREATE TRIGGER daily_sales_after_delete
+        AFTER DELETE ON daily_sales
+        FOR EACH ROW
+        BEGIN
+            UPDATE sales_buckets
+            SET total_sales = total_sales - OLD.total_sales,
+                order_count = order_count - OLD.order_count
+            WHERE (grain = 'week'
+                   AND period = date(OLD.order_date, '-' || ((strftime('%w', OLD.order_date) + 6) % 7) || ' days'))
+               OR (grain = 'month' AND period = date(OLD.order_date, 'start of month'))
+               OR (grain = 'quarter'
+                   AND period = date(OLD.order_date, 'start of month',
+                                     '-' || ((strftime('%m', OLD.order_date) - 1) % 3) || ' months'));
+
+            DELETE FROM sales_buckets WHERE order_count = 0 AND grain IN ('week', 'month', 'quarter')
+                AND period IN (date(OLD.order_date, '-' || ((strftime('%w', OLD.order_date) + 6) % 7) || ' days'),
+                               date(OLD.order_date, 'start of month'),
+                               date(OLD.order_date, 'start of month',
+                                    '-' || ((strftime('%m', OLD.order_date) - 1) % 3) || ' months'));
+        END
+        """,
+        # Backfill from the existing days
+        """
+        INSERT INTO sales_buckets (grain, period, total_sales, order_count)
+        SELECT 'week', date(order_date, '-' || ((strftime('%w', order_date) + 6) % 7) || ' days') AS period,
+               SUM(total_sales), SUM(order_count)
+        FROM daily_sales GROUP BY period
+        UNION ALL
+        SELECT 'month', date(order_date, 'start of month') AS period, SUM(total_sales), SUM(order_count)
+        FROM daily_sales GROUP BY period
+        UNION ALL
+        SELECT 'quarter', date(order_date, 'start of month',
+                               '-' || ((strftime('%m', order_date) - 1) % 3) || ' months') AS period,
+               SUM(total_sales), SUM(order_count)
+        FROM daily_sales GROUP BY period
+        """,
+    ]),
+    (9, "Data version counters for the report cache", [
+        # One counter per table that reports read, bumped by every write to
+        # it from any connection or process. A cached report result is
+        # stored with the counters of its tables and used only while they
+        # are unchanged. Products count only catalogue changes (not stock)
+        # and customers their names and totals.
+        """
+        CREATE TABLE data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """,
+        "INSERT INTO data_versions (name) VALUES ('orders'), ('order_items'), ('products'), ('customers')",
+    ] + [
+        f"""
+        CREATE TRIGGER {table}_version_{event.split()[0].lower()}
+        AFTER {event} ON {table}
+        FOR EACH ROW
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+        END
+        """
+        for table, event in [
+            ("orders", "INSERT"), ("orders", "UPDATE"), ("orders", "DELETE"),
+            ("order_items", "INSERT"), ("order_items", "UPDATE"), ("order_items", "DELETE"),
+            ("products", "INSERT"), ("products", "UPDATE OF name"), ("products", "DELETE"),
+            ("customers", "INSERT"), ("customers", "UPDATE OF name, total_spent"), ("customers", "DELETE"),
+        ]
+    ]),
+    (10, "Reorder points and low-stock alerts", [
+        # Stock level at which each product should be reordered, computed
+        # from its recent sales by reorder.refresh_reorder_points. Products
+        # without recent sales have no row and are never flagged.
+        """
+        CREATE TABLE reorder_points (
+            product_id INTEGER PRIMARY KEY REFERENCES products (product_id) ON DELETE CASCADE,
+            daily_units REAL NOT NULL,
+            reorder_point INTEGER NOT NULL,
+            order_up_to INTEGER NOT NULL,
+            computed_at TEXT NOT NULL
+        )
+        """,
+        # One row per product at or below its reorder point, kept by the
+        # triggers below as stock moves, so nothing has to scan products
+        """
+        CREATE TABLE stock_alerts (
+            product_id INTEGER PRIMARY KEY REFERENCES products (product_id) ON DELETE CASCADE,
+            raised_at TEXT NOT NULL
+        )
+        """,
+        # Every stock change (reservations, returned lines, product edits)
+        # is an UPDATE of products.quantity; only the product it touches is
+        # checked, with one primary key lookup
+        """
+        CREATE TRIGGER products_stock_low
+        AFTER UPDATE OF quantity ON products
+        FOR EACH ROW
+        WHEN NEW.quantity < OLD.quantity
+         AND NEW.quantity <= (SELECT reorder_point FROM reorder_points WHERE product_id = NEW.product_id)
+        BEGIN
+            INSERT OR IGNORE INTO stock_alerts (product_id, raised_at) VALUES (NEW.product_id, datetime('now'));
+        END
+        """,
+        """
+        CREATE TRIGGER products_stock_restored
+        AFTER UPDATE OF quantity ON products
+        FOR EACH ROW
+        WHEN NEW.quantity > OLD.quantity
+         AND NEW.quantity > (SELECT reorder_point FROM reorder_points WHERE product_id = NEW.product_id)
+        BEGIN
+            DELETE FROM stock_alerts WHERE product_id = NEW.product_id;
+        END
+        """,
+        # A new or moved reorder point re-checks its product's current stock
+        """
+        CREATE TRIGGER reorder_points_after_insert
+        AFTER INSERT ON reorder_points
+        FOR EACH ROW
+        BEGIN
+            INSERT OR IGNORE INTO stock_alerts (product_id, raised_at)
+            SELECT product_id, datetime('now') FROM products
+            WHERE product_id = NEW.product_id AND quantity <= NEW.reorder_point;
+        END
+        """,
+        """
+        CREATE TRIGGER reorder_points_after_update
+        AFTER UPDATE OF reorder_point ON reorder_points
+        FOR EACH ROW
+        BEGIN
+            INSERT OR IGNORE INTO stock_alerts (product_id, raised_at)
+            SELECT product_id, datetime('now') FROM products
+            WHERE product_id = NEW.product_id AND quantity <= NEW.reorder_point;
+
+            DELETE FROM stock_alerts
+            WHERE product_id = NEW.product_id
+              AND (SELECT quantity FROM products WHERE product_id = NEW.product_id) > NEW.reorder_point;
+        END
+        """,
+        """
+        CREATE TRIGGER reorder_points_after_delete
+        AFTER DELETE ON reorder_points
+        FOR EACH ROW
+        BEGIN
+            DELETE FROM stock_alerts WHERE product_id = OLD.product_id;
+        END
+        """,
+    ]),
+    (11, "Products that were ordered cannot be deleted", [
+        # order_items.product_id cascades deletes (migration 6), and the line
+        # delete trigger then takes the line off its order's total and the
+        # customer's spend, rewriting past revenue. Refusing the delete
+        # before the cascade runs acts as ON DELETE RESTRICT without
+        # rebuilding order_items.
+        """
+        CREATE TRIGGER products_delete_guard
+        BEFORE DELETE ON products
+        FOR EACH ROW
+        WHEN EXISTS (SELECT 1 FROM order_items WHERE product_id = OLD.product_id)
+        BEGIN
+            SELECT RAISE(ABORT, 'Product has been ordered');
+        END
+        """,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    """Highest migration applied to this database (0 for a fresh one)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(db_path=DB_PATH, target=LATEST_VERSION):
+    """Bring the database up to the target schema version; returns the applied versions."""
+    conn = connect(db_path, isolation_level=None)  # Transactions are managed explicitly
+    try:
+        applied = []
+        version = current_version(conn)
+        for number, description, statements in MIGRATIONS:
+            if number <= version or number > target:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                             (number, description, datetime.now().isoformat(timespec="seconds")))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(number)
+        return applied
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # Usage: python migrations.py [database path]
+    path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    applied = migrate(path)
+    print(f"Applied migrations: {applied}" if applied else "Schema is up to date.")
+    conn = connect(path)
+    print(f"Schema version: {current_version(conn)}")
+    conn.close()
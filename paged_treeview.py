@@ -0,0 +1,192 @@
+import tkinter as tk
+from bisect import bisect_left
+
+import services
+from db_executor import show_error
+
+PAGE_SIZE = 200        # Rows fetched per round trip
+LOAD_MORE_AT = 0.9     # Fetch the next page once the view is scrolled past 90%
+DEBOUNCE_MS = 250      # Pause in typing before a search is run
+
+
+class PagedTreeview:
+    """Fill a Treeview one page at a time as the user scrolls.
+
+    Rows are fetched with keyset pagination (WHERE key > ? ORDER BY key LIMIT ?),
+    so loading a page costs the same whether the table holds a hundred rows or
+    a few million, and only the pages the user actually scrolls to are held
+    in the widget. Queries run on the DBExecutor worker thread.
+    """
+
+    def __init__(self, tree, scrollbar, db, table, key_column, columns="*",
+                 page_size=PAGE_SIZE, format_row=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.db = db
+        self.table = table
+        self.key_column = key_column
+        self.columns = columns  # The key column must come first
+        self.page_size = page_size
+        # Maps a row to Treeview item options (values, image); defaults to the raw row
+        self.format_row = format_row or (lambda row: {"values": row})
+        self.last_key = None
+        self.exhausted = False
+        self.loading = False
+        self.filtered = False  # Showing a fixed set of rows (search results) rather than pages
+        self.generation = 0  # Bumped by reload() so stale pages are dropped
+
+        # Route scrolling through the pager so it can load more rows on demand
+        self.tree.config(yscrollcommand=self.on_scroll)
+
+    def reload(self):
+        """Clear the Treeview and load the first page."""
+        self.tree.delete(*self.tree.get_children())
+        self.last_key = None
+        self.exhausted = False
+        self.loading = False
+        self.filtered = False
+        self.generation += 1
+        self.load_next_page()
+
+    def show(self, rows):
+        """Replace the loaded pages with a fixed set of rows (e.g. search results); reload() resumes paging."""
+        self.tree.delete(*self.tree.get_children())
+        self.generation += 1
+        self.last_key = None
+        self.exhausted = True
+        self.loading = False
+        self.filtered = True
+        for row in rows:
+            if not self.tree.exists(str(row[0])):
+                self.tree.insert("", "end", iid=str(row[0]), **self.format_row(row))
+
+    def load_next_page(self):
+        """Append the next page of rows after the last loaded key."""
+        if self.exhausted or self.loading:
+            return
+        self.loading = True
+        last_key = self.last_key
+        generation = self.generation
+
+        def job(conn):
+            if last_key is None:
+                return conn.execute(f"""
+                    SELECT {self.columns} FROM {self.table}
+                    ORDER BY {self.key_column} LIMIT ?
+                """, (self.page_size,)).fetchall()
+            return conn.execute(f"""
+                SELECT {self.columns} FROM {self.table}
+                WHERE {self.key_column} > ?
+                ORDER BY {self.key_column} LIMIT ?
+            """, (last_key, self.page_size)).fetchall()
+
+        def done(rows):
+            if generation != self.generation:
+                return
+            self.loading = False
+            for row in rows:
+                if not self.tree.exists(str(row[0])):
+                    self.tree.insert("", "end", iid=str(row[0]), **self.format_row(row))
+            if rows:
+                self.last_key = rows[-1][0]
+            if len(rows) < self.page_size:
+                self.exhausted = True
+
+        def failed(error):
+            # Let the next scroll retry the page instead of stalling the pager for good
+            if generation == self.generation:
+                self.loading = False
+            show_error(error)
+
+        self.db.submit(job, done, failed)
+
+    def refresh_row(self, key):
+        """Insert or update the single Treeview item for the row with this key."""
+        def job(conn):
+            return conn.execute(f"""
+                SELECT {self.columns} FROM {self.table}
+                WHERE {self.key_column} = ?
+            """, (key,)).fetchone()
+
+        self.db.submit(job, lambda row: self.apply_row(key, row))
+
+    def apply_row(self, key, row):
+        """Place a freshly read row in the Treeview, or drop it if it is gone."""
+        if row is None:
+            self.remove_row(key)
+            return
+
+        iid = str(row[0])
+        if self.tree.exists(iid):
+            self.tree.item(iid, **self.format_row(row))
+        elif self.filtered:
+            return  # Not among the search results; it shows up when the search is cleared or re-run
+        elif self.last_key is None or row[0] > self.last_key:
+            # Past the loaded window: append only if no further pages remain,
+            # otherwise the row arrives with the page that contains it
+            if self.exhausted:
+                self.tree.insert("", "end", iid=iid, **self.format_row(row))
+                self.last_key = row[0]
+        else:
+            self.tree.insert("", self.index_for(row[0]), iid=iid, **self.format_row(row))
+
+    def remove_row(self, key):
+        """Remove the Treeview item for the row with this key, if loaded."""
+        iid = str(key)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+
+    def index_for(self, key):
+        """Position at which a key belongs among the loaded rows."""
+        keys = [int(iid) for iid in self.tree.get_children()]
+        return bisect_left(keys, key)
+
+    def on_scroll(self, first, last):
+        """Keep the scrollbar in sync and load more rows near the bottom."""
+        self.scrollbar.set(first, last)
+        if not self.exhausted and float(last) >= LOAD_MORE_AT:
+            self.load_next_page()
+
+
+class SearchBox:
+    """Search entry that shows ranked full-text matches in a PagedTreeview as the user types.
+
+    The query runs DEBOUNCE_MS after the last keystroke, on the DBExecutor,
+    and results of a query overtaken by newer typing are dropped. Clearing
+    the box goes back to paging through the whole table.
+    """
+
+    def __init__(self, parent, pager, table, label="Search:"):
+        self.pager = pager
+        self.table = table
+        self.pending = None
+        self.sequence = 0
+        self.frame = tk.Frame(parent)
+        self.label = tk.Label(self.frame, text=label, font=("times new roman", 12, "bold"))
+        self.entry = tk.Entry(self.frame, width=40)
+        self.label.pack(side="left", padx=5)
+        self.entry.pack(side="left", padx=5)
+        self.entry.bind("<KeyRelease>", self.schedule)
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    def schedule(self, event=None):
+        if self.pending is not None:
+            self.entry.after_cancel(self.pending)
+        self.pending = self.entry.after(DEBOUNCE_MS, self.run)
+
+    def run(self):
+        self.pending = None
+        self.sequence += 1
+        sequence = self.sequence
+        text = self.entry.get()
+        if not text.strip():
+            self.pager.reload()
+            return
+
+        def done(rows):
+            if sequence == self.sequence:
+                self.pager.show(rows)
+
+        self.pager.db.submit(lambda conn: services.search(conn, self.table, text), done)
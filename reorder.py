@@ -0,0 +1,73 @@
+import math
+from datetime import datetime
+from itertools import groupby
+
+import repository
+from config import config
+
+# Columns of each line of a purchase suggestion
+SUGGESTION_COLUMNS = ["product_id", "name", "quantity", "reorder_point", "suggested", "daily_units", "raised_at"]
+
+
+def reorder_settings():
+    """(velocity_days, lead_time_days, safety_days, cover_days) from the [reorder] config section."""
+    section = config["reorder"]
+    return (section.getint("velocity_days"), section.getint("lead_time_days"),
+            section.getint("safety_days"), section.getint("cover_days"))
+
+
+def reorder_point(daily_units, lead_time_days, safety_days, cover_days):
+    """(reorder_point, order_up_to) for a product selling daily_units a day.
+
+    The reorder point is the stock that lasts through a delivery plus the
+    safety days; a purchase brings stock back up to cover_days of sales
+    beyond it.
+    """
+    point = math.ceil(daily_units * (lead_time_days + safety_days))
+    return point, point + math.ceil(daily_units * cover_days)
+
+
+def refresh_reorder_points(conn):
+    """Recompute every product's reorder point from its recent sales; returns how many were set.
+
+    The sales rate is the velocity analysis over [reorder] velocity_days,
+    ending at the latest order. Products without sales in that window lose
+    their reorder point. The triggers of migration 10 raise or clear each
+    product's stock alert as its point moves, and from then on as its
+    stock moves.
+    """
+    days, lead_time, safety, cover = reorder_settings()
+    stamp = datetime.now().isoformat(timespec="seconds")
+    velocity = repository.fetchall(conn, "velocity_analysis", {"days": days, "window": f"-{days - 1} days"})
+    rows = []
+    for product_id, _, _, daily_units in velocity:
+        point, order_up_to = reorder_point(daily_units, lead_time, safety, cover)
+        rows.append({"product_id": product_id, "daily_units": daily_units, "reorder_point": point,
+                     "order_up_to": order_up_to, "computed_at": stamp})
+    repository.executemany(conn, "upsert_reorder_point", rows)
+    repository.execute(conn, "delete_stale_reorder_points", (stamp,))
+    return len(rows)
+
+
+def stock_alert_count(conn):
+    """Number of products at or below their reorder point."""
+    return repository.fetchone(conn, "stock_alert_count")[0]
+
+
+def purchase_suggestions(conn):
+    """Flagged products batched into one purchase per supplier.
+
+    Returns [(supplier_id, supplier, contact, lines)], where each line is
+    (product_id, name, quantity, reorder_point, suggested, daily_units,
+    raised_at) and suggested brings the product back up to its order-up-to
+    level. A supplier is entered once per product it supplies, so rows
+    with the same name and contact are one purchase (under the lowest
+    supplier_id). Products with no supplier come last, under None.
+    """
+    batches = []
+    rows = repository.fetchall(conn, "purchase_suggestions")
+    for (name, contact), group in groupby(rows, key=lambda row: (row[1], row[2])):
+        group = list(group)
+        supplier_ids = [row[0] for row in group if row[0] is not None]
+        batches.append((min(supplier_ids, default=None), name, contact, [row[3:] for row in group]))
+    return batches
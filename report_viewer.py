@@ -0,0 +1,222 @@
+import tkinter as tk
+from tkinter import ttk
+
+VISIBLE_ROWS = 20      # Rows a VirtualTable shows (and holds as Treeview items) at a time
+WHEEL_ROWS = 3         # Rows scrolled per mouse wheel notch
+CHART_HEIGHT = 220
+POINTS_PER_PIXEL = 0.5  # Downsampled chart points per pixel of canvas width
+MAX_CHART_POINTS = 2000  # A series is downsampled to this once, then per canvas width from there
+CHART_MARGIN = 50
+
+
+def lttb(points, threshold):
+    """Downsample (x, y) points to threshold points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between keeps the
+    point forming the largest triangle with the point kept before it and
+    the average of the next bucket, so peaks and dips survive where plain
+    every-nth sampling would drop them.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    kept = 0
+    for i in range(threshold - 2):
+        start, end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        next_x = sum(p[0] for p in points[start:end]) / (end - start)
+        next_y = sum(p[1] for p in points[start:end]) / (end - start)
+
+        ax, ay = points[kept]
+        best, best_area = None, -1
+        for j in range(int(i * every) + 1, start):
+            x, y = points[j]
+            area = abs((ax - next_x) * (y - ay) - (ax - x) * (next_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        kept = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def chart_series(labels, values):
+    """A series ready for TrendChart.show: (points, first label, last label), or None if empty.
+
+    The points are (index, value) pairs downsampled to MAX_CHART_POINTS.
+    This is the only step that grows with the report, so build it in the
+    DB job rather than on the Tk thread.
+    """
+    if not values:
+        return None
+    points = lttb([(i, float(value)) for i, value in enumerate(values)], MAX_CHART_POINTS)
+    return points, labels[0], labels[-1]
+
+
+class VirtualTable:
+    """A Treeview that shows a window into a list of rows of any length.
+
+    Only VISIBLE_ROWS items ever exist in the widget: scrolling moves the
+    window and rewrites those items, so showing a million-row report costs
+    the same as showing twenty rows. The scrollbar drives the window
+    instead of the Treeview's own scrolling.
+    """
+
+    def __init__(self, parent, visible_rows=VISIBLE_ROWS):
+        self.frame = tk.Frame(parent)
+        self.visible_rows = visible_rows
+        self.tree = ttk.Treeview(self.frame, show="headings", height=visible_rows, selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.rows = []
+        self.offset = 0
+        self.format_row = None
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        self.tree.bind("<Up>", lambda event: self.scroll_to(self.offset - 1))
+        self.tree.bind("<Down>", lambda event: self.scroll_to(self.offset + 1))
+        self.tree.bind("<Prior>", lambda event: self.scroll_to(self.offset - self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll_to(self.offset + self.visible_rows))
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    def show(self, columns, rows, format_row=None):
+        """Show rows (a list, kept by reference) under the given column headings, from the top."""
+        self.tree.config(columns=columns)
+        for column in columns:
+            self.tree.heading(column, text=column.replace("_", " ").title())
+            self.tree.column(column, width=140, anchor="w")
+        self.rows = rows
+        self.format_row = format_row or (lambda row: row)
+        self.offset = 0
+        self.render()
+
+    def render(self):
+        """Rewrite the visible items from the rows at the current offset."""
+        self.tree.delete(*self.tree.get_children())
+        for row in self.rows[self.offset:self.offset + self.visible_rows]:
+            self.tree.insert("", "end", values=self.format_row(row))
+        if self.rows:
+            self.scrollbar.set(self.offset / len(self.rows),
+                               min(1.0, (self.offset + self.visible_rows) / len(self.rows)))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.rows) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return "break"  # The Treeview's own key bindings would move the selection instead
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.rows)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            return self.scroll_to(self.offset - WHEEL_ROWS)
+        return self.scroll_to(self.offset + WHEEL_ROWS)
+
+
+class TrendChart:
+    """Line chart of a series on a Canvas, downsampled to the canvas width.
+
+    The series arrives already cut to MAX_CHART_POINTS (chart_series) and
+    is downsampled again to POINTS_PER_PIXEL points per pixel whenever the
+    canvas is resized, so drawing costs the same however long the report
+    is. The line is a single canvas item.
+    """
+
+    def __init__(self, parent, height=CHART_HEIGHT):
+        self.canvas = tk.Canvas(parent, height=height, background="white", highlightthickness=0)
+        self.first_label = self.last_label = ""
+        self.points = []
+        self.sampled = None
+        self.sampled_for = None
+        self.canvas.bind("<Configure>", lambda event: self.draw())
+
+    def grid(self, **options):
+        self.canvas.grid(**options)
+
+    def grid_remove(self):
+        self.canvas.grid_remove()
+
+    def show(self, points, first_label, last_label):
+        """Chart (index, value) points, labelling the ends of the x axis."""
+        self.points = points
+        self.first_label, self.last_label = first_label, last_label
+        self.sampled = None
+        self.draw()
+
+    def draw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if not self.points or width <= 2 * CHART_MARGIN:
+            return
+        target = max(3, int((width - 2 * CHART_MARGIN) * POINTS_PER_PIXEL))
+        if self.sampled is None or self.sampled_for != target:
+            self.sampled = lttb(self.points, target)
+            self.sampled_for = target
+
+        low = min(0.0, min(y for _, y in self.sampled))
+        high = max(y for _, y in self.sampled) or 1.0
+        last = max(1, self.points[-1][0])
+        left, right, top, bottom = CHART_MARGIN, width - CHART_MARGIN, 20, height - 30
+
+        def scale(x, y):
+            return (left + (right - left) * x / last,
+                    bottom - (bottom - top) * (y - low) / ((high - low) or 1.0))
+
+        canvas.create_line(left, bottom, right, bottom)
+        canvas.create_line(left, top, left, bottom)
+        coordinates = [c for x, y in self.sampled for c in scale(x, y)]
+        if len(coordinates) >= 4:
+            canvas.create_line(*coordinates, fill="steelblue", width=2)
+        else:
+            x, y = coordinates
+            canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill="steelblue")
+        canvas.create_text(left - 5, top, text=f"{high:,.0f}", anchor="e")
+        canvas.create_text(left - 5, bottom, text=f"{low:,.0f}", anchor="e")
+        canvas.create_text(left, bottom + 5, text=str(self.first_label), anchor="nw")
+        canvas.create_text(right, bottom + 5, text=str(self.last_label), anchor="ne")
+
+
+class ReportViewer:
+    """Pane showing a report as a scrollable table, with a chart for reports that form a series."""
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent)
+        self.title = tk.Label(self.frame, font=("times new roman", 12, "bold"))
+        self.count = tk.Label(self.frame)
+        self.table = VirtualTable(self.frame)
+        self.chart = TrendChart(self.frame)
+        self.frame.columnconfigure(0, weight=1)
+        self.title.grid(row=0, column=0, sticky="w")
+        self.count.grid(row=0, column=1, sticky="e")
+        self.table.grid(row=1, column=0, columnspan=2, sticky="nsew")
+        self.chart.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5)
+        self.chart.grid_remove()
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    def show(self, title, columns, rows, format_row=None, series=None):
+        """Show rows under the given columns; a series from chart_series() is charted below them."""
+        self.title.config(text=title)
+        self.count.config(text=f"{len(rows):,} row(s)")
+        self.table.show(columns, rows, format_row)
+        if series:
+            self.chart.grid()
+            self.chart.show(*series)
+        else:
+            self.chart.grid_remove()
@@ -0,0 +1,174 @@
+# Analytics report queries. Each takes a single threshold parameter and reads
+# the trigger-maintained rollups from migration 4, so the cost is proportional
+# to the rows returned rather than to the size of the orders table.
+SALES_REPORT = """
+    SELECT order_date, total_sales
+    FROM daily_sales
+    WHERE total_sales > ?
+    ORDER BY order_date ASC
+"""
+
+STOCK_REPORT = """
+    SELECT p.name AS product_name, s.units_sold AS total_sold
+    FROM product_sales s
+    JOIN products p ON p.product_id = s.product_id
+    WHERE s.units_sold > ?
+    ORDER BY s.units_sold DESC
+"""
+
+TOP_CUSTOMERS_REPORT = """
+    SELECT name AS customer_name, total_spent
+    FROM customers
+    WHERE total_spent > ?
+    ORDER BY total_spent DESC
+"""
+
+SALES_FOR_DATE = """
+    SELECT total_sales
+    FROM daily_sales
+    WHERE order_date = ?
+"""
+
+# Sales trends (analytics.py): whole periods come from the bucket tables of
+# migration 8, days and the clipped ends of a range from daily_sales
+SALES_BUCKETS = """
+    SELECT period, total_sales, order_count
+    FROM sales_buckets
+    WHERE grain = ? AND period >= ? AND period < ?
+    ORDER BY period
+"""
+
+DAILY_SALES_RANGE = """
+    SELECT order_date, total_sales, order_count
+    FROM daily_sales
+    WHERE order_date >= ? AND order_date < ?
+    ORDER BY order_date
+"""
+
+SALES_BETWEEN = """
+    SELECT COALESCE(SUM(total_sales), 0), COALESCE(SUM(order_count), 0)
+    FROM daily_sales
+    WHERE order_date >= ? AND order_date < ?
+"""
+
+# Sales analyses (analytics.sales_analysis), aggregated from orders and their
+# lines; columnar.OrderColumns computes the same rows with NumPy
+TOP_CUSTOMERS_ANALYSIS = """
+    SELECT s.customer_id, c.name, s.total_spent, s.order_count
+    FROM (
+        SELECT customer_id, SUM(total_price) AS total_spent, COUNT(*) AS order_count
+        FROM orders
+        WHERE customer_id IS NOT NULL
+        GROUP BY customer_id
+    ) s
+    LEFT JOIN customers c ON c.customer_id = s.customer_id
+    ORDER BY s.total_spent DESC, s.customer_id
+    LIMIT ?
+"""
+
+# A product is class A while the revenue ranked above it is under the first
+# limit of the total, B while under the second and C after that
+ABC_ANALYSIS = """
+    SELECT product_id, name, revenue, cumulative / total,
+           CASE WHEN cumulative - revenue < :a_limit * total THEN 'A'
+                WHEN cumulative - revenue < :b_limit * total THEN 'B'
+                ELSE 'C' END
+    FROM (
+        SELECT s.product_id, p.name, s.revenue,
+               SUM(s.revenue) OVER (ORDER BY s.revenue DESC, s.product_id) AS cumulative,
+               SUM(s.revenue) OVER () AS total
+        FROM (
+            SELECT product_id, SUM(line_total) AS revenue
+            FROM order_items
+            GROUP BY product_id
+            HAVING revenue > 0
+        ) s
+        LEFT JOIN products p ON p.product_id = s.product_id
+    )
+    ORDER BY revenue DESC, product_id
+"""
+
+# Customers grouped by the month of their first order
+REPEAT_RATES_ANALYSIS = """
+    SELECT substr(first_order, 1, 7) AS cohort, COUNT(*), SUM(order_count > 1), AVG(order_count > 1)
+    FROM (
+        SELECT customer_id, MIN(order_date) AS first_order, COUNT(*) AS order_count
+        FROM orders
+        WHERE customer_id IS NOT NULL
+        GROUP BY customer_id
+    )
+    GROUP BY cohort
+    ORDER BY cohort
+"""
+
+# Units sold over the last :days days of orders
+VELOCITY_ANALYSIS = """
+    SELECT i.product_id, p.name, SUM(i.quantity) AS units, SUM(i.quantity) * 1.0 / :days
+    FROM order_items i
+    JOIN orders o ON o.order_id = i.order_id
+    LEFT JOIN products p ON p.product_id = i.product_id
+    WHERE o.order_date >= date((SELECT MAX(order_date) FROM orders), :window)
+    GROUP BY i.product_id
+    ORDER BY units DESC, i.product_id
+"""
+
+# Products flagged by the low-stock triggers (migration 10) with what to buy
+# to bring them back up to order_up_to. Each goes to its lowest-numbered
+# supplier; products nobody supplies come last with a NULL supplier.
+PURCHASE_SUGGESTIONS = """
+    SELECT s.supplier_id, s.name, s.contact, p.product_id, p.name, p.quantity,
+           r.reorder_point, r.order_up_to - p.quantity AS suggested, r.daily_units, a.raised_at
+    FROM stock_alerts a
+    JOIN products p ON p.product_id = a.product_id
+    JOIN reorder_points r ON r.product_id = a.product_id
+    LEFT JOIN suppliers s
+        ON s.supplier_id = (SELECT MIN(supplier_id) FROM suppliers WHERE product_supplied = a.product_id)
+    ORDER BY s.name IS NULL, s.name, s.contact, p.name
+"""
+
+# Columns of the sales_analysis results, per analysis
+ANALYSES = {
+    "top_customers": ["customer_id", "name", "total_spent", "order_count"],
+    "abc": ["product_id", "name", "revenue", "cumulative_share", "class"],
+    "repeat_rates": ["cohort", "customers", "repeat_customers", "rate"],
+    "velocity": ["product_id", "name", "units", "units_per_day"],
+}
+
+# Tables each cached report reads; their data_versions counters key the
+# cached results (cache.ReportCache)
+REPORT_TABLES = {
+    "sales_report": ["orders"],                      # Through daily_sales
+    "stock_report": ["order_items", "products"],     # product_sales plus product names
+    "top_customers_report": ["customers"],           # total_spent is kept by the order triggers
+    "sales_trend": ["orders"],                       # daily_sales and sales_buckets
+    "sales_analysis": ["orders", "order_items", "customers", "products"],
+}
+
+REPORTS = {
+    "sales": SALES_REPORT,
+    "stock": STOCK_REPORT,
+    "top_customers": TOP_CUSTOMERS_REPORT,
+}
+
+# The same reports aggregated from orders through the original views; kept
+# for comparison in benchmark.py
+VIEW_REPORTS = {
+    "sales": """
+        SELECT order_date, total_sales
+        FROM sales_summary
+        WHERE total_sales > ?
+        ORDER BY order_date ASC
+    """,
+    "stock": """
+        SELECT product_name, total_sold
+        FROM stock_summary
+        WHERE total_sold > ?
+        ORDER BY total_sold DESC
+    """,
+    "top_customers": """
+        SELECT customer_name, total_spent
+        FROM customer_spending_summary
+        WHERE total_spent > ?
+        ORDER BY total_spent DESC
+    """,
+}
@@ -0,0 +1,224 @@
+import threading
+import time
+from bisect import bisect_left
+
+import reports
+
+# Upper bounds (ms) of the latency histogram buckets; a final bucket catches the rest
+LATENCY_BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500]
+
+# Every query the application runs, registered once by name. Running the
+# exact same SQL text each time lets sqlite3's per-connection statement
+# cache (cached_statements in db.connect) reuse the prepared statement
+# instead of parsing and planning it again.
+STATEMENTS = {
+    # Orders: the customer row plus product price and stock in one round trip.
+    # Always returns one row; the customer or product half is NULL if unknown.
+    "order_references": """
+        SELECT c.customer_id, c.name, c.email, c.phone,
+               p.product_id, p.name, p.price, p.quantity
+        FROM (SELECT 1)
+        LEFT JOIN customers c ON c.customer_id = :customer_id
+        LEFT JOIN products p ON p.product_id = :product_id
+    """,
+    "insert_order": "INSERT INTO orders (customer_id, total_price, order_date) VALUES (?, ?, ?)",
+    "update_order": "UPDATE orders SET customer_id = ?, total_price = ?, order_date = ? WHERE order_id = ?",
+    "delete_order": "DELETE FROM orders WHERE order_id = ?",
+    "order_header": "SELECT order_id, customer_id, total_price, order_date FROM orders WHERE order_id = ?",
+    "insert_order_item": """
+        INSERT INTO order_items (order_id, product_id, quantity, unit_price, line_total)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    "order_items": """
+        SELECT item_id, product_id, quantity, unit_price, line_total
+        FROM order_items
+        WHERE order_id = ?
+        ORDER BY item_id
+    """,
+    # The trigger on each removed line returns its stock
+    "delete_order_items": "DELETE FROM order_items WHERE order_id = ?",
+
+    # Takes stock only if enough is left; rowcount 0 means the order cannot be filled
+    "reserve_stock": """
+        UPDATE products
+        SET quantity = quantity - :quantity
+        WHERE product_id = :product_id AND quantity >= :quantity
+    """,
+    "product_stock": "SELECT quantity FROM products WHERE product_id = ?",
+    "product_record": "SELECT product_id, name, price, quantity FROM products WHERE product_id = ?",
+    "product_exists": "SELECT EXISTS (SELECT 1 FROM products WHERE product_id = ?)",
+    "product_name_taken": "SELECT EXISTS (SELECT 1 FROM products WHERE name = ?)",
+    "product_ordered": "SELECT EXISTS (SELECT 1 FROM order_items WHERE product_id = ?)",
+    "insert_product": "INSERT INTO products (name, price, quantity, image) VALUES (?, ?, ?, ?)",
+    # Keeps the current thumbnail unless a new image is given
+    "update_product": """
+        UPDATE products
+        SET name = ?, price = ?, quantity = ?, image = COALESCE(?, image)
+        WHERE product_id = ?
+    """,
+    "delete_product": "DELETE FROM products WHERE product_id = ?",
+
+    "customer_record": "SELECT customer_id, name, email, phone FROM customers WHERE customer_id = ?",
+    "insert_customer": "INSERT INTO customers (name, phone, email) VALUES (?, ?, ?)",
+    "update_customer": "UPDATE customers SET name = ?, phone = ?, email = ? WHERE customer_id = ?",
+    "delete_customer": "DELETE FROM customers WHERE customer_id = ?",
+
+    "insert_employee": "INSERT INTO employees (name, role, phone, email) VALUES (?, ?, ?, ?)",
+    "update_employee": "UPDATE employees SET name = ?, role = ?, phone = ?, email = ? WHERE employee_id = ?",
+    "delete_employee": "DELETE FROM employees WHERE employee_id = ?",
+
+    "insert_supplier": "INSERT INTO suppliers (name, contact, product_supplied) VALUES (?, ?, ?)",
+    "update_supplier": "UPDATE suppliers SET name = ?, contact = ?, product_supplied = ? WHERE supplier_id = ?",
+    "delete_supplier": "DELETE FROM suppliers WHERE supplier_id = ?",
+
+    "user_by_name": "SELECT username, password FROM users WHERE username = ?",
+    "insert_user": "INSERT INTO users (username, password) VALUES (?, ?)",
+    "update_password": "UPDATE users SET password = ? WHERE username = ?",
+
+    # Reorder points (migration 10); the upsert skips products deleted since their sales
+    "upsert_reorder_point": """
+        INSERT INTO reorder_points (product_id, daily_units, reorder_point, order_up_to, computed_at)
+        SELECT product_id, :daily_units, :reorder_point, :order_up_to, :computed_at
+        FROM products WHERE product_id = :product_id
+        ON CONFLICT (product_id) DO UPDATE SET
+            daily_units = excluded.daily_units, reorder_point = excluded.reorder_point,
+            order_up_to = excluded.order_up_to, computed_at = excluded.computed_at
+    """,
+    "delete_stale_reorder_points": "DELETE FROM reorder_points WHERE computed_at <> ?",
+    "stock_alert_count": "SELECT COUNT(*) FROM stock_alerts",
+
+    "data_versions": "SELECT name, version FROM data_versions",
+    "sales_for_date": reports.SALES_FOR_DATE,
+    "sales_report": reports.SALES_REPORT,
+    "stock_report": reports.STOCK_REPORT,
+    "top_customers_report": reports.TOP_CUSTOMERS_REPORT,
+    "sales_buckets": reports.SALES_BUCKETS,
+    "daily_sales_range": reports.DAILY_SALES_RANGE,
+    "sales_between": reports.SALES_BETWEEN,
+    "top_customers_analysis": reports.TOP_CUSTOMERS_ANALYSIS,
+    "abc_analysis": reports.ABC_ANALYSIS,
+    "repeat_rates_analysis": reports.REPEAT_RATES_ANALYSIS,
+    "velocity_analysis": reports.VELOCITY_ANALYSIS,
+    "purchase_suggestions": reports.PURCHASE_SUGGESTIONS,
+}
+
+# Full-text search (migration 7): the rows of each searchable table matching
+# an FTS5 query, in key order
+SEARCHABLE = {
+    "products": "product_id",
+    "customers": "customer_id",
+    "employees": "employee_id",
+    "suppliers": "supplier_id",
+}
+for _table, _key in SEARCHABLE.items():
+    STATEMENTS[f"search_{_table}"] = f"""
+        SELECT t.*
+        FROM {_table}_fts f
+        JOIN {_table} t ON t.{_key} = f.rowid
+        WHERE {_table}_fts MATCH ?
+        LIMIT ?
+    """
+
+
+class StatementStats:
+    """Call count and latency histogram for one statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls (None if past the last bound)."""
+        target = fraction * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS + [None], self.buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+
+class Metrics:
+    """Per-statement counts and latencies, shared by every thread."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, name, ms):
+        with self.lock:
+            if name not in self.stats:
+                self.stats[name] = StatementStats()
+            self.stats[name].record(ms)
+
+    def snapshot(self):
+        """{name: {count, total_ms, mean_ms, max_ms, p95_ms, histogram}} for every statement run so far."""
+        with self.lock:
+            return {
+                name: {
+                    "count": s.count,
+                    "total_ms": s.total_ms,
+                    "mean_ms": s.total_ms / s.count,
+                    "max_ms": s.max_ms,
+                    "p95_ms": s.percentile(0.95),
+                    "histogram": dict(zip([f"<={b}ms" for b in LATENCY_BUCKETS_MS] + ["slower"], s.buckets)),
+                }
+                for name, s in self.stats.items()
+            }
+
+    def report(self):
+        """Plain-text table of the snapshot, busiest statements first."""
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        lines = [f"{'statement':<22} {'calls':>7} {'mean ms':>9} {'p95 ms':>8} {'max ms':>9}"]
+        for name, s in rows:
+            p95 = f"<={s['p95_ms']}" if s["p95_ms"] is not None else "slower"
+            lines.append(f"{name:<22} {s['count']:>7} {s['mean_ms']:>9.3f} {p95:>8} {s['max_ms']:>9.3f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+
+metrics = Metrics()
+
+
+def execute(conn, name, params=()):
+    """Run a registered statement and record its latency; returns the cursor."""
+    start = time.perf_counter()
+    try:
+        return conn.execute(STATEMENTS[name], params)
+    finally:
+        metrics.record(name, (time.perf_counter() - start) * 1000)
+
+
+def executemany(conn, name, rows):
+    start = time.perf_counter()
+    try:
+        return conn.executemany(STATEMENTS[name], rows)
+    finally:
+        metrics.record(name, (time.perf_counter() - start) * 1000)
+
+
+def fetchone(conn, name, params=()):
+    start = time.perf_counter()
+    try:
+        return conn.execute(STATEMENTS[name], params).fetchone()
+    finally:
+        metrics.record(name, (time.perf_counter() - start) * 1000)
+
+
+def fetchall(conn, name, params=()):
+    start = time.perf_counter()
+    try:
+        return conn.execute(STATEMENTS[name], params).fetchall()
+    finally:
+        metrics.record(name, (time.perf_counter() - start) * 1000)
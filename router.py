@@ -0,0 +1,46 @@
+import tkinter as tk
+
+from auth_service import AuthService
+from db import DB_PATH
+from db_executor import DBExecutor
+
+
+class ScreenRouter:
+    """Show one screen at a time inside a single Tk root and mainloop.
+
+    A screen is a class called as screen(frame, router, *args) that builds
+    its widgets inside frame. Switching calls the current screen's close()
+    (if it has one), destroys its frame and builds the next screen in a
+    fresh frame, so moving between login, signup and the dashboard costs
+    no new interpreter, window or nested mainloop.
+
+    The DB worker and the bcrypt pool belong to the router and are shared
+    by every screen.
+    """
+
+    def __init__(self, root, db_path=DB_PATH):
+        self.root = root
+        self.db = DBExecutor(root, db_path)
+        self.auth = AuthService(root)
+        self.screen = None
+        self.frame = None
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def show(self, screen, *args):
+        """Replace the current screen with screen(frame, router, *args); returns the new screen."""
+        if self.screen is not None and hasattr(self.screen, "close"):
+            self.screen.close()
+        if self.frame is not None:
+            self.frame.destroy()
+        self.frame = tk.Frame(self.root)
+        self.frame.pack(fill="both", expand=True)
+        self.screen = screen(self.frame, self, *args)
+        return self.screen
+
+    def close(self):
+        """Close the current screen, commit outstanding writes and destroy the window."""
+        if self.screen is not None and hasattr(self.screen, "close"):
+            self.screen.close()
+        self.db.close()
+        self.auth.shutdown()
+        self.root.destroy()
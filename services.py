@@ -0,0 +1,402 @@
+import re
+from datetime import datetime
+
+import cache
+import repository
+from reports import REPORT_TABLES
+
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+
+# Business operations with no UI attached. Each takes a sqlite3 connection
+# plus plain values, checks its inputs, writes through the repository and
+# keeps the record cache in step. The caller owns the transaction (the
+# DBExecutor job in the dashboard, the write batcher in api.py).
+
+
+class ValidationError(Exception):
+    """Raised to reject an operation; args are a title and a message for the user."""
+
+
+def require(**fields):
+    for name, value in fields.items():
+        if value is None or not str(value).strip():
+            raise ValidationError("Input Error", f"{name.replace('_', ' ').title()} is required.")
+
+
+def positive_number(value, field_name):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number <= 0:
+        raise ValidationError("Validation Error", f"Invalid {field_name}! Please enter a positive number.")
+    return number
+
+
+def whole_number(value, field_name):
+    # JSON numbers arrive as floats: 2.0 is accepted, 2.7 is refused rather than truncated
+    try:
+        number = float(value)
+        if number != int(number):
+            raise ValueError
+        number = int(number)
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError("Validation Error", f"{field_name} must be a whole number.")
+    if number < 0:
+        raise ValidationError("Validation Error", f"{field_name} cannot be negative.")
+    return number
+
+
+def valid_email(email):
+    if not EMAIL_REGEX.match(str(email)):
+        raise ValidationError("Invalid Email", "Please provide a valid email address.")
+
+
+def valid_date(value, field_name="Order Date"):
+    try:
+        datetime.strptime(str(value), "%Y-%m-%d")
+    except ValueError:
+        raise ValidationError("Validation Error",
+                              f"Invalid {field_name}! Please enter a valid date in YYYY-MM-DD format.")
+
+
+# Products
+
+def get_product(conn, product_id):
+    """The product's record (cached), or None."""
+    return cache.product(conn, product_id)
+
+
+def add_product(conn, name, price, quantity, image=None):
+    require(name=name, price=price, stock=quantity)
+    price = positive_number(price, "Price")
+    quantity = whole_number(quantity, "Stock")
+    if repository.fetchone(conn, "product_name_taken", (name,))[0]:
+        raise ValidationError("Duplicate Entry",
+                              f"A product with the name '{name}' already exists. Please use a unique name.")
+    return repository.execute(conn, "insert_product", (name, price, quantity, image)).lastrowid
+
+
+def update_product(conn, product_id, name, price, quantity, image=None):
+    """Update a product; the current thumbnail is kept unless a new image is given."""
+    require(name=name, price=price, stock=quantity)
+    price = positive_number(price, "Price")
+    quantity = whole_number(quantity, "Stock")
+    repository.execute(conn, "update_product", (name, price, quantity, image, product_id))
+    cache.invalidate_on_commit(cache.products, [product_id])
+
+
+def delete_product(conn, product_id):
+    """Delete a product that has never been ordered (products_delete_guard refuses the others)."""
+    if repository.fetchone(conn, "product_ordered", (product_id,))[0]:
+        raise ValidationError("Delete Error",
+                              f"Product {product_id} appears on past orders and cannot be deleted.")
+    repository.execute(conn, "delete_product", (product_id,))
+    cache.invalidate_on_commit(cache.products, [product_id])
+
+
+# Customers
+
+def add_customer(conn, name, phone, email):
+    require(name=name, phone=phone, email=email)
+    valid_email(email)
+    return repository.execute(conn, "insert_customer", (name, phone, email)).lastrowid
+
+
+def update_customer(conn, customer_id, name, phone, email):
+    require(name=name, phone=phone, email=email)
+    valid_email(email)
+    repository.execute(conn, "update_customer", (name, phone, email, customer_id))
+    cache.invalidate_on_commit(cache.customers, [customer_id])
+
+
+def delete_customer(conn, customer_id):
+    repository.execute(conn, "delete_customer", (customer_id,))
+    cache.invalidate_on_commit(cache.customers, [customer_id])
+    cache.invalidate_on_commit(cache.products)  # The cascaded order deletes returned stock to their products
+
+
+# Employees
+
+def add_employee(conn, name, role, phone, email):
+    require(name=name, role=role, phone=phone, email=email)
+    valid_email(email)
+    return repository.execute(conn, "insert_employee", (name, role, phone, email)).lastrowid
+
+
+def update_employee(conn, employee_id, name, role, phone, email):
+    require(name=name, role=role, phone=phone, email=email)
+    valid_email(email)
+    repository.execute(conn, "update_employee", (name, role, phone, email, employee_id))
+
+
+def delete_employee(conn, employee_id):
+    repository.execute(conn, "delete_employee", (employee_id,))
+
+
+# Suppliers
+
+def check_product_supplied(conn, product_supplied):
+    if not repository.fetchone(conn, "product_exists", (product_supplied,))[0]:
+        raise ValidationError("Validation Error", "Invalid Product ID. Please enter a valid product.")
+
+
+def add_supplier(conn, name, contact, product_supplied):
+    require(name=name, contact=contact, product_supplied=product_supplied)
+    check_product_supplied(conn, product_supplied)
+    return repository.execute(conn, "insert_supplier", (name, contact, product_supplied)).lastrowid
+
+
+def update_supplier(conn, supplier_id, name, contact, product_supplied):
+    require(name=name, contact=contact, product_supplied=product_supplied)
+    check_product_supplied(conn, product_supplied)
+    repository.execute(conn, "update_supplier", (name, contact, product_supplied, supplier_id))
+
+
+def delete_supplier(conn, supplier_id):
+    repository.execute(conn, "delete_supplier", (supplier_id,))
+
+
+# Orders
+
+def insufficient_stock(product_id, available, quantity):
+    return ValidationError(
+        "Validation Error",
+        f"Insufficient stock for product {product_id}! Available quantity: {available}, Entered: {quantity}"
+    )
+
+
+def validate_order(conn, customer_id, product_id, price, quantity):
+    """Check the customer, product and price of one order line against the record cache.
+
+    Stock is not checked here: a cached quantity can be out of date, so it
+    is checked where it is taken (reserve_stock, order_items_stock_guard).
+    """
+    customer, product = cache.order_records(conn, customer_id, product_id)
+
+    if customer is None:
+        raise ValidationError("Validation Error", "Customer ID does not exist.")
+
+    if product is None:
+        raise ValidationError("Validation Error", f"Product ID {product_id} does not exist.")
+
+    if float(price) != product.price:
+        raise ValidationError("Validation Error", f"Price mismatch! Expected: {product.price}, Entered: {price}")
+
+    if int(quantity) <= 0:
+        raise ValidationError("Validation Error", "Quantity must be greater than zero.")
+
+
+def order_lines(items):
+    """Basket items as a list of (product_id, quantity, price), one per product.
+
+    Items may be (product_id, quantity, price) sequences or dicts with those
+    keys (as sent to the API). Repeated products are merged so each
+    product's stock is reserved once.
+    """
+    if not items:
+        raise ValidationError("Input Error", "An order needs at least one item.")
+    if not isinstance(items, (list, tuple)):
+        raise ValidationError("Input Error", "Items must be a list of order lines.")
+    lines = {}
+    for item in items:
+        if isinstance(item, dict):
+            product_id, quantity, price = item.get("product_id"), item.get("quantity"), item.get("price")
+        elif isinstance(item, (list, tuple)) and len(item) == 3:
+            product_id, quantity, price = item
+        else:
+            raise ValidationError("Input Error", "Each item needs a product_id, quantity and price.")
+        require(product_id=product_id, quantity=quantity, price=price)
+        positive_number(quantity, "Quantity")
+        quantity = whole_number(quantity, "Quantity")
+        price = positive_number(price, "Price")
+        key = cache.as_key(product_id)
+        if key is None:
+            raise ValidationError("Validation Error", f"Product ID {product_id} does not exist.")
+        if key in lines:
+            if lines[key][2] != price:
+                raise ValidationError("Validation Error", f"Product {key} is listed with two different prices.")
+            lines[key][1] += quantity
+        else:
+            lines[key] = [key, quantity, price]
+    return [tuple(line) for line in lines.values()]
+
+
+def check_order(conn, customer_id, order_date, items):
+    """Validate an order header and its items; returns the merged lines."""
+    require(customer_id=customer_id, order_date=order_date)
+    valid_date(order_date)
+    lines = order_lines(items)
+    for product_id, quantity, price in lines:
+        validate_order(conn, customer_id, product_id, price, quantity)
+    return lines
+
+
+def reserve_stock(conn, lines):
+    """Take the stock for every line with one executemany of conditional UPDATEs.
+
+    Each UPDATE applies only if enough stock is left, and check and
+    decrement run under the write lock, so two clerks ordering the last
+    units cannot both succeed. If any line is short the reservations are
+    rolled back to the savepoint and the first short line is reported.
+    Lines must name distinct products (order_lines merges them); if the
+    count still comes up short with no line short, the order is refused.
+    """
+    conn.execute("SAVEPOINT reserve_stock")
+    cursor = repository.executemany(conn, "reserve_stock",
+                                    [{"product_id": product_id, "quantity": quantity}
+                                     for product_id, quantity, _ in lines])
+    if cursor.rowcount < len(lines):
+        conn.execute("ROLLBACK TO reserve_stock")
+        conn.execute("RELEASE reserve_stock")
+        for product_id, quantity, _ in lines:
+            row = repository.fetchone(conn, "product_stock", (product_id,))
+            available = row[0] if row else 0
+            if available < quantity:
+                raise insufficient_stock(product_id, available, quantity)
+        raise ValidationError("Validation Error", "Stock could not be reserved for every item. Please try again.")
+    conn.execute("RELEASE reserve_stock")
+    cache.invalidate_on_commit(cache.products, [product_id for product_id, _, _ in lines])
+
+
+def write_lines(conn, order_id, lines):
+    """Insert an order's lines in one executemany; returns the order total."""
+    repository.executemany(conn, "insert_order_item",
+                           [(order_id, product_id, quantity, price, price * quantity)
+                            for product_id, quantity, price in lines])
+    return sum(price * quantity for _, quantity, price in lines)
+
+
+def place_order(conn, customer_id, order_date, items):
+    """Validate a basket, reserve its stock and write the order header and lines.
+
+    The header is a single insert, so the per-order triggers (customer
+    total, daily sales) fire once however many lines the basket has. Run
+    it inside db.immediate() (or another transaction that the caller
+    commits) so the reservation and the order are written together.
+    """
+    lines = check_order(conn, customer_id, order_date, items)
+    reserve_stock(conn, lines)
+    total = sum(price * quantity for _, quantity, price in lines)
+    order_id = repository.execute(conn, "insert_order", (customer_id, total, order_date)).lastrowid
+    write_lines(conn, order_id, lines)
+    return order_id
+
+
+def order_items(conn, order_id):
+    """(item_id, product_id, quantity, unit_price, line_total) for each line of an order."""
+    return repository.fetchall(conn, "order_items", (order_id,))
+
+
+def update_order(conn, order_id, customer_id, order_date, items=None):
+    """Change an order's customer and date and, when items are given, replace its lines.
+
+    The old lines are deleted first (their trigger returns the stock), then
+    the new basket is reserved and written like a new order.
+    """
+    require(customer_id=customer_id, order_date=order_date)
+    valid_date(order_date)
+    header = repository.fetchone(conn, "order_header", (order_id,))
+    if header is None:
+        raise ValidationError("Validation Error", f"Order ID {order_id} does not exist.")
+
+    if items is None:
+        if cache.customer(conn, customer_id) is None:
+            raise ValidationError("Validation Error", "Customer ID does not exist.")
+        repository.execute(conn, "update_order", (customer_id, header[2], order_date, order_id))
+        return
+
+    lines = check_order(conn, customer_id, order_date, items)
+    old_products = [row[1] for row in order_items(conn, order_id)]
+    repository.execute(conn, "delete_order_items", (order_id,))
+    cache.invalidate_on_commit(cache.products, old_products)
+    reserve_stock(conn, lines)
+    total = write_lines(conn, order_id, lines)
+    repository.execute(conn, "update_order", (customer_id, total, order_date, order_id))
+
+
+def delete_order(conn, order_id):
+    products = [row[1] for row in order_items(conn, order_id)]
+    repository.execute(conn, "delete_order", (order_id,))
+    cache.invalidate_on_commit(cache.products, products)  # The line trigger returned the stock
+
+
+# Search
+
+SEARCH_LIMIT = 100       # Rows returned for a search
+SEARCH_RANKED = 1000     # Queries matching more rows than this are listed unranked
+
+
+def match_query(text):
+    """FTS5 MATCH expression for a search box: every word must match as a prefix.
+
+    'jo smi' becomes '"jo"* "smi"*'. Words are quoted so punctuation typed by
+    the user is never read as query syntax. Returns None if nothing is left.
+    """
+    words = [word.replace('"', '""') for word in str(text).split() if any(ch.isalnum() for ch in word)]
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def relevance(words):
+    """Sort key for search results: rows whose name holds the typed words ahead of the rest.
+
+    Each word scores 0 if it is a whole word of the name, 1 if it starts
+    one and 2 if it only matched another column (an email or phone number);
+    ties go to the shorter name, then to the lower id.
+    """
+    def key(row):
+        name = str(row[1]).lower().split()
+        score = 0
+        for word in words:
+            if word in name:
+                continue
+            score += 1 if any(part.startswith(word) for part in name) else 2
+        return score, len(name), row[0]
+    return key
+
+
+def search(conn, table, text, limit=SEARCH_LIMIT):
+    """Rows of a searchable table matching the text, best matches first.
+
+    The matches are read once, up to SEARCH_RANKED + 1 of them, and ranked
+    here. FTS5's bm25 would need a second pass over every row holding each
+    term, which for a broad prefix like "jo" on a large table costs more
+    than the search itself. Queries matching more than SEARCH_RANKED rows
+    are returned in key order instead; the results rank again once the
+    user has typed enough to narrow them.
+    """
+    if table not in repository.SEARCHABLE:
+        raise ValidationError("Search Error", f"'{table}' cannot be searched.")
+    query = match_query(text)
+    if query is None:
+        return []
+    rows = repository.fetchall(conn, f"search_{table}", (query, SEARCH_RANKED + 1))
+    if len(rows) <= SEARCH_RANKED:
+        words = [word.lower() for word in str(text).split()]
+        rows.sort(key=relevance(words))
+    return rows[:limit]
+
+
+# Reports
+
+def sales_for_date(conn, order_date):
+    """Total sales on a date (0 when there were none)."""
+    result = repository.fetchone(conn, "sales_for_date", (order_date,))
+    return result[0] if result and result[0] else 0
+
+
+# The threshold reports are served from the report cache while the tables
+# they read are unchanged
+
+def sales_report(conn, threshold):
+    return cache.threshold_report(conn, "sales_report", threshold, REPORT_TABLES["sales_report"])
+
+
+def stock_report(conn, threshold):
+    return cache.threshold_report(conn, "stock_report", threshold, REPORT_TABLES["stock_report"])
+
+
+def top_customers_report(conn, threshold):
+    return cache.threshold_report(conn, "top_customers_report", threshold, REPORT_TABLES["top_customers_report"])
@@ -1,18 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import sqlite3
-import bcrypt
-
-# Ensure the users table exists
-conn = sqlite3.connect('business.db')
-cursor = conn.cursor()
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS users (
-    username TEXT PRIMARY KEY,
-    password TEXT NOT NULL
-)
-""")
-conn.commit()
+import repository
+from db_executor import ValidationError, show_error
 
 # Center the window at the middle of your screen
 def center_window(window, width, height):
@@ -24,12 +14,16 @@ def center_window(window, width, height):
         window.geometry(f"{width}x{height}+{x}+{y}")
 
 class SignupPage:
-    def __init__(self, root, on_success):
-        self.root = root
+    def __init__(self, frame, router, on_success):
+        self.frame = frame
+        self.router = router
+        self.root = router.root
         self.root.title("Sign Up")
         self.root.geometry("400x400")
-        self.root.configure(bg="#426cf5")  # Set background color
+        self.frame.configure(bg="#426cf5")  # Set background color
         self.on_success = on_success
+        self.db = router.db  # Runs the account insert off the Tk thread
+        self.auth = router.auth  # Runs bcrypt off the Tk thread
         self.create_widgets()
         center_window(self.root, 400, 400) # Call the center method
 
@@ -49,20 +43,23 @@ class SignupPage:
         self.style.configure("TEntry", font=("times new roman", 12))
 
         # Title
-        self.title_label = tk.Label(self.root, text="Create Admin Account", font=("times new roman", 16, "bold"), bg="#426cf5", fg="white")
+        self.title_label = tk.Label(self.frame, text="Create Admin Account", font=("times new roman", 16, "bold"), bg="#426cf5", fg="white")
         self.title_label.pack(pady=20)
 
         # Username
-        self.username_label = ttk.Label(self.root, text="Username:")
-        self.username_entry = ttk.Entry(self.root, width=30)
+        self.username_label = ttk.Label(self.frame, text="Username:")
+        self.username_entry = ttk.Entry(self.frame, width=30)
 
         # Password
-        self.password_label = ttk.Label(self.root, text="Password:")
-        self.password_entry = ttk.Entry(self.root, width=30, show="*")
+        self.password_label = ttk.Label(self.frame, text="Password:")
+        self.password_entry = ttk.Entry(self.frame, width=30, show="*")
 
         # Buttons
-        self.signup_button = ttk.Button(self.root, text="Sign Up", command=self.signup)
-        self.back_to_login_button = ttk.Button(self.root, text="Back to Login", command=self.back_to_login)
+        self.signup_button = ttk.Button(self.frame, text="Sign Up", command=self.signup)
+        self.back_to_login_button = ttk.Button(self.frame, text="Back to Login", command=self.back_to_login)
+
+        # Spinner shown while the password is being hashed
+        self.spinner = ttk.Progressbar(self.frame, mode="indeterminate", length=200)
 
         # Layout
         self.username_label.pack(pady=5)
@@ -80,25 +77,44 @@ class SignupPage:
             messagebox.showwarning("Input Error", "Please enter both username and password")
             return
 
-        # Hash the password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        def hashed(hashed_password):
+            def job(conn):
+                try:
+                    repository.execute(conn, "insert_user", (username, hashed_password))
+                except sqlite3.IntegrityError:
+                    raise ValidationError("Error", "Username already exists. Please choose another.")
+
+            self.db.submit(job, done, failed, write=True)
 
-        try:
-            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed_password))
-            conn.commit()
+        def failed(error):
+            self.set_busy(False)
+            show_error(error)
+
+        def done(_):
+            self.set_busy(False)
             messagebox.showinfo("Success", "Account created successfully!")
             self.back_to_login()  # Go back to login after successful signup
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", "Username already exists. Please choose another.")
+
+        # Hash the password
+        self.set_busy(True)
+        self.auth.hash_password(password, hashed, failed)
+
+    def set_busy(self, busy):
+        """Show the spinner and block repeat clicks while the account is created."""
+        if busy:
+            self.signup_button.state(["disabled"])
+            self.spinner.pack(pady=5)
+            self.spinner.start(10)
+        else:
+            self.spinner.stop()
+            self.spinner.pack_forget()
+            self.signup_button.state(["!disabled"])
 
     def back_to_login(self):
         # Import LoginPage inside the method to avoid circular import
         from login import LoginPage
-        # Destroy current signup window and create a new login window
-        self.root.destroy()
-        root = tk.Tk()
-        LoginPage(root, self.on_success)
-        root.mainloop()
+        # Swap this screen for the login screen in the same window
+        self.router.show(LoginPage, self.on_success)
 
     
 